@@ -0,0 +1,126 @@
+import hashlib
+import shutil
+from fnmatch import fnmatchcase
+from functools import lru_cache
+from pathlib import Path
+
+from templates import TEMPLATE_DIR
+
+# Configuration
+ROOT_DIR = TEMPLATE_DIR.parent  # Where the source images live
+STATIC_ASSET_DIR = "static/assets"  # Relative to the output folder
+# Source files served under content-hashed names; pages link them with asset_url().
+# The large PNGs are served resized and re-encoded instead (see images.py)
+ASSET_PATTERNS = ("favicon.png", "favicon.ico", "banner.webp", "Logo-*.webp")
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "public, max-age=0, must-revalidate"
+SHORT_CACHE = "public, max-age=300"
+HEADERS_FILE = "_headers"  # Netlify / Cloudflare Pages format
+# URL pattern -> Cache-Control. The patterns never overlap, so hosts that merge
+# every matching rule and the preview server, which takes the first, agree.
+CACHE_RULES = (
+    ("/static/*", IMMUTABLE_CACHE),  # Fingerprinted CSS, JS, fonts, images, search and API files
+    ("/api/*", SHORT_CACHE),  # Fixed-name entry points to the fingerprinted API files
+    ("/", REVALIDATE_CACHE),  # HTML links the current file names: always revalidated
+    ("/index.html", REVALIDATE_CACHE),
+    ("/search.html", REVALIDATE_CACHE),
+    ("/products/*", REVALIDATE_CACHE),
+    ("/collections/*", REVALIDATE_CACHE),
+    ("/sitemap.xml", REVALIDATE_CACHE),
+    ("/sitemap-*", REVALIDATE_CACHE),
+)
+
+
+class Asset:
+    """A source file and the content-hashed name it is served under."""
+
+    __slots__ = ("path", "digest")
+
+    def __init__(self, path):
+        self.path = path
+        self.digest = hashlib.sha256(path.read_bytes()).hexdigest()[:10]
+
+    @property
+    def filename(self):
+        return f"{self.path.stem}.{self.digest}{self.path.suffix}"
+
+    def url(self, prefix="/"):
+        return f"{prefix}{STATIC_ASSET_DIR}/{self.filename}"
+
+
+@lru_cache(maxsize=None)
+def get_assets():
+    """Source file name -> Asset for every file matching ASSET_PATTERNS, hashed once per process."""
+    return {
+        path.name: Asset(path)
+        for pattern in ASSET_PATTERNS for path in sorted(ROOT_DIR.glob(pattern)) if path.is_file()
+    }
+
+
+@lru_cache(maxsize=None)
+def asset_url(name, prefix="/"):
+    """The fingerprinted URL of a source file, e.g. asset_url("favicon.png", "../"); prefix + name when it is missing."""
+    asset = get_assets().get(name)
+    return asset.url(prefix) if asset else f"{prefix}{name}"
+
+
+def write_assets(output_dir, prune=True):
+    """
+    Copies the assets to their hashed names and, when prune is set, removes
+    stale copies (see stylesheets.write_stylesheets). Returns the paths written.
+    """
+    asset_dir = Path(output_dir) / STATIC_ASSET_DIR
+    asset_dir.mkdir(parents=True, exist_ok=True)
+    keep = {asset.filename for asset in get_assets().values()}
+    for stale in asset_dir.iterdir() if prune else ():
+        if stale.name not in keep:
+            stale.unlink()
+    written = []
+    for asset in get_assets().values():
+        path = asset_dir / asset.filename
+        if not path.exists():
+            shutil.copyfile(asset.path, path)
+            written.append(path)
+    return written
+
+
+# --- HEADERS ---
+
+def write_cache_headers(output_dir):
+    """
+    Writes the headers manifest: fingerprinted files are cached for a year
+    and never revalidated, HTML is revalidated on every visit (so a new
+    asset name takes effect at once), and the API entry point is cached briefly.
+    """
+    lines = []
+    for pattern, cache_control in CACHE_RULES:
+        lines.append(f"{pattern}\n  Cache-Control: {cache_control}\n")
+    path = Path(output_dir) / HEADERS_FILE
+    path.write_text('\n'.join(lines), encoding='utf-8')
+    return path
+
+
+def read_cache_headers(output_dir):
+    """The headers manifest as [(pattern, {name: value})], for a local preview server ([] when missing)."""
+    rules = []
+    try:
+        text = (Path(output_dir) / HEADERS_FILE).read_text(encoding='utf-8')
+    except OSError:
+        return rules
+    for line in text.splitlines():
+        if line.strip() and not line.startswith((' ', '\t')):
+            rules.append((line.strip(), {}))
+        elif ':' in line and rules:
+            name, value = line.split(':', 1)
+            rules[-1][1][name.strip()] = value.strip()
+    return rules
+
+
+def headers_for(rules, url_path):
+    """The headers of the first rule matching url_path (its path part, without the query)."""
+    url_path = url_path.split('?', 1)[0].split('#', 1)[0]
+    for pattern, headers in rules:
+        if fnmatchcase(url_path, pattern):
+            return headers
+    return {}
@@ -0,0 +1,254 @@
+"""
+Benchmark suite for the site builders on synthetic catalogs.
+
+For each catalog size, generates a catalog (see synthetic_catalog.py) and
+times, each in a fresh process and a fresh output folder:
+- build_site: the full build_site.main() run (cold caches, except the
+  encoded site images, which every case starts with: see warm_images)
+- build_site_lazy: the same with --lazy (two-pass catalog loading)
+- generator: SiteGenerator.run() from "python generate_site.py"
+- format_description: formatting every product description
+- collections: build_site.build_collection_page for every collection
+Reports throughput (pages/s, or descriptions/s) and the process's peak
+RSS, and writes the results as JSON tagged with the git commit so runs
+can be compared across commits with --compare.
+
+Usage: python benchmarks/bench_builders.py [--sizes 1000,10000] [--cases ...]
+                                           [--output FILE] [--compare BASELINE.json]
+"""
+import argparse
+import contextlib
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+try:
+    import resource
+except ImportError:  # Windows: peak memory is not reported
+    resource = None
+
+from synthetic_catalog import write_catalog
+
+CASES = ("build_site", "build_site_lazy", "generator", "format_description", "collections")
+DEFAULT_SIZES = "1000,10000"
+DEFAULT_TIMEOUT = 900  # Seconds per case; slower cases are recorded as timed out
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+CATALOG_FILES = ("products_detailed.json", "products.json", "collections.json")
+
+
+# --- CASES (run inside the worker process, with the output folder as cwd) ---
+
+def count_pages(patterns=("index.html", "search.html", "products/*.html",
+                          "collections/*.html", "collections/*/page-*.html")):
+    return sum(1 for pattern in patterns for _ in Path('.').glob(pattern))
+
+
+def run_build_site():
+    import build_site
+    build_site.main(['build'])
+    return count_pages()
+
+
+def run_build_site_lazy():
+    import build_site
+    build_site.main(['build', '--lazy'])
+    return count_pages()
+
+
+def run_generator():
+    spec = importlib.util.spec_from_file_location("generate_site", ROOT / "python generate_site.py")
+    generate_site = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(generate_site)
+    generate_site.SiteGenerator().run()
+    return count_pages()
+
+
+def run_format_description():
+    import build_site
+    from description_format import render_description
+    catalog = build_site.load_catalog()
+    start = time.perf_counter()
+    for product in catalog:
+        render_description(product.description)
+    return len(catalog), time.perf_counter() - start
+
+
+def run_collections():
+    import build_site
+    catalog = build_site.load_catalog()
+    os.makedirs("collections", exist_ok=True)
+    start = time.perf_counter()
+    for name in catalog.collections:
+        build_site.build_collection_page(name, catalog)
+    return count_pages(("collections/*.html", "collections/*/page-*.html")), time.perf_counter() - start
+
+
+CASE_FUNCTIONS = {
+    "build_site": run_build_site,
+    "build_site_lazy": run_build_site_lazy,
+    "generator": run_generator,
+    "format_description": run_format_description,
+    "collections": run_collections,
+}
+CASE_UNITS = {"format_description": "descriptions"}
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)  # bytes on macOS, KiB elsewhere
+
+
+def worker(case):
+    """Runs one case and prints its result as a JSON line (builder output goes to /dev/null)."""
+    start = time.perf_counter()
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+        result = CASE_FUNCTIONS[case]()
+    # Cases that exclude their setup return (pages, seconds)
+    pages, seconds = result if isinstance(result, tuple) else (result, time.perf_counter() - start)
+    print(json.dumps({'pages': pages, 'seconds': seconds, 'peak_mb': peak_rss_mb()}))
+
+
+# --- DRIVER ---
+
+def warm_images(warm_dir):
+    """
+    Encodes the site images (images.optimize_images) once into warm_dir.
+    Their cold encoding takes seconds and does not depend on the catalog, so
+    it would swamp the page timings; cases start from a copy instead, like
+    an incremental build.
+    """
+    from images import optimize_images
+    optimize_images(warm_dir)
+
+
+def run_case(case, catalog_dir, timeout=DEFAULT_TIMEOUT, warm_dir=None):
+    """
+    Runs case in a fresh process and output folder that links to the generated
+    catalog (and starts with a copy of warm_dir). Returns the worker's
+    measurements, or None when it timed out.
+    """
+    with tempfile.TemporaryDirectory(prefix=f"bench-{case}-") as out_dir:
+        if warm_dir:
+            shutil.copytree(warm_dir, out_dir, dirs_exist_ok=True)
+        for name in CATALOG_FILES:
+            try:
+                os.symlink(Path(catalog_dir) / name, Path(out_dir) / name)
+            except OSError:
+                shutil.copy(Path(catalog_dir) / name, out_dir)
+        try:
+            completed = subprocess.run(
+                [sys.executable, __file__, '--worker', case], cwd=out_dir,
+                capture_output=True, text=True, check=False, timeout=timeout
+            )
+        except subprocess.TimeoutExpired:
+            return None
+    if completed.returncode != 0:
+        raise RuntimeError(f"{case} failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    """Prints throughput and peak memory changes against a previous results file."""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    before = {(r['case'], r['products']): r for r in baseline['results']}
+    print(f"\n📊 Compared with {baseline.get('commit') or baseline_path}:")
+    for result in results:
+        old = before.get((result['case'], result['products']))
+        if not old or not result['per_second'] or not old['per_second']:
+            continue
+        speed = (result['per_second'] / old['per_second'] - 1) * 100
+        memory = ''
+        if result['peak_mb'] and old.get('peak_mb'):
+            memory = f"   peak memory {(result['peak_mb'] / old['peak_mb'] - 1) * 100:+.1f}%"
+        print(f"   {result['case']:<20}{result['products']:>9}   throughput {speed:+.1f}%{memory}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help='comma-separated catalog sizes (1k-1M)')
+    parser.add_argument('--cases', default=','.join(CASES), help=f"comma-separated subset of {', '.join(CASES)}")
+    parser.add_argument('--collections', type=int, default=12)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help='seconds allowed per case')
+    parser.add_argument('--output', help='results file (default benchmarks/results/<commit>.json)')
+    parser.add_argument('--compare', metavar='BASELINE', help='earlier results file to compare against')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        return worker(args.worker)
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    cases = [case for case in args.cases.split(',') if case]
+    unknown = set(cases) - set(CASES)
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(sorted(unknown))}")
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="bench-images-") as warm_dir:
+        warm_images(warm_dir)
+        for size in sizes:
+            with tempfile.TemporaryDirectory(prefix="bench-catalog-") as catalog_dir:
+                start = time.perf_counter()
+                write_catalog(catalog_dir, size, args.collections, args.seed)
+                print(f"\n📦 {size} products (generated in {time.perf_counter() - start:.1f} s)")
+                for case in cases:
+                    measured = run_case(case, catalog_dir, args.timeout, warm_dir)
+                    unit = CASE_UNITS.get(case, "pages")
+                    if measured is None:
+                        results.append({'case': case, 'products': size, 'unit': unit, 'pages': None,
+                                        'seconds': args.timeout, 'peak_mb': None, 'per_second': None,
+                                        'timed_out': True})
+                        print(f"   {case:<20}timed out after {args.timeout:.0f} s")
+                        continue
+                    per_second = measured['pages'] / measured['seconds'] if measured['seconds'] else 0
+                    results.append({'case': case, 'products': size, 'unit': unit, **measured,
+                                    'per_second': round(per_second, 1)})
+                    peak = f"{measured['peak_mb']:>8.1f} MB peak" if measured['peak_mb'] else ''
+                    print(f"   {case:<20}{measured['pages']:>9} {unit:<13}{measured['seconds']:>9.2f} s"
+                          f"{per_second:>11.0f} {unit}/s{peak:>18}")
+
+    commit = git_commit()
+    report = {
+        'commit': commit,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'collections': args.collections,
+        'results': results,
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{commit or 'results'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Results written to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark for the product description formatter.
+
+Times the original line-by-line formatter (kept below for reference)
+against description_format.render_description over large synthetic
+descriptions: as generated, where most lines contain an '&' to escape
+(which the original formatter never did), and as plain text.
+
+Usage: python benchmarks/bench_descriptions.py [--count N] [--lines N]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from description_format import render_description
+
+WORDS = ("coloring page printable instant download kawaii cute animals christmas elf "
+         "unicorn soccer golf kids teens adults pdf print home relax creative fun "
+         "detailed simple designs holiday gift classroom party &").split()
+BULLETS = ('✨', '✓', '•', '-', '📄', '🖨️', '→')
+
+
+def legacy_format_description(description):
+    """The pre-optimisation build_site.format_description, for comparison."""
+    if not description:
+        return ""
+    lines = description.split('\n')
+    formatted_html = []
+    in_list = False
+    current_paragraph = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            if current_paragraph:
+                formatted_html.append(f"<p>{''.join(current_paragraph)}</p>")
+                current_paragraph = []
+            if in_list:
+                formatted_html.append("</ul>")
+                in_list = False
+            continue
+        if line.endswith(':') or (len(line) < 60 and line[0].isupper() and not line.endswith('.')):
+            if current_paragraph:
+                formatted_html.append(f"<p>{''.join(current_paragraph)}</p>")
+                current_paragraph = []
+            if in_list:
+                formatted_html.append("</ul>")
+                in_list = False
+            formatted_html.append(f"<h4 style='margin-top: 1.5rem; margin-bottom: 0.5rem; font-weight: 600; color: var(--primary);'>{line}</h4>")
+            continue
+        if line.startswith(('✨', '✓', '✦', '📄', '🖨️', '📏', '💝', '•', '-', '*', '→')):
+            if current_paragraph:
+                formatted_html.append(f"<p>{''.join(current_paragraph)}</p>")
+                current_paragraph = []
+            if not in_list:
+                formatted_html.append("<ul style='margin-left: 1.5rem; margin-bottom: 1rem; list-style-type: none;'>")
+                in_list = True
+            formatted_html.append(f"<li style='margin-bottom: 0.5rem;'>{line}</li>")
+            continue
+        if in_list:
+            formatted_html.append("</ul>")
+            in_list = False
+        current_paragraph.append(line + ' ')
+    if current_paragraph:
+        formatted_html.append(f"<p>{''.join(current_paragraph)}</p>")
+    if in_list:
+        formatted_html.append("</ul>")
+    return ''.join(formatted_html)
+
+
+def synthetic_description(rng, lines):
+    """A description mixing headings, bullet lists and multi-line paragraphs."""
+    out = []
+    while len(out) < lines:
+        kind = rng.random()
+        if kind < 0.15:
+            out.extend(['', rng.choice(WORDS).title() + ' ' + ' '.join(rng.choices(WORDS, k=3)) + ':'])
+        elif kind < 0.5:
+            out.extend(f"{rng.choice(BULLETS)} {' '.join(rng.choices(WORDS, k=rng.randint(4, 12)))}"
+                       for _ in range(rng.randint(2, 6)))
+        else:
+            out.extend(' '.join(rng.choices(WORDS, k=rng.randint(8, 25))) + '.' for _ in range(rng.randint(1, 4)))
+            out.append('')
+    return '\n'.join(out[:lines])
+
+
+def time_all(fn, descriptions, repeat):
+    """Best of `repeat` runs."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for d in descriptions:
+            fn(d)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--count', type=int, default=2000, help='number of descriptions')
+    parser.add_argument('--lines', type=int, default=200, help='lines per description')
+    parser.add_argument('--repeat', type=int, default=3, help='best of N runs')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    descriptions = [synthetic_description(rng, args.lines) for _ in range(args.count)]
+    total_mb = sum(len(d.encode('utf-8')) for d in descriptions) / 1e6
+    print(f"⏱️  Formatting {args.count} descriptions x {args.lines} lines ({total_mb:.1f} MB)\n")
+
+    plain = [d.replace('&', 'and') for d in descriptions]
+    for title, texts in [("with '&' to escape", descriptions), ("plain text", plain)]:
+        legacy = time_all(legacy_format_description, texts, args.repeat)
+        single_pass = time_all(render_description, texts, args.repeat)
+        print(f"   {title}:")
+        for label, seconds in [("legacy formatter", legacy), ("single-pass formatter", single_pass)]:
+            print(f"     {label:<28}{seconds * 1000:>9.1f} ms  {seconds / args.count * 1e6:>8.1f} µs/desc"
+                  f"  {legacy / seconds:>6.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,601 @@
+"""
+Micro-benchmark for per-page render cost.
+
+Times the template engine against hand-written f-strings on the same
+layout with the same values: each page's template and slot values are
+captured from build_site, and the layout is also written out as a single
+f-string (fstring_layout), the way the old builders wrote theirs.
+
+Also times the f-string page builders that preceded the templates (kept
+below for reference, returning the page instead of writing it) against
+the current builders. Those pages carry less (no stylesheet links, fonts,
+srcsets, related products or resource hints), so that table compares
+pages, not engines. Both format descriptions with
+build_site.format_description (the formatter has its own benchmark).
+Finally reports what the resource hints (resource_hints.py) add to each
+page type: render time and bytes.
+
+Usage: python benchmarks/bench_render.py [--repeat N]
+"""
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import build_site
+import resource_hints
+import templates
+from catalog import CatalogIndex
+from catalog_stream import load_products
+
+
+def fstring_layout(name):
+    """
+    The template written out as one f-string function, includes inlined,
+    without going through templates.Template: the baseline for the engine.
+    """
+    def source(name):
+        text = templates.read_template_source(name)
+        out, pos = [], 0
+        for match in templates.TOKEN_RE.finditer(text):
+            out.append(text[pos:match.start()].replace('{', '{{').replace('}', '}}'))
+            slot, include = match.groups()
+            out.append(f"{{{slot}}}" if slot else source(include))
+            pos = match.end()
+        out.append(text[pos:].replace('{', '{{').replace('}', '}}'))
+        return ''.join(out)
+
+    slots = sorted(templates.get_template(name).slot_names)
+    return eval(f"lambda *, {''.join(slot + ', ' for slot in slots)}**_: f{source(name)!r}")
+
+
+def capture(render_page):
+    """(template name, slot values) of the page render_page streams, iterable slots joined."""
+    calls = []
+    stream = build_site.stream_template
+    build_site.stream_template = lambda name, **context: calls.append((name, context)) or stream(name, **context)
+    try:
+        ''.join(render_page())
+    finally:
+        build_site.stream_template = stream
+    name, context = calls[0]
+    return name, {slot: value if isinstance(value, str) or not hasattr(value, '__iter__') else ''.join(value)
+                  for slot, value in context.items()}
+
+
+# --- REFERENCE: the f-string builders before templates/site/ ---
+
+def legacy_product_image(product):
+    """
+    Smart image getter with multiple fallbacks
+    Returns the best available image URL
+    """
+    # Try images array first
+    if product.get('images') and len(product['images']) > 0:
+        return product['images'][0]
+
+    # Fall back to single image field
+    if product.get('image') and product['image']:
+        return product['image']
+
+    # Last resort: placeholder
+    return 'https://placehold.co/600x600/e2e8f0/4a5568?text=No+Image+Available'
+
+
+def legacy_product_images(product):
+    """
+    Returns array of all available images for gallery
+    """
+    # Try images array first
+    if product.get('images') and len(product['images']) > 0:
+        return product['images']
+
+    # Fall back to single image field
+    if product.get('image') and product['image']:
+        return [product['image']]
+
+    # Return empty array if no images
+    return []
+
+
+def legacy_get_head(title, description, url, image):
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <meta name="description" content="{description}">
+    <title>{title} | Scribble Patch Designs</title>
+    <link rel="icon" type="image/png" href="/favicon.png">
+
+    <!-- Open Graph -->
+    <meta property="og:title" content="{title}">
+    <meta property="og:description" content="{description}">
+    <meta property="og:image" content="{image}">
+    <meta property="og:url" content="{url}">
+    <meta property="og:type" content="website">
+
+    <style>
+        @import url('https://fonts.googleapis.com/css2?family=Fredoka:wght@500&family=Poppins:wght@300;400;500;600&display=swap');
+
+        :root {{
+            --primary: #2d3748;
+            --accent: #667eea;
+            --accent-hover: #5a67d8;
+            --bg-color: #ffffff;
+            --bg-secondary: #f7fafc;
+            --border: #e2e8f0;
+            --soft-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.05), 0 2px 4px -1px rgba(0, 0, 0, 0.03);
+        }}
+
+        html {{ scroll-behavior: smooth; }}
+        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
+
+        body {{
+            font-family: 'Poppins', sans-serif;
+            line-height: 1.7;
+            color: var(--primary);
+            background-color: var(--bg-color);
+            background-image: radial-gradient(#e2e8f0 1px, transparent 1px);
+            background-size: 24px 24px;
+        }}
+
+        .container {{ max-width: 1100px; margin: 0 auto; padding: 0 24px; }}
+        img {{ max-width: 100%; display: block; }}
+
+        /* Navigation */
+        nav {{
+            background: rgba(255, 255, 255, 0.95);
+            backdrop-filter: blur(8px);
+            padding: 1rem 0;
+            position: sticky;
+            top: 0;
+            z-index: 1000;
+            border-bottom: 1px solid var(--border);
+        }}
+        .nav-wrapper {{ display: flex; justify-content: space-between; align-items: center; }}
+        .nav-logo {{ font-family: 'Fredoka', sans-serif; font-size: 1.25rem; color: var(--primary); text-decoration: none; }}
+        .nav-links {{ display: flex; gap: 2rem; }}
+        .nav-links a {{ color: var(--primary); text-decoration: none; font-weight: 500; transition: color 0.2s; }}
+        .nav-links a:hover {{ color: var(--accent); }}
+
+        /* Product Grids */
+        .product-grid {{
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(280px, 1fr));
+            gap: 2rem;
+            margin: 2rem 0;
+        }}
+        .product-card {{
+            background: white; border-radius: 12px; overflow: hidden; border: 1px solid var(--border);
+            text-decoration: none; color: inherit; transition: transform 0.3s ease, box-shadow 0.3s ease;
+            display: flex; flex-direction: column; text-align: left;
+        }}
+        .product-card:hover {{ transform: translateY(-5px); box-shadow: 0 12px 20px rgba(0,0,0,0.08); }}
+        .product-image {{ width: 100%; aspect-ratio: 1/1; object-fit: cover; background: #f1f5f9; }}
+        .product-info {{ padding: 1.25rem; flex-grow: 1; }}
+        .product-title {{ font-weight: 600; font-size: 1rem; margin-bottom: 0.75rem; line-height: 1.4; }}
+        .product-footer {{ display: flex; justify-content: flex-end; align-items: center; margin-top: auto; }}
+        .buy-link {{ font-size: 0.875rem; font-weight: 600; color: var(--accent); }}
+
+        /* Footer */
+        footer {{ background: white; border-top: 1px solid var(--border); padding: 2rem 0; text-align: center; margin-top: 4rem; color: #718096; }}
+
+        /* --- Page Specific Styles --- */
+
+        /* Product Details */
+        .breadcrumb {{ margin: 2rem 0; font-size: 0.9rem; color: #718096; }}
+        .breadcrumb a {{ color: var(--accent); text-decoration: none; }}
+
+        .product-detail-wrapper {{ display: grid; grid-template-columns: 1fr 1fr; gap: 4rem; padding-bottom: 4rem; }}
+        .gallery-main {{ width: 100%; border-radius: 16px; margin-bottom: 1rem; border: 1px solid var(--border); }}
+        .gallery-thumbs {{ display: flex; gap: 10px; overflow-x: auto; padding-bottom: 5px; }}
+        .gallery-thumb {{ width: 80px; height: 80px; object-fit: cover; border-radius: 8px; cursor: pointer; border: 2px solid transparent; transition: all 0.2s; }}
+        .gallery-thumb:hover, .gallery-thumb.active {{ border-color: var(--accent); opacity: 0.8; }}
+
+        .pd-title {{ font-family: 'Fredoka', sans-serif; font-size: 2.5rem; line-height: 1.2; margin-bottom: 1rem; }}
+        .pd-price {{ font-size: 1.5rem; color: var(--accent); font-weight: 600; margin-bottom: 2rem; }}
+        .pd-desc {{ color: #4a5568; margin-bottom: 2rem; line-height: 1.8; }}
+        .pd-desc p {{ margin-bottom: 1rem; }}
+        .pd-desc h4 {{ margin-top: 1.5rem; margin-bottom: 0.5rem; font-weight: 600; color: var(--primary); }}
+        .pd-desc ul {{ margin-left: 1.5rem; margin-bottom: 1rem; }}
+        .pd-desc li {{ margin-bottom: 0.5rem; }}
+        .btn-primary {{
+            background: var(--accent); color: white; padding: 1rem 2rem; border-radius: 8px;
+            text-decoration: none; font-weight: 600; display: inline-block; transition: background 0.2s;
+            text-align: center; width: 100%;
+        }}
+        .btn-primary:hover {{ background: var(--accent-hover); }}
+
+        /* Collection Header */
+        .collection-header {{ padding: 4rem 0; text-align: center; }}
+        .collection-header h1 {{ font-family: 'Fredoka', sans-serif; font-size: 3rem; margin-bottom: 1rem; }}
+
+        @media (max-width: 768px) {{
+            .product-detail-wrapper {{ grid-template-columns: 1fr; gap: 2rem; }}
+            .pd-title {{ font-size: 2rem; }}
+            .nav-links {{ display: none; }}
+        }}
+    </style>
+</head>
+<body>
+    <nav>
+        <div class="container nav-wrapper">
+            <a href="/" class="nav-logo">Scribble Patch Designs</a>
+            <div class="nav-links">
+                <a href="/">Home</a>
+                <a href="/#products">All Products</a>
+                <a href="https://www.etsy.com/shop/ScribblePatchDesigns" target="_blank">Etsy Store</a>
+            </div>
+        </div>
+    </nav>
+"""
+
+
+def legacy_get_footer():
+    return """
+    <footer>
+        <div class="container">
+            <p>&copy; 2026 Scribble Patch Designs. Created with ♥ for the creative community.</p>
+        </div>
+    </footer>
+</body>
+</html>
+"""
+
+
+def legacy_product_card(product):
+    """Generates a product card with proper image handling"""
+    link = f"/products/{product['slug']}.html"
+    img_src = legacy_product_image(product)
+
+    return f"""
+    <a href="{link}" class="product-card">
+        <img src="{img_src}" alt="{product['title']}" class="product-image" loading="lazy">
+        <div class="product-info">
+            <div class="product-title">{product['title']}</div>
+            <div class="product-footer">
+                <span class="buy-link">View Details →</span>
+            </div>
+        </div>
+    </a>
+    """
+
+
+def legacy_product_page(product, all_products):
+    """build_site.build_product_page before the templates, returning the page."""
+
+    # Get images with fallback handling
+    images = legacy_product_images(product)
+
+    if images:
+        main_img = images[0]
+        thumbs_html = ""
+        for i, img in enumerate(images):
+            active_class = "active" if i == 0 else ""
+            thumbs_html += f'<img src="{img}" class="gallery-thumb {active_class}" onclick="switchImage(this, \'{img}\')">'
+    else:
+        main_img = legacy_product_image(product)
+        thumbs_html = ""
+
+    # Format description with proper structure
+    desc_html = build_site.format_description(product.get('description', ''))
+
+    html = legacy_get_head(
+        title=product['title'],
+        description=product.get('metaDescription') or product['title'],
+        url=f"https://www.scribblepatchdesigns.com/products/{product['slug']}",
+        image=main_img
+    )
+
+    html += f"""
+    <div class="container">
+        <div class="breadcrumb">
+            <a href="/">Home</a> > <a href="/#products">Products</a> > {product['title']}
+        </div>
+
+        <div class="product-detail-wrapper">
+            <!-- Left: Gallery -->
+            <div class="gallery-section">
+                <img src="{main_img}" id="mainImage" class="gallery-main" alt="{product['title']}">
+                <div class="gallery-thumbs">
+                    {thumbs_html}
+                </div>
+            </div>
+
+            <!-- Right: Info -->
+            <div class="info-section">
+                <h1 class="pd-title">{product['title']}</h1>
+                <div class="pd-price">{product.get('price', '')}</div>
+
+                <a href="{product.get('shareLink', '#')}" target="_blank" class="btn-primary">
+                    Buy Instant Download on Etsy
+                </a>
+
+                <div style="margin-top: 2rem; padding: 1.5rem; background: var(--bg-secondary); border-radius: 12px;">
+                    <strong>✨ Instant Digital Download</strong>
+                    <ul style="margin-left: 1.5rem; margin-top: 0.5rem; font-size: 0.95rem; color: #4a5568;">
+                        <li>High-resolution PDF files</li>
+                        <li>Print at home immediately</li>
+                        <li>No shipping fees</li>
+                    </ul>
+                </div>
+
+                <h3 style="margin: 2rem 0 1rem;">Description</h3>
+                <div class="pd-desc">{desc_html}</div>
+            </div>
+        </div>
+    </div>
+
+    <script>
+        function switchImage(thumb, src) {{
+            document.getElementById('mainImage').src = src;
+            document.querySelectorAll('.gallery-thumb').forEach(t => t.classList.remove('active'));
+            thumb.classList.add('active');
+        }}
+    </script>
+    """
+
+    html += legacy_get_footer()
+
+    return html
+
+
+def legacy_collection_page(collection_name, product_ids, all_products):
+    """build_site.build_collection_page before the templates, returning the page."""
+    slug = collection_name.lower().replace(" ", "-")
+
+    collection_products = [p for p in all_products if p['listingId'] in product_ids]
+
+    if not collection_products:
+        return ""
+
+    grid_html = '<div class="product-grid">'
+    for p in collection_products:
+        grid_html += legacy_product_card(p)
+    grid_html += '</div>'
+
+    first_product = collection_products[0]
+    header_image = legacy_product_image(first_product)
+
+    html = legacy_get_head(
+        title=f"{collection_name.title()} Coloring Pages",
+        description=f"Browse our collection of {collection_name} coloring pages.",
+        url=f"https://www.scribblepatchdesigns.com/collections/{slug}",
+        image=header_image
+    )
+
+    html += f"""
+    <div class="collection-header">
+        <div class="container">
+            <span style="text-transform: uppercase; letter-spacing: 2px; color: var(--accent); font-weight: 600;">Collection</span>
+            <h1>{collection_name.title()} Coloring Pages</h1>
+            <p>Explore our unique printable designs.</p>
+        </div>
+    </div>
+
+    <div class="container">
+        {grid_html}
+    </div>
+    """
+
+    html += legacy_get_footer()
+
+    return html
+
+
+def legacy_home_page(products, collections_data):
+    """build_site.build_home_page before the templates, returning the page."""
+
+    coll_html = '<div style="display: flex; gap: 0.5rem; justify-content: center; flex-wrap: wrap; margin-top: 1.5rem;">'
+    for name in collections_data.keys():
+        slug = name.lower().replace(" ", "-")
+        coll_html += f'<a href="collections/{slug}.html" class="btn-outline" style="color: var(--primary); border-color: var(--border); font-size: 0.8rem;">{name.title()}</a>'
+    coll_html += '</div>'
+
+    grid_html = ""
+    for p in products[:8]:
+        img_src = legacy_product_image(p)
+        link = f"products/{p['slug']}.html"
+
+        grid_html += f"""
+        <a href="{link}" class="product-card">
+            <img src="{img_src}" alt="{p['title']}" class="product-image" loading="lazy">
+            <div class="product-info">
+                <div class="product-title">{p['title']}</div>
+                <div class="product-footer">
+                    <span class="buy-link">View Details →</span>
+                </div>
+            </div>
+        </a>
+        """
+
+    html = f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <meta name="description" content="Instant PDF coloring pages from £1.44! Premium printable designs for adults & kids.">
+    <title>Premium Printable Coloring Pages | Scribble Patch Designs</title>
+    <link rel="icon" type="image/png" href="favicon.png">
+    <style>
+        @import url('https://fonts.googleapis.com/css2?family=Fredoka:wght@500&family=Poppins:wght@300;400;500;600&display=swap');
+        :root {{ --primary: #2d3748; --accent: #667eea; --accent-hover: #5a67d8; --bg-color: #ffffff; --bg-secondary: #f7fafc; --border: #e2e8f0; --soft-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.05), 0 2px 4px -1px rgba(0, 0, 0, 0.03); }}
+        html {{ scroll-behavior: smooth; }}
+        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
+        body {{ font-family: 'Poppins', sans-serif; line-height: 1.7; color: var(--primary); background-color: var(--bg-color); background-image: radial-gradient(#e2e8f0 1px, transparent 1px); background-size: 24px 24px; }}
+        .container {{ max-width: 1100px; margin: 0 auto; padding: 0 24px; }}
+        nav {{ background: rgba(255, 255, 255, 0.95); backdrop-filter: blur(8px); padding: 1rem 0; position: sticky; top: 0; z-index: 1000; border-bottom: 1px solid var(--border); }}
+        .nav-wrapper {{ display: flex; justify-content: space-between; align-items: center; }}
+        .nav-logo {{ font-family: 'Fredoka', sans-serif; font-size: 1.25rem; color: var(--primary); text-decoration: none; }}
+        .nav-links {{ display: flex; gap: 2rem; }}
+        .nav-links a {{ color: var(--primary); text-decoration: none; font-weight: 500; font-size: 0.9rem; transition: color 0.2s; }}
+        .nav-links a:hover {{ color: var(--accent); }}
+        .hero {{ padding: 4rem 0 2rem; text-align: center; }}
+        .hero h1 {{ font-family: 'Fredoka', sans-serif; font-size: 2.75rem; line-height: 1.2; margin-bottom: 1rem; letter-spacing: -1px; }}
+        .hero p {{ font-size: 1.125rem; color: #4a5568; max-width: 650px; margin: 0 auto 1.5rem; }}
+        .eyebrow {{ text-transform: uppercase; font-size: 0.85rem; font-weight: 600; letter-spacing: 2px; color: var(--accent); display: block; margin-bottom: 1rem; }}
+
+        .product-grid {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(280px, 1fr)); gap: 2rem; margin-top: 2rem; }}
+        .product-card {{ background: white; border-radius: 12px; overflow: hidden; border: 1px solid var(--border); text-decoration: none; color: inherit; transition: transform 0.3s ease, box-shadow 0.3s ease; display: flex; flex-direction: column; text-align: left; }}
+        .product-card:hover {{ transform: translateY(-5px); box-shadow: 0 12px 20px rgba(0,0,0,0.08); }}
+        .product-image {{ width: 100%; aspect-ratio: 1/1; object-fit: cover; background: #f1f5f9; }}
+        .product-info {{ padding: 1.25rem; flex-grow: 1; }}
+        .product-title {{ font-weight: 600; font-size: 1rem; margin-bottom: 0.75rem; line-height: 1.4; display: -webkit-box; -webkit-line-clamp: 2; -webkit-box-orient: vertical; overflow: hidden; }}
+        .product-footer {{ display: flex; justify-content: flex-end; align-items: center; }}
+        .buy-link {{ font-size: 0.875rem; font-weight: 600; color: var(--accent); }}
+
+        .btn-outline {{ display: inline-block; background: transparent; padding: 8px 16px; border-radius: 8px; text-decoration: none; font-weight: 500; border: 1px solid; transition: all 0.2s; }}
+        .btn-outline:hover {{ background: rgba(0,0,0,0.05); }}
+
+        footer {{ background: white; border-top: 1px solid var(--border); padding: 2rem 0; text-align: center; font-size: 0.9rem; color: #718096; margin-top: 4rem; }}
+
+        @media (max-width: 768px) {{
+            .hero h1 {{ font-size: 2rem; }}
+            .nav-links {{ display: none; }}
+            .product-grid {{ grid-template-columns: repeat(2, 1fr); gap: 0.5rem; }}
+        }}
+    </style>
+</head>
+<body>
+
+    <nav>
+        <div class="container nav-wrapper">
+            <a href="index.html" class="nav-logo">Scribble Patch Designs</a>
+            <div class="nav-links">
+                <a href="#products">Products</a>
+                <a href="#about">About</a>
+                <a href="https://www.etsy.com/shop/ScribblePatchDesigns" target="_blank">Etsy Store</a>
+            </div>
+        </div>
+    </nav>
+
+    <header class="hero">
+        <div class="container">
+            <div class="hero-text-content">
+                <span class="eyebrow">Instant Digital Downloads</span>
+                <h1>Premium Printable Coloring Pages</h1>
+                <p>High-quality PDF coloring pages from £1.44. Instant download, print at home. Featuring Kawaii animals, Christmas themes, Sports, and Fantasy designs.</p>
+
+                {coll_html}
+            </div>
+        </div>
+    </header>
+
+    <div class="container">
+        <h2 id="products" style="font-size: 1.75rem; margin-bottom: 1rem; font-weight: 600; text-align:center;">Our Coloring Page Collection</h2>
+
+        <div class="product-grid">
+            {grid_html}
+        </div>
+    </div>
+
+    <section id="about" style="padding: 4rem 0; background: white; margin-top: 4rem; border-top: 1px solid var(--border);">
+        <div class="container" style="text-align: center;">
+            <h2 style="font-family: 'Fredoka', sans-serif; font-size: 2rem; margin-bottom: 1rem;">Why Scribble Patch?</h2>
+            <p style="max-width: 700px; margin: 0 auto; color: #4a5568;">
+                We create premium printable coloring pages that bring joy to colorists of all ages. 
+                From niche sports like Golf and Soccer to cute Kawaii animals and festive Christmas themes.
+            </p>
+        </div>
+    </section>
+
+    <footer>
+        <div class="container">
+            <p>&copy; 2026 Scribble Patch Designs.</p>
+        </div>
+    </footer>
+
+</body>
+</html>
+    """
+    return html
+
+
+def time_per_page(fn, pages, repeat):
+    seconds = timeit.timeit(fn, number=repeat)
+    return seconds / repeat / pages * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=500)
+    args = parser.parse_args()
+
+    with open(ROOT / build_site.PRODUCTS_JSON, 'r', encoding='utf-8') as f:
+        raw_products = json.load(f)['products']
+    with open(ROOT / build_site.COLLECTIONS_JSON, 'r', encoding='utf-8') as f:
+        collections = json.load(f)['collections']
+    products = load_products(ROOT / build_site.PRODUCTS_JSON)
+    catalog = CatalogIndex(products, collections)
+    coll_products = {name: catalog.collection(name) for name in collections}
+    coll_products = {name: ps for name, ps in coll_products.items() if ps}
+
+    # page -> (templates, f-strings, pages rendered per call)
+    cases = {
+        'product': (
+            lambda: [''.join(build_site.render_product_page(p, catalog)) for p in products],
+            lambda: [legacy_product_page(p, raw_products) for p in raw_products],
+            len(products),
+        ),
+        'collection': (
+            lambda: [''.join(build_site.render_collection_page(n, ps, catalog)) for n, ps in coll_products.items()],
+            lambda: [legacy_collection_page(n, collections[n]['listingIds'], raw_products) for n in coll_products],
+            len(coll_products),
+        ),
+        'home': (
+            lambda: ''.join(build_site.render_home_page(catalog)),
+            lambda: legacy_home_page(raw_products, collections),
+            1,
+        ),
+    }
+
+    # The template engine alone: one page of each type, same layout and values both ways
+    repeat = args.repeat * 20
+    layouts = {
+        'product': capture(lambda: build_site.render_product_page(products[0], catalog)),
+        'collection': capture(lambda: build_site.render_collection_page(*next(iter(coll_products.items())), catalog)),
+        'home': capture(lambda: build_site.render_home_page(catalog)),
+    }
+    print(f"⏱️  Same layout and values ({repeat} runs)\n")
+    print(f"   {'page':<12}{'f-string':>12}{'render':>12}{'stream':>12}{'ratio':>10}")
+    for page, (name, context) in layouts.items():
+        fstring = fstring_layout(name)
+        assert fstring(**context) == templates.render(name, **context) == ''.join(templates.stream(name, **context))
+        before = time_per_page(lambda: fstring(**context), 1, repeat)
+        rendered = time_per_page(lambda: templates.render(name, **context), 1, repeat)
+        streamed = time_per_page(lambda: ''.join(templates.stream(name, **context)), 1, repeat)
+        print(f"   {page:<12}{before:>10.1f}µs{rendered:>10.1f}µs{streamed:>10.1f}µs{streamed / before:>9.2f}x")
+
+    print(f"\n⏱️  Whole pages, old builders vs current ({args.repeat} runs, {len(products)} products)\n")
+    print(f"   {'page':<12}{'f-strings':>12}{'templates':>12}{'ratio':>10}")
+    for page, (fn, legacy, count) in cases.items():
+        before = time_per_page(legacy, count, args.repeat)
+        after = time_per_page(fn, count, args.repeat)
+        print(f"   {page:<12}{before:>10.1f}µs{after:>10.1f}µs{after / before:>9.2f}x")
+
+    # Resource hints: the same pages with every hint switched off
+    settings = {'PRECONNECT': False, 'PRELOAD_LCP': False, 'PREFETCH_PAGES': 0}
+    print(f"\n🔗 Resource hints (preconnect, LCP preload, {resource_hints.PREFETCH_PAGES} prefetched links)\n")
+    print(f"   {'page':<12}{'with':>12}{'without':>12}{'+ bytes':>10}")
+    for page, (fn, _, count) in cases.items():
+        with_hints = time_per_page(fn, count, args.repeat)
+        size = len(''.join(map(str, fn()))) / count
+        saved = {name: getattr(resource_hints, name) for name in settings}
+        for name, value in settings.items():
+            setattr(resource_hints, name, value)
+        try:
+            without = time_per_page(fn, count, args.repeat)
+            size -= len(''.join(map(str, fn()))) / count
+        finally:
+            for name, value in saved.items():
+                setattr(resource_hints, name, value)
+        print(f"   {page:<12}{with_hints:>10.1f}µs{without:>10.1f}µs{size:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Synthetic catalog generator for benchmarking the site builders at scale.
+
+Writes products_detailed.json (build_site.py), products.json (the
+generator) and collections.json with COUNT products. Titles, tags and
+multi-section descriptions are drawn from the shop's own vocabulary,
+products have 1-10 gallery images, and collection membership overlaps
+the way the real catalog does (a product sits in 1-3 themed collections,
+popular themes are much larger than niche ones). Products are streamed to
+disk, so a 1M-product catalog does not have to fit in memory twice.
+
+Usage: python benchmarks/synthetic_catalog.py OUT_DIR [--count N] [--collections N] [--seed N]
+"""
+import argparse
+import json
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench_descriptions import synthetic_description
+
+THEMES = ("kawaii christmas animals kids fantasy sports halloween easter ocean dinosaurs "
+          "space mandala flowers farm unicorn cats dogs food vehicles fairy winter summer "
+          "princess robots birds insects jungle mermaid dragons autumn").split()
+SUBJECTS = ("elf unicorn seal cat dog bunny panda dragon fox owl penguin reindeer santa "
+            "footballer golfer mermaid robot rocket dinosaur bee butterfly cupcake tractor").split()
+FORMATS = ("Coloring Pages", "Printable Activity Book", "Colouring Book PDF", "Coloring Sheets",
+           "Instant Download", "Printable PDF", "Activity Pages for Kids")
+AUDIENCES = ("for Kids", "for Teens", "for Adults", "for Kids and Teens", "Classroom Activity", "Holiday Gift")
+IMAGE_BASE = "https://i.etsystatic.com/62598625/r/il/"
+PRICES = ("£1.56", "£2.10", "£2.99", "£3.45", "£4.50", "£5.99", "£7.25")
+
+
+def theme_weights(count):
+    """Zipf-like popularity: the first themes are much larger collections than the last."""
+    return [1 / (rank + 1) ** 0.8 for rank in range(count)]
+
+
+def synthetic_product(rng, n, themes, weights):
+    """One products_detailed.json record; its collections are picked from themes."""
+    listing_id = str(4300000000 + n)
+    picked = list(dict.fromkeys(rng.choices(themes, weights, k=rng.choice((1, 1, 2, 2, 3)))))
+    subject = rng.choice(SUBJECTS)
+    title = (f"{picked[0].title()} {rng.choice(FORMATS)} - {' '.join(t.title() for t in picked[1:])} "
+             f"{subject.title()} - {rng.choice(FORMATS)} {rng.choice(AUDIENCES)}").replace('  ', ' ')
+    slug = f"{'-'.join(title.lower().replace('-', ' ').split())}-{n}"
+    images = [f"{IMAGE_BASE}{rng.getrandbits(24):06x}/{listing_id}{i}/il_1588xN.{listing_id}{i}_x.jpg"
+              for i in range(rng.randint(1, 10))]
+    return {
+        'title': title,
+        'listingId': listing_id,
+        'image': images[0],
+        'price': rng.choice(PRICES),
+        'fullUrl': f"https://www.etsy.com/uk/listing/{listing_id}/{slug[:60]}",
+        'description': synthetic_description(rng, rng.randint(8, 80)),
+        'images': images,
+        'tags': list(dict.fromkeys(rng.choices(THEMES + SUBJECTS, k=rng.randint(3, 13)))),
+        'metaDescription': f"This Digital Drawings & Illustrations item by ScribblePatchDesigns: {title[:90]}",
+        'slug': slug,
+        'shareLink': f"https://scribblepatchdesigns.etsy.com/listing/{listing_id}?utm_source=scribblepatch&utm_medium=product",
+        'collections': picked,
+    }
+
+
+def _write_array(path, key, items):
+    """Streams a JSON array (wrapped in {key: [...]} when key is set) one item at a time."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f'{{"{key}": [\n' if key else '[\n')
+        for i, item in enumerate(items):
+            if i:
+                f.write(',\n')
+            f.write(json.dumps(item, ensure_ascii=False))
+        f.write('\n]}\n' if key else '\n]\n')
+
+
+def write_catalog(out_dir, count, collections=12, seed=1):
+    """Writes the three catalog files to out_dir and returns the collections dict."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    themes = THEMES[:collections]
+    weights = theme_weights(len(themes))
+    members = {theme: [] for theme in themes}
+    summaries = []
+
+    def products():
+        for n in range(count):
+            product = synthetic_product(rng, n, themes, weights)
+            for key in product['collections']:
+                members[key].append(product['listingId'])
+            summaries.append([product['title'], product['image'], product['price'], product['listingId']])
+            yield product
+
+    _write_array(out_dir / "products_detailed.json", "products", products())
+    _write_array(out_dir / "products.json", None, (
+        {'title': title, 'link': f"https://scribblepatchdesigns.etsy.com/listing/{listing_id}",
+         'image': image, 'price': price, 'listingId': listing_id}
+        for title, image, price, listing_id in summaries
+    ))
+
+    collections_data = {
+        key: {'name': key.title(), 'slug': key, 'productCount': len(ids), 'listingIds': ids}
+        for key, ids in members.items() if ids
+    }
+    with open(out_dir / "collections.json", 'w', encoding='utf-8') as f:
+        json.dump({'collections': collections_data}, f)
+    return collections_data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('out_dir')
+    parser.add_argument('--count', type=int, default=1000, help='number of products')
+    parser.add_argument('--collections', type=int, default=12, help=f'themed collections (max {len(THEMES)})')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    collections = write_catalog(args.out_dir, args.count, args.collections, args.seed)
+    sizes = sorted((info['productCount'] for info in collections.values()), reverse=True)
+    print(f"✓ Wrote {args.count} products in {len(collections)} collections to {args.out_dir}")
+    print(f"   collection sizes: {', '.join(map(str, sizes))}")
+
+
+if __name__ == "__main__":
+    main()
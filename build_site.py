@@ -1,562 +1,351 @@
+import argparse
 import json
 import os
 import shutil
 from pathlib import Path
 
+import postprocess
+from assets import asset_url, write_assets, write_cache_headers
+from catalog import CatalogIndex
+from catalog_api import LISTING_SCRIPTS, STATIC_API_DIR, listing_config, read_api_index, write_api
+from catalog_stream import ProductStream, load_products
+from description_format import render_description
+from facets import STATIC_DATA_DIR, write_facets
+from fonts import build_fonts, catalog_strings, collect_text, font_head
+from gallery import HERO_SIZES, hero_srcset, render_thumbs
+from images import Image, image_url, optimize_images, picture
+from page_writer import write_page
+from pagination import page_path, paginate, pagination_nav, rel_links, remove_stale_pages
+from previews import build_previews, product_previews
+from product import PLACEHOLDER_IMAGE
+from profiler import BuildProfiler
+from related import RelatedIndex
+from resource_hints import resource_hints
+from search_index import SEARCH_SCRIPTS, STATIC_SEARCH_DIR, build_search_index, config_json
+from sitemap import write_sitemaps
+from static_files import write_script
+from stylesheets import stylesheet_links, write_stylesheets
+from templates import TEMPLATE_DIR, render as render_template, stream as stream_template
+
 # Configuration
 OUTPUT_DIR = "."  # Root folder
 PRODUCTS_JSON = "products_detailed.json"
+PRODUCTS_JSONL = "products_detailed.jsonl"  # One product per line (scraper.py --jsonl); used when newer
 COLLECTIONS_JSON = "collections.json"
+# Larger products files are loaded in two passes: light fields first, descriptions
+# and galleries streamed again per page (see catalog_stream.ProductStream)
+LAZY_LOAD_BYTES = 64 * 1024 * 1024
+
+# "You Might Also Like" neighbours, recomputed only when the catalog changes
+RELATED_CACHE = Path(OUTPUT_DIR) / postprocess.CACHE_DIR / "related.json"
+
+# Post-render stage: minify HTML and write .gz/.br siblings for the static host
+MINIFY_HTML = True
+PRECOMPRESS = True
+# Set by build(): minifies and precompresses pages as they are written (None writes them as rendered)
+page_output = None
+OUTPUT_PATTERNS = [
+    "index.html", "search.html", "products/*.html", "collections/*.html", "collections/*/page-*.html",
+    "static/css/*.css", "static/js/*.js", "static/search/*.json", "static/data/*.json",
+    "static/api/*.json", "static/api/products/*.json", "api/index.json",
+]
+
+# Products per collection page; later pages go to collections/<slug>/page-N.html
+COLLECTION_PAGE_SIZE = 24
+RELATED_PRODUCTS = 4  # Cards in a product page's "You Might Also Like" row
+HOME_PRODUCTS = 8  # Cards in the home page's HTML; the rest load from the listing shards on scroll
+
+# Fingerprinted CSS bundles linked from each page type (see stylesheets.BUNDLES)
+PAGE_STYLESHEETS = {
+    "product": ("site", "site-product"),
+    "collection": ("site", "site-collection"),
+    "home": ("site", "site-home"),
+    "search": ("site", "site-search"),
+}
 
 # --- HELPER FUNCTIONS ---
 
 def get_product_image(product):
     """
     Smart image getter with multiple fallbacks
-    Returns the best available image URL
+    Returns the best available image URL (derived once per Product)
     """
-    # Try images array first
-    if product.get('images') and len(product['images']) > 0:
-        return product['images'][0]
-    
-    # Fall back to single image field
-    if product.get('image') and product['image']:
-        return product['image']
-    
-    # Last resort: placeholder
-    return 'https://placehold.co/600x600/e2e8f0/4a5568?text=No+Image+Available'
+    return product.primary_image
 
 def get_product_images_array(product):
     """
     Returns array of all available images for gallery
     """
-    # Try images array first
-    if product.get('images') and len(product['images']) > 0:
-        return product['images']
-    
-    # Fall back to single image field
-    if product.get('image') and product['image']:
-        return [product['image']]
-    
-    # Return empty array if no images
-    return []
+    return product.gallery()
 
 # --- HTML TEMPLATES ---
-
-def get_head(title, description, url, image):
-    return f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <meta name="description" content="{description}">
-    <title>{title} | Scribble Patch Designs</title>
-    <link rel="icon" type="image/png" href="/favicon.png">
-    
-    <!-- Open Graph -->
-    <meta property="og:title" content="{title}">
-    <meta property="og:description" content="{description}">
-    <meta property="og:image" content="{image}">
-    <meta property="og:url" content="{url}">
-    <meta property="og:type" content="website">
-    
-    <style>
-        @import url('https://fonts.googleapis.com/css2?family=Fredoka:wght@500&family=Poppins:wght@300;400;500;600&display=swap');
-        
-        :root {{
-            --primary: #2d3748;
-            --accent: #667eea;
-            --accent-hover: #5a67d8;
-            --bg-color: #ffffff;
-            --bg-secondary: #f7fafc;
-            --border: #e2e8f0;
-            --soft-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.05), 0 2px 4px -1px rgba(0, 0, 0, 0.03);
-        }}
-
-        html {{ scroll-behavior: smooth; }}
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        
-        body {{
-            font-family: 'Poppins', sans-serif;
-            line-height: 1.7;
-            color: var(--primary);
-            background-color: var(--bg-color);
-            background-image: radial-gradient(#e2e8f0 1px, transparent 1px);
-            background-size: 24px 24px;
-        }}
-        
-        .container {{ max-width: 1100px; margin: 0 auto; padding: 0 24px; }}
-        img {{ max-width: 100%; display: block; }}
-
-        /* Navigation */
-        nav {{
-            background: rgba(255, 255, 255, 0.95);
-            backdrop-filter: blur(8px);
-            padding: 1rem 0;
-            position: sticky;
-            top: 0;
-            z-index: 1000;
-            border-bottom: 1px solid var(--border);
-        }}
-        .nav-wrapper {{ display: flex; justify-content: space-between; align-items: center; }}
-        .nav-logo {{ font-family: 'Fredoka', sans-serif; font-size: 1.25rem; color: var(--primary); text-decoration: none; }}
-        .nav-links {{ display: flex; gap: 2rem; }}
-        .nav-links a {{ color: var(--primary); text-decoration: none; font-weight: 500; transition: color 0.2s; }}
-        .nav-links a:hover {{ color: var(--accent); }}
-
-        /* Product Grids */
-        .product-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(280px, 1fr));
-            gap: 2rem;
-            margin: 2rem 0;
-        }}
-        .product-card {{
-            background: white; border-radius: 12px; overflow: hidden; border: 1px solid var(--border);
-            text-decoration: none; color: inherit; transition: transform 0.3s ease, box-shadow 0.3s ease;
-            display: flex; flex-direction: column; text-align: left;
-        }}
-        .product-card:hover {{ transform: translateY(-5px); box-shadow: 0 12px 20px rgba(0,0,0,0.08); }}
-        .product-image {{ width: 100%; aspect-ratio: 1/1; object-fit: cover; background: #f1f5f9; }}
-        .product-info {{ padding: 1.25rem; flex-grow: 1; }}
-        .product-title {{ font-weight: 600; font-size: 1rem; margin-bottom: 0.75rem; line-height: 1.4; }}
-        .product-footer {{ display: flex; justify-content: flex-end; align-items: center; margin-top: auto; }}
-        .buy-link {{ font-size: 0.875rem; font-weight: 600; color: var(--accent); }}
-
-        /* Footer */
-        footer {{ background: white; border-top: 1px solid var(--border); padding: 2rem 0; text-align: center; margin-top: 4rem; color: #718096; }}
-
-        /* --- Page Specific Styles --- */
-        
-        /* Product Details */
-        .breadcrumb {{ margin: 2rem 0; font-size: 0.9rem; color: #718096; }}
-        .breadcrumb a {{ color: var(--accent); text-decoration: none; }}
-        
-        .product-detail-wrapper {{ display: grid; grid-template-columns: 1fr 1fr; gap: 4rem; padding-bottom: 4rem; }}
-        .gallery-main {{ width: 100%; border-radius: 16px; margin-bottom: 1rem; border: 1px solid var(--border); }}
-        .gallery-thumbs {{ display: flex; gap: 10px; overflow-x: auto; padding-bottom: 5px; }}
-        .gallery-thumb {{ width: 80px; height: 80px; object-fit: cover; border-radius: 8px; cursor: pointer; border: 2px solid transparent; transition: all 0.2s; }}
-        .gallery-thumb:hover, .gallery-thumb.active {{ border-color: var(--accent); opacity: 0.8; }}
-        
-        .pd-title {{ font-family: 'Fredoka', sans-serif; font-size: 2.5rem; line-height: 1.2; margin-bottom: 1rem; }}
-        .pd-price {{ font-size: 1.5rem; color: var(--accent); font-weight: 600; margin-bottom: 2rem; }}
-        .pd-desc {{ color: #4a5568; margin-bottom: 2rem; line-height: 1.8; }}
-        .pd-desc p {{ margin-bottom: 1rem; }}
-        .pd-desc h4 {{ margin-top: 1.5rem; margin-bottom: 0.5rem; font-weight: 600; color: var(--primary); }}
-        .pd-desc ul {{ margin-left: 1.5rem; margin-bottom: 1rem; }}
-        .pd-desc li {{ margin-bottom: 0.5rem; }}
-        .btn-primary {{
-            background: var(--accent); color: white; padding: 1rem 2rem; border-radius: 8px;
-            text-decoration: none; font-weight: 600; display: inline-block; transition: background 0.2s;
-            text-align: center; width: 100%;
-        }}
-        .btn-primary:hover {{ background: var(--accent-hover); }}
-
-        /* Collection Header */
-        .collection-header {{ padding: 4rem 0; text-align: center; }}
-        .collection-header h1 {{ font-family: 'Fredoka', sans-serif; font-size: 3rem; margin-bottom: 1rem; }}
-
-        @media (max-width: 768px) {{
-            .product-detail-wrapper {{ grid-template-columns: 1fr; gap: 2rem; }}
-            .pd-title {{ font-size: 2rem; }}
-            .nav-links {{ display: none; }}
-        }}
-    </style>
-</head>
-<body>
-    <nav>
-        <div class="container nav-wrapper">
-            <a href="/" class="nav-logo">Scribble Patch Designs</a>
-            <div class="nav-links">
-                <a href="/">Home</a>
-                <a href="/#products">All Products</a>
-                <a href="https://www.etsy.com/shop/ScribblePatchDesigns" target="_blank">Etsy Store</a>
-            </div>
-        </div>
-    </nav>
-"""
+# Layouts live in templates/site/ and are compiled once per process by templates.py
+
+def head_context(page_type, prefix="/", head_links=""):
+    """Slots shared by every <head>: stylesheet links, self-hosted fonts, favicon, nav logo and extra <link> tags."""
+    font_preloads, font_faces = font_head(prefix)
+    return {
+        'stylesheets': stylesheet_links(PAGE_STYLESHEETS[page_type], prefix=prefix),
+        'favicon': asset_url("favicon.png", prefix),
+        'logo': picture("Logo-*.png", "", "36px", 36, prefix, "nav-logo-mark"),
+        'font_preloads': font_preloads,
+        'font_faces': font_faces,
+        'head_links': head_links,
+    }
+
+def get_head(title, description, url, image, page_type="product"):
+    return render_template(
+        "site/head.html", title=title, description=description, url=url, image=image,
+        **head_context(page_type)
+    ) + "\n"
 
 def get_footer():
-    return """
-    <footer>
-        <div class="container">
-            <p>&copy; 2026 Scribble Patch Designs. Created with ♥ for the creative community.</p>
-        </div>
-    </footer>
-</body>
-</html>
-"""
+    return render_template("site/footer.html")
 
 def format_description(description):
     """
-    Formats product descriptions with proper structure:
-    - Converts multiple newlines to paragraphs
-    - Detects and formats headers (lines ending with :)
-    - Converts bullet points to proper lists
-    - Adds proper spacing
+    Formats product descriptions into headings, lists and paragraphs
+    (see description_format.render_description).
     """
-    if not description:
-        return ""
-    
-    # Split into lines and clean up
-    lines = description.split('\n')
-    formatted_html = []
-    in_list = False
-    current_paragraph = []
-    
-    for line in lines:
-        line = line.strip()
-        
-        # Skip empty lines initially
-        if not line:
-            # Close any open paragraph
-            if current_paragraph:
-                formatted_html.append(f"<p>{''.join(current_paragraph)}</p>")
-                current_paragraph = []
-            # Close any open list
-            if in_list:
-                formatted_html.append("</ul>")
-                in_list = False
-            continue
-        
-        # Check if it's a header (ends with : or looks like a title)
-        if line.endswith(':') or (len(line) < 60 and line[0].isupper() and not line.endswith('.')):
-            # Close paragraph if open
-            if current_paragraph:
-                formatted_html.append(f"<p>{''.join(current_paragraph)}</p>")
-                current_paragraph = []
-            # Close list if open
-            if in_list:
-                formatted_html.append("</ul>")
-                in_list = False
-            # Add as heading
-            formatted_html.append(f"<h4 style='margin-top: 1.5rem; margin-bottom: 0.5rem; font-weight: 600; color: var(--primary);'>{line}</h4>")
-            continue
-        
-        # Check if it's a bullet point
-        if line.startswith(('✨', '✓', '✦', '📄', '🖨️', '📏', '💝', '•', '-', '*', '→')):
-            # Close paragraph if open
-            if current_paragraph:
-                formatted_html.append(f"<p>{''.join(current_paragraph)}</p>")
-                current_paragraph = []
-            # Start list if not already in one
-            if not in_list:
-                formatted_html.append("<ul style='margin-left: 1.5rem; margin-bottom: 1rem; list-style-type: none;'>")
-                in_list = True
-            # Add list item (keep the emoji/symbol)
-            formatted_html.append(f"<li style='margin-bottom: 0.5rem;'>{line}</li>")
-            continue
-        
-        # Regular text - add to current paragraph
-        if in_list:
-            formatted_html.append("</ul>")
-            in_list = False
-        
-        current_paragraph.append(line + ' ')
-    
-    # Close any remaining open elements
-    if current_paragraph:
-        formatted_html.append(f"<p>{''.join(current_paragraph)}</p>")
-    if in_list:
-        formatted_html.append("</ul>")
-    
-    return ''.join(formatted_html)
+    return render_description(description)
 
-def generate_product_card(product):
-    """Generates a product card with proper image handling"""
-    link = f"/products/{product['slug']}.html"
-    img_src = get_product_image(product)
-    
-    return f"""
-    <a href="{link}" class="product-card">
-        <img src="{img_src}" alt="{product['title']}" class="product-image" loading="lazy">
-        <div class="product-info">
-            <div class="product-title">{product['title']}</div>
-            <div class="product-footer">
-                <span class="buy-link">View Details →</span>
-            </div>
-        </div>
-    </a>
-    """
+def generate_product_card(product, catalog, link=None):
     """Generates a product card with proper image handling"""
-    link = f"/products/{product['slug']}.html"
-    img_src = get_product_image(product)
-    
-    return f"""
-    <a href="{link}" class="product-card">
-        <img src="{img_src}" alt="{product['title']}" class="product-image" loading="lazy">
-        <div class="product-info">
-            <div class="product-title">{product['title']}</div>
-            <div class="product-footer">
-                <span class="buy-link">View Details →</span>
-            </div>
-        </div>
-    </a>
-    """
+    return render_template(
+        "site/product_card.html",
+        link=link or f"/products/{catalog.slug(product)}.html",
+        img_src=catalog.image(product),
+        title=product.title
+    )
+
+def card_template():
+    """product_card.html as the <template id="product-card"> that scripts clone for the cards they add (templates/js/card.js)."""
+    return f'<template id="product-card">{render_template("site/product_card.html", link="", img_src="", title="")}</template>'
+
+def product_grid(products, catalog, link=None):
+    """Yields the cards of a grid one at a time; link(product) overrides the card URL."""
+    for product in products:
+        yield generate_product_card(product, catalog, link=link(product) if link else None)
 
 # --- BUILD FUNCTIONS ---
+# render_* functions yield each page as chunks; build_* stream them to disk with save_page
 
-def build_product_page(product, all_products):
-    """Generates a single product detail page."""
-    
-    filename = f"{OUTPUT_DIR}/products/{product['slug']}.html"
-    
-    # Get images with fallback handling
-    images = get_product_images_array(product)
-    
-    if images:
-        main_img = images[0]
-        thumbs_html = ""
-        for i, img in enumerate(images):
-            active_class = "active" if i == 0 else ""
-            thumbs_html += f'<img src="{img}" class="gallery-thumb {active_class}" onclick="switchImage(this, \'{img}\')">'
+def save_page(path, chunks):
+    """Streams a page to disk: through page_output during build(), as rendered otherwise."""
+    if page_output is None:
+        write_page(path, chunks)
     else:
-        main_img = get_product_image(product)
-        thumbs_html = ""
+        page_output.write(path, chunks)
 
-    # Format description with proper structure
-    desc_html = format_description(product.get('description', ''))
-
-    html = get_head(
-        title=product['title'],
-        description=product.get('metaDescription') or product['title'],
-        url=f"https://www.scribblepatchdesigns.com/products/{product['slug']}",
-        image=main_img
+def render_related(related, catalog):
+    """The "You Might Also Like" grid for a product page ('' when there are none)."""
+    if not related:
+        return ""
+    return (
+        '<section class="related-products"><h2>You Might Also Like</h2><div class="product-grid">'
+        + ''.join(product_grid(related, catalog))
+        + '</div></section>'
     )
+
+def render_product_page(product, catalog, related=()):
+    """Renders a single product detail page as a stream of HTML chunks; related lists the products to suggest."""
     
-    html += f"""
-    <div class="container">
-        <div class="breadcrumb">
-            <a href="/">Home</a> > <a href="/#products">Products</a> > {product['title']}
-        </div>
-
-        <div class="product-detail-wrapper">
-            <!-- Left: Gallery -->
-            <div class="gallery-section">
-                <img src="{main_img}" id="mainImage" class="gallery-main" alt="{product['title']}">
-                <div class="gallery-thumbs">
-                    {thumbs_html}
-                </div>
-            </div>
-
-            <!-- Right: Info -->
-            <div class="info-section">
-                <h1 class="pd-title">{product['title']}</h1>
-                <div class="pd-price">{product.get('price', '')}</div>
-                
-                <a href="{product.get('shareLink', '#')}" target="_blank" class="btn-primary">
-                    Buy Instant Download on Etsy
-                </a>
-                
-                <div style="margin-top: 2rem; padding: 1.5rem; background: var(--bg-secondary); border-radius: 12px;">
-                    <strong>✨ Instant Digital Download</strong>
-                    <ul style="margin-left: 1.5rem; margin-top: 0.5rem; font-size: 0.95rem; color: #4a5568;">
-                        <li>High-resolution PDF files</li>
-                        <li>Print at home immediately</li>
-                        <li>No shipping fees</li>
-                    </ul>
-                </div>
-
-                <h3 style="margin: 2rem 0 1rem;">Description</h3>
-                <div class="pd-desc">{desc_html}</div>
-            </div>
-        </div>
-    </div>
-
-    <script>
-        function switchImage(thumb, src) {{
-            document.getElementById('mainImage').src = src;
-            document.querySelectorAll('.gallery-thumb').forEach(t => t.classList.remove('active'));
-            thumb.classList.add('active');
-        }}
-    </script>
-    """
-    
-    html += get_footer()
-    
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write(html)
-    print(f"✓ Created: {product['slug']}")
+    # Get images with fallback handling
+    images = get_product_images_array(product)
+    main_img = images[0] if images else catalog.image(product)
+    # The main image picks a size for the viewport; thumbs are small variants of the rest
+    srcset = hero_srcset(main_img)
+    main_srcset = f' srcset="{srcset}" sizes="{HERO_SIZES}"' if srcset else ""
+
+    yield from stream_template(
+        "site/product.html",
+        title=product.title,
+        description=product.meta_description or product.title,
+        url=f"https://www.scribblepatchdesigns.com/products/{product.slug}",
+        image=main_img,
+        **head_context("product", head_links=resource_hints(main_img, lcp_srcset=srcset, lcp_sizes=HERO_SIZES)),
+        main_img=main_img,
+        main_srcset=main_srcset,
+        thumbs_html=render_thumbs(images, product_previews(product)),
+        price=product.price,
+        share_link=product.share_link or '#',
+        # Format description with proper structure
+        desc_html=format_description(product.description),
+        related_html=render_related(related, catalog)
+    )
+
+def build_product_page(product, catalog, related=()):
+    """Generates a single product detail page; returns its path relative to OUTPUT_DIR."""
+    path = f"products/{catalog.slug(product)}.html"
+    save_page(f"{OUTPUT_DIR}/{path}", render_product_page(product, catalog, related))
+    print(f"✓ Created: {product.slug}")
+    return path
 
-def build_collection_page(collection_name, product_ids, all_products):
-    """Generates a collection page."""
+def render_collection_page(collection_name, collection_products, catalog, page=1, total_pages=1):
+    """Renders one page of a collection (collection_products is that page's slice) as HTML chunks."""
     slug = collection_name.lower().replace(" ", "-")
-    filename = f"{OUTPUT_DIR}/collections/{slug}.html"
-    
-    collection_products = [p for p in all_products if p['listingId'] in product_ids]
-    
-    if not collection_products:
-        return
 
-    grid_html = '<div class="product-grid">'
-    for p in collection_products:
-        grid_html += generate_product_card(p)
-    grid_html += '</div>'
+    def href(number):
+        return f"/collections/{page_path(slug, number)}"
 
-    first_product = collection_products[0]
-    header_image = get_product_image(first_product)
+    page_suffix = f" - Page {page}" if page > 1 else ""
+    head_links = [
+        rel_links(page, total_pages, href),
+        resource_hints(catalog.image(collection_products[0]),
+                       (f"/products/{catalog.slug(p)}.html" for p in collection_products)),
+    ]
 
-    html = get_head(
-        title=f"{collection_name.title()} Coloring Pages",
+    yield from stream_template(
+        "site/collection.html",
+        title=f"{collection_name.title()} Coloring Pages{page_suffix}",
         description=f"Browse our collection of {collection_name} coloring pages.",
-        url=f"https://www.scribblepatchdesigns.com/collections/{slug}",
-        image=header_image
+        url=f"https://www.scribblepatchdesigns.com/collections/{slug}" + (f"/page-{page}" if page > 1 else ""),
+        image=catalog.image(collection_products[0]),
+        **head_context("collection", head_links='\n    '.join(filter(None, head_links))),
+        collection_title=collection_name.title(),
+        grid_html=product_grid(collection_products, catalog),
+        pagination=pagination_nav(page, total_pages, href)
     )
 
-    html += f"""
-    <div class="collection-header">
-        <div class="container">
-            <span style="text-transform: uppercase; letter-spacing: 2px; color: var(--accent); font-weight: 600;">Collection</span>
-            <h1>{collection_name.title()} Coloring Pages</h1>
-            <p>Explore our unique printable designs.</p>
-        </div>
-    </div>
-    
-    <div class="container">
-        {grid_html}
-    </div>
+def build_collection_page(collection_name, catalog):
     """
+    Generates a collection's pages: collections/<slug>.html, then collections/<slug>/page-N.html.
+    Returns their paths relative to OUTPUT_DIR ([] for an empty collection).
+    """
+    slug = collection_name.lower().replace(" ", "-")
     
-    html += get_footer()
-    
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write(html)
-    print(f"✓ Created: collections/{slug}")
-
-def build_home_page(products, collections_data):
-    """Builds homepage with proper image handling"""
+    collection_products = catalog.collection(collection_name)
     
+    if not collection_products:
+        return []
+
+    pages = paginate(collection_products, COLLECTION_PAGE_SIZE)
+    if len(pages) > 1:
+        os.makedirs(f"{OUTPUT_DIR}/collections/{slug}", exist_ok=True)
+    paths = []
+    for number, page_products in enumerate(pages, 1):
+        path = f"collections/{page_path(slug, number)}"
+        save_page(
+            f"{OUTPUT_DIR}/{path}",
+            render_collection_page(collection_name, page_products, catalog, number, len(pages))
+        )
+        paths.append(path)
+    remove_stale_pages(f"{OUTPUT_DIR}/collections", slug, len(pages))
+    print(f"✓ Created: collections/{slug}" + (f" ({len(pages)} pages)" if len(pages) > 1 else ""))
+    return paths
+
+def render_home_page(catalog, listing=None, listing_script=None):
+    """
+    Renders the homepage as a stream of HTML chunks. With listing (the
+    catalog_api index) and its script, the grid loads more cards on scroll.
+    """
     coll_html = '<div style="display: flex; gap: 0.5rem; justify-content: center; flex-wrap: wrap; margin-top: 1.5rem;">'
-    for name in collections_data.keys():
-        slug = name.lower().replace(" ", "-")
-        coll_html += f'<a href="collections/{slug}.html" class="btn-outline" style="color: var(--primary); border-color: var(--border); font-size: 0.8rem;">{name.title()}</a>'
+    coll_html += ''.join(
+        f'<a href="collections/{name.lower().replace(" ", "-")}.html" class="btn-outline" style="color: var(--primary); border-color: var(--border); font-size: 0.8rem;">{name.title()}</a>'
+        for name in catalog.collections.keys()
+    )
     coll_html += '</div>'
 
-    grid_html = ""
-    for p in products[:8]:
-        img_src = get_product_image(p)
-        link = f"products/{p['slug']}.html"
-        
-        grid_html += f"""
-        <a href="{link}" class="product-card">
-            <img src="{img_src}" alt="{p['title']}" class="product-image" loading="lazy">
-            <div class="product-info">
-                <div class="product-title">{p['title']}</div>
-                <div class="product-footer">
-                    <span class="buy-link">View Details →</span>
-                </div>
-            </div>
-        </a>
-        """
-
-    html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <meta name="description" content="Instant PDF coloring pages from £1.44! Premium printable designs for adults & kids.">
-    <title>Premium Printable Coloring Pages | Scribble Patch Designs</title>
-    <link rel="icon" type="image/png" href="favicon.png">
-    <style>
-        @import url('https://fonts.googleapis.com/css2?family=Fredoka:wght@500&family=Poppins:wght@300;400;500;600&display=swap');
-        :root {{ --primary: #2d3748; --accent: #667eea; --accent-hover: #5a67d8; --bg-color: #ffffff; --bg-secondary: #f7fafc; --border: #e2e8f0; --soft-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.05), 0 2px 4px -1px rgba(0, 0, 0, 0.03); }}
-        html {{ scroll-behavior: smooth; }}
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Poppins', sans-serif; line-height: 1.7; color: var(--primary); background-color: var(--bg-color); background-image: radial-gradient(#e2e8f0 1px, transparent 1px); background-size: 24px 24px; }}
-        .container {{ max-width: 1100px; margin: 0 auto; padding: 0 24px; }}
-        nav {{ background: rgba(255, 255, 255, 0.95); backdrop-filter: blur(8px); padding: 1rem 0; position: sticky; top: 0; z-index: 1000; border-bottom: 1px solid var(--border); }}
-        .nav-wrapper {{ display: flex; justify-content: space-between; align-items: center; }}
-        .nav-logo {{ font-family: 'Fredoka', sans-serif; font-size: 1.25rem; color: var(--primary); text-decoration: none; }}
-        .nav-links {{ display: flex; gap: 2rem; }}
-        .nav-links a {{ color: var(--primary); text-decoration: none; font-weight: 500; font-size: 0.9rem; transition: color 0.2s; }}
-        .nav-links a:hover {{ color: var(--accent); }}
-        .hero {{ padding: 4rem 0 2rem; text-align: center; }}
-        .hero h1 {{ font-family: 'Fredoka', sans-serif; font-size: 2.75rem; line-height: 1.2; margin-bottom: 1rem; letter-spacing: -1px; }}
-        .hero p {{ font-size: 1.125rem; color: #4a5568; max-width: 650px; margin: 0 auto 1.5rem; }}
-        .eyebrow {{ text-transform: uppercase; font-size: 0.85rem; font-weight: 600; letter-spacing: 2px; color: var(--accent); display: block; margin-bottom: 1rem; }}
-        
-        .product-grid {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(280px, 1fr)); gap: 2rem; margin-top: 2rem; }}
-        .product-card {{ background: white; border-radius: 12px; overflow: hidden; border: 1px solid var(--border); text-decoration: none; color: inherit; transition: transform 0.3s ease, box-shadow 0.3s ease; display: flex; flex-direction: column; text-align: left; }}
-        .product-card:hover {{ transform: translateY(-5px); box-shadow: 0 12px 20px rgba(0,0,0,0.08); }}
-        .product-image {{ width: 100%; aspect-ratio: 1/1; object-fit: cover; background: #f1f5f9; }}
-        .product-info {{ padding: 1.25rem; flex-grow: 1; }}
-        .product-title {{ font-weight: 600; font-size: 1rem; margin-bottom: 0.75rem; line-height: 1.4; display: -webkit-box; -webkit-line-clamp: 2; -webkit-box-orient: vertical; overflow: hidden; }}
-        .product-footer {{ display: flex; justify-content: flex-end; align-items: center; }}
-        .buy-link {{ font-size: 0.875rem; font-weight: 600; color: var(--accent); }}
-        
-        .btn-outline {{ display: inline-block; background: transparent; padding: 8px 16px; border-radius: 8px; text-decoration: none; font-weight: 500; border: 1px solid; transition: all 0.2s; }}
-        .btn-outline:hover {{ background: rgba(0,0,0,0.05); }}
+    featured = catalog.products[:HOME_PRODUCTS]
+    link = lambda p: f"products/{catalog.slug(p)}.html"
+    hints = resource_hints(catalog.image(featured[0]), map(link, featured)) if featured else ""
+
+    more_html = ""
+    if listing and listing_script and listing['total'] > len(featured):
+        more_html = (
+            '<button type="button" id="load-more" class="btn-outline load-more" hidden>Show more designs</button>'
+            f'{card_template()}'
+            f'<script id="listing-config" type="application/json">{listing_config(listing, len(featured))}</script>'
+            f'<script src="{listing_script}" defer></script>'
+        )
+
+    yield from stream_template(
+        "site/home.html",
+        **head_context("home", prefix="", head_links=hints),
+        coll_html=coll_html,
+        grid_html=product_grid(featured, catalog, link=link),
+        more_html=more_html
+    )
 
-        footer {{ background: white; border-top: 1px solid var(--border); padding: 2rem 0; text-align: center; font-size: 0.9rem; color: #718096; margin-top: 4rem; }}
-        
-        @media (max-width: 768px) {{
-            .hero h1 {{ font-size: 2rem; }}
-            .nav-links {{ display: none; }}
-            .product-grid {{ grid-template-columns: repeat(2, 1fr); gap: 0.5rem; }}
-        }}
-    </style>
-</head>
-<body>
-
-    <nav>
-        <div class="container nav-wrapper">
-            <a href="index.html" class="nav-logo">Scribble Patch Designs</a>
-            <div class="nav-links">
-                <a href="#products">Products</a>
-                <a href="#about">About</a>
-                <a href="https://www.etsy.com/shop/ScribblePatchDesigns" target="_blank">Etsy Store</a>
-            </div>
-        </div>
-    </nav>
-
-    <header class="hero">
-        <div class="container">
-            <div class="hero-text-content">
-                <span class="eyebrow">Instant Digital Downloads</span>
-                <h1>Premium Printable Coloring Pages</h1>
-                <p>High-quality PDF coloring pages from £1.44. Instant download, print at home. Featuring Kawaii animals, Christmas themes, Sports, and Fantasy designs.</p>
-                
-                {coll_html}
-            </div>
-        </div>
-    </header>
-
-    <div class="container">
-        <h2 id="products" style="font-size: 1.75rem; margin-bottom: 1rem; font-weight: 600; text-align:center;">Our Coloring Page Collection</h2>
-
-        <div class="product-grid">
-            {grid_html}
-        </div>
-    </div>
-    
-    <section id="about" style="padding: 4rem 0; background: white; margin-top: 4rem; border-top: 1px solid var(--border);">
-        <div class="container" style="text-align: center;">
-            <h2 style="font-family: 'Fredoka', sans-serif; font-size: 2rem; margin-bottom: 1rem;">Why Scribble Patch?</h2>
-            <p style="max-width: 700px; margin: 0 auto; color: #4a5568;">
-                We create premium printable coloring pages that bring joy to colorists of all ages. 
-                From niche sports like Golf and Soccer to cute Kawaii animals and festive Christmas themes.
-            </p>
-        </div>
-    </section>
-
-    <footer>
-        <div class="container">
-            <p>&copy; 2026 Scribble Patch Designs.</p>
-        </div>
-    </footer>
-
-</body>
-</html>
-    """
-    
-    with open(f"{OUTPUT_DIR}/index.html", 'w', encoding='utf-8') as f:
-        f.write(html)
+def build_home_page(catalog):
+    """Builds homepage with proper image handling (run build_api first for load-more)"""
+    listing = read_api_index(OUTPUT_DIR)
+    listing_script = write_script(OUTPUT_DIR, LISTING_SCRIPTS, "listing") if listing else None
+    save_page(f"{OUTPUT_DIR}/index.html", render_home_page(catalog, listing, listing_script))
     print("✓ Created: index.html")
 
+def build_api(catalog):
+    """Writes the per-product documents and paged listing shards to static/api (see catalog_api)."""
+    index = write_api(OUTPUT_DIR, catalog, url=lambda p: f"/products/{catalog.slug(p)}.html")
+    print(f"✓ Created: {STATIC_API_DIR}/ ({index['total']} products, {index['pageSize']} per listing page)")
+    return index
+
+
+def render_search_page(search_config, search_script, catalog):
+    """Renders the search page as HTML chunks; results come from the prebuilt index in static/search."""
+    collection_options = ''.join(
+        f'<option value="{key}">{info.get("name", key.title())}</option>'
+        for key, info in catalog.collections.items() if catalog.collection(key)
+    )
+    yield from stream_template(
+        "site/search.html",
+        title="Search Coloring Pages",
+        description="Search all Scribble Patch Designs printable coloring pages.",
+        url="https://www.scribblepatchdesigns.com/search",
+        image=(image_url("banner.png", 1200, prefix="https://www.scribblepatchdesigns.com/")
+               or f"https://www.scribblepatchdesigns.com{asset_url('banner.webp')}"),
+        **head_context("search"),
+        search_config=config_json(search_config, base=f"/{STATIC_SEARCH_DIR}/"),
+        search_script=f"/{search_script}",
+        card_template=card_template(),
+        collection_options=collection_options
+    )
+
+def build_search_page(catalog):
+    """Writes the sharded search index, the facet table, the search script and search.html."""
+    search_config = build_search_index(OUTPUT_DIR, catalog, url=lambda p: f"/products/{catalog.slug(p)}.html")
+    search_config['facets'] = f"/{STATIC_DATA_DIR}/{write_facets(OUTPUT_DIR, catalog)}"
+    save_page(f"{OUTPUT_DIR}/search.html", render_search_page(search_config, write_script(OUTPUT_DIR, SEARCH_SCRIPTS, "search"), catalog))
+    print(f"✓ Created: search.html ({len(search_config['shards'])} index shards)")
+
 
 # --- MAIN EXECUTION ---
 
-def main():
+def products_path():
+    """The products file to build from: the JSONL variant when it is the newer (or only) one."""
+    candidates = [path for path in (PRODUCTS_JSONL, PRODUCTS_JSON) if os.path.exists(path)]
+    if not candidates:
+        raise FileNotFoundError(f"{PRODUCTS_JSON} not found")
+    return max(candidates, key=os.path.getmtime)
+
+def read_data(lazy=False):
+    """
+    Reads the products (streamed one record at a time) and the collections dict.
+    Returns (products, collections, source): with lazy=True the products hold
+    only their light fields and source is the ProductStream that re-reads the
+    rest; otherwise source is None. lazy=None decides by file size.
+    """
+    path = products_path()
+    if lazy is None:
+        lazy = os.path.getsize(path) > LAZY_LOAD_BYTES
+    source = ProductStream(path) if lazy else None
+    products = source.index() if lazy else load_products(path)
+    with open(COLLECTIONS_JSON, 'r', encoding='utf-8') as f:
+        coll_data = json.load(f)['collections']
+    return products, coll_data, source
+
+def load_catalog(lazy=False):
+    """Reads the product and collection files into a CatalogIndex."""
+    return CatalogIndex(*read_data(lazy))
+
+def build(minify=MINIFY_HTML, precompress=PRECOMPRESS, profiler=None, lazy=None):
+    """
+    Runs the full build and returns the catalog (None when the data files are missing).
+    profiler (a profiler.BuildProfiler) records per-phase and per-page timings.
+    lazy loads the catalog in two passes (see read_data; None decides by file size).
+    """
+    global page_output
+    profiler = profiler or BuildProfiler()
     print("🚀 Starting Site Generator...\n")
     
     # 1. Prepare Directory Structure (but don't delete root!)
@@ -564,48 +353,134 @@ def main():
     os.makedirs("products", exist_ok=True)
     os.makedirs("collections", exist_ok=True)
     
-    # 2. Copy Assets (if needed)
-    # favicon.png should already be in root
+    # 2. Copy Assets: favicon, banner and logo under content-hashed names
+    with profiler.phase("stylesheets"):
+        bundles = sorted({name for names in PAGE_STYLESHEETS.values() for name in names})
+        for path in write_stylesheets(OUTPUT_DIR, bundles) + write_assets(OUTPUT_DIR):
+            print(f"✓ Created: {path}")
+        write_cache_headers(OUTPUT_DIR)
+
+    # Brand PNGs, resized and re-encoded (AVIF/WebP/PNG) in a process pool
+    with profiler.phase("images"):
+        sources, encoded = optimize_images(OUTPUT_DIR)
+    if Image is None:
+        print("🖼️  Images: Pillow not installed - pages keep the text-only logo (pip install pillow)\n")
+    else:
+        print(f"🖼️  Images: {sources} sources optimized ({encoded} sizes encoded this run)\n")
     
     # 3. Load Data
     try:
-        with open(PRODUCTS_JSON, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            products = data['products']
+        with profiler.phase("load"):
+            products, coll_data, source = read_data(lazy)
+        # Index once: every builder looks products up through the catalog
+        with profiler.phase("index"):
+            catalog = CatalogIndex(products, coll_data, source=source)
             
-        with open(COLLECTIONS_JSON, 'r', encoding='utf-8') as f:
-            coll_data = json.load(f)['collections']
-            
-        print(f"✓ Loaded {len(products)} products and {len(coll_data)} collections\n")
+        print(f"✓ Loaded {len(products)} products and {len(coll_data)} collections"
+              + (" (light fields; details streamed per page)" if source else "") + "\n")
         
         # Debug: Show image status
-        images_found = sum(1 for p in products if get_product_images_array(p))
+        images_found = sum(1 for p in products if p.primary_image != PLACEHOLDER_IMAGE)
         print(f"📸 Image Status: {images_found}/{len(products)} products have images\n")
         
     except FileNotFoundError as e:
         print(f"❌ Error: {e}")
         print("Make sure products_detailed.json and collections.json exist!")
-        return
+        return None
+
+    # Subset self-hosted fonts to the characters the site can show
+    with profiler.phase("fonts"):
+        chars = collect_text(catalog_strings(catalog.iter_full(), coll_data), [TEMPLATE_DIR, __file__])
+        fonts = build_fonts(OUTPUT_DIR, chars)
+    if fonts:
+        print(f"🔤 Fonts: {len(fonts)} faces subset to {len(chars)} characters\n")
+    else:
+        print("🔤 Fonts: no font files in fonts/ (or fontTools missing: pip install fonttools brotli)"
+              " - loading them from Google Fonts\n")
+
+    # Watermarked previews of local artwork (artwork/<slug or listing ID>/*.png) for the galleries
+    with profiler.phase("previews"):
+        with_artwork, rendered = build_previews(OUTPUT_DIR, wanted=set(catalog.by_slug) | set(catalog.by_id))
+    if with_artwork:
+        print(f"🎨 Previews: {with_artwork} products with artwork ({rendered} pages rendered this run)\n")
 
-    # 4. Build Pages
+    # 4. Build Pages (minified and precompressed as they are written; unchanged ones are left alone)
     print("Building pages...\n")
+    page_output = postprocess.PageOutput(OUTPUT_DIR, minify, precompress) if (minify or precompress) else None
     
-    for p in products:
-        build_product_page(p, products)
+    with profiler.phase("related"):
+        related = RelatedIndex(catalog, RELATED_CACHE)
+
+    pages = ["index.html", "search.html"]  # Every page written, for the sitemap
+    with profiler.phase("products"):
+        for p in catalog.iter_full():
+            with profiler.page(f"products/{catalog.slug(p)}.html"):
+                pages.append(build_product_page(p, catalog, related.get(p, RELATED_PRODUCTS)))
         
     print()
-    for name, data in coll_data.items():
-        build_collection_page(name, data['listingIds'], products)
+    with profiler.phase("collections"):
+        for name in catalog.collections:
+            with profiler.page(f"collections/{name.lower().replace(' ', '-')}"):
+                pages.extend(build_collection_page(name, catalog))
         
     print()
-    build_home_page(products, coll_data)
+    with profiler.phase("api"):
+        build_api(catalog)
+    with profiler.phase("home"), profiler.page("index.html"):
+        build_home_page(catalog)
+    with profiler.phase("search"), profiler.page("search.html"):
+        build_search_page(catalog)
+    
+    # 5. Minify and precompress everything else (stylesheets, scripts, JSON)
+    if page_output is not None:
+        with profiler.phase("minify + compress"):
+            processed, skipped = postprocess.postprocess_site(
+                OUTPUT_DIR, OUTPUT_PATTERNS, minify=minify, precompress=precompress, pages=page_output
+            )
+        page_output = None
+        print(f"\n🗜️  Minified/precompressed {processed} files ({skipped} unchanged)")
+        if precompress and postprocess.brotli is None:
+            print("⚠️  brotli not installed - wrote .gz only (pip install brotli)")
+
+    # 6. Sitemaps (lastmod follows the content hashes recorded above)
+    with profiler.phase("sitemaps"):
+        digests = postprocess.load_cache(OUTPUT_DIR) if (minify or precompress) else None
+        written = write_sitemaps(OUTPUT_DIR, pages, digests=digests, builder="build_site")
+    print(f"🗺️  Sitemap: {len(written)} file(s) updated")
     
     print("\n✅ Website generation complete!")
-    print(f"👉 Open index.html in your browser to view your site.")
-    print(f"📁 Files created:")
-    print(f"   - index.html (homepage)")
+    print("👉 Open index.html in your browser to view your site.")
+    print("📁 Files created:")
+    print("   - index.html (homepage)")
+    print("   - search.html + static/search/ (client-side search index)")
+    print(f"   - {STATIC_API_DIR}/ + api/index.json (product and listing JSON)")
     print(f"   - products/ ({len(products)} product pages)")
     print(f"   - collections/ ({len(coll_data)} collection pages)")
+    return catalog
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Builds the Scribble Patch Designs site.")
+    parser.add_argument('command', nargs='?', choices=['build', 'serve'], default='build',
+                        help="build the site (default) or serve it locally")
+    parser.add_argument('--watch', action='store_true', help="serve: rebuild changed pages and live-reload")
+    parser.add_argument('--port', type=int, default=8000, help="serve: port (default 8000)")
+    parser.add_argument('--lazy', action='store_true',
+                        help=f"build: load the catalog in two passes to save memory (automatic above {LAZY_LOAD_BYTES >> 20} MB)")
+    parser.add_argument('--profile', action='store_true', help="build: report time per phase and the slowest pages")
+    parser.add_argument('--pstats', metavar='FILE', help="build: also dump cProfile stats to FILE (implies --profile)")
+    parser.add_argument('--stacks', metavar='FILE',
+                        help="build: also write sampled folded stacks for a flame graph to FILE (implies --profile)")
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        import devserver
+        devserver.serve(port=args.port, watch_files=args.watch)
+    else:
+        profiler = BuildProfiler(args.profile, pstats_path=args.pstats, stacks_path=args.stacks)
+        with profiler:
+            build(profiler=profiler, lazy=args.lazy or None)
+        if profiler.enabled:
+            print("\n" + profiler.report())
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
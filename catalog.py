@@ -0,0 +1,59 @@
+class CatalogIndex:
+    """
+    Lookups over a loaded catalog, built once and shared by every page builder:
+    - by_id / by_slug: listingId and slug -> product
+    - collection(key): the collection's products in catalog order
+    - collection_keys(product): the collections a product belongs to
+    - slug(product) / image(product): the product's slug and primary image
+    - iter_full(): every product with all its fields, for the few builders
+      that read descriptions and galleries
+    Products are product.Product records. Building the index is linear in
+    catalog size + total collection membership.
+    With source (a catalog_stream.ProductStream), products leave their heavy
+    fields on disk and iter_full() streams the complete records instead.
+    """
+
+    def __init__(self, products, collections=None, source=None):
+        self.products = products
+        self.collections = collections or {}
+        self.source = source
+        self.by_id = {}
+        self.by_slug = {}
+
+        for product in products:
+            self.by_id[product.listing_id] = product
+            self.by_slug[product.slug] = product
+
+        # listingId -> collection keys, then one pass over the catalog keeps its order
+        self._memberships = {}
+        for key, info in self.collections.items():
+            for listing_id in dict.fromkeys(info.get('listingIds', [])):
+                self._memberships.setdefault(listing_id, []).append(key)
+        self._members = {key: [] for key in self.collections}
+        for product in products:
+            for key in self._memberships.get(product.listing_id, ()):
+                self._members[key].append(product)
+
+    def __len__(self):
+        return len(self.products)
+
+    def __iter__(self):
+        return iter(self.products)
+
+    def iter_full(self):
+        """Complete products in catalog order (streamed one at a time when loaded lazily)."""
+        return iter(self.source) if self.source is not None else iter(self.products)
+
+    def slug(self, product):
+        return product.slug
+
+    def image(self, product):
+        return product.primary_image
+
+    def collection_keys(self, product):
+        """Keys of the collections a product belongs to, in collections.json order."""
+        return self._memberships.get(product.listing_id, [])
+
+    def collection(self, key):
+        """Products of a collection in catalog order ([] for unknown keys)."""
+        return self._members.get(key, [])
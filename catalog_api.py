@@ -0,0 +1,109 @@
+import json
+from pathlib import Path
+
+from static_files import CARD_SCRIPT, dump_json, remove_stale, write_hashed
+from templates import TEMPLATE_DIR
+
+# Configuration
+STATIC_API_DIR = "static/api"  # Relative to the output folder; every file is content-hashed
+API_INDEX = "api/index.json"  # The one fixed name: points at the current listing for other consumers
+LISTING_SCRIPTS = [CARD_SCRIPT, TEMPLATE_DIR / "js" / "listing.js"]  # Bundled into one file by write_script
+LISTING_PAGE_SIZE = 24  # Cards per listing shard (one "load more" step on the home page)
+API_VERSION = 1
+
+
+def product_document(product, catalog, url):
+    """The public JSON for one product (a complete Product: it reads the description)."""
+    return {
+        'id': product.listing_id,
+        'slug': catalog.slug(product),
+        'title': product.title,
+        'price': product.price,
+        'url': url(product),
+        'image': catalog.image(product),
+        'images': product.gallery(),
+        'tags': list(product.tags),
+        'collections': list(catalog.collection_keys(product)),
+        'description': product.description,
+        'etsyUrl': product.full_url or product.link,
+    }
+
+
+def listing_item(product, catalog, url, document):
+    """A product's entry in a listing shard: what a card shows, plus its full document."""
+    return {
+        'id': product.listing_id,
+        'title': product.title,
+        'price': product.price,
+        'url': url(product),
+        'image': catalog.image(product),
+        'document': document,
+    }
+
+
+# --- OUTPUT ---
+
+def write_api(output_dir, catalog, url):
+    """
+    Writes the catalog as static JSON: one document per product
+    (static/api/products/<slug>.<hash>.json), listing shards of
+    LISTING_PAGE_SIZE cards in catalog order (static/api/page-<n>.<hash>.json),
+    and the listing manifest naming them (static/api/listing.<hash>.json).
+    A file's name changes only with its content, so unchanged files keep
+    their ETags and cached copies, and existing files are not rewritten.
+    API_INDEX points at the current manifest. url(product) is the page link.
+    Products are streamed once (catalog.iter_full); returns the index.
+    """
+    api_dir = Path(output_dir) / STATIC_API_DIR
+    products_dir = api_dir / "products"
+    products_dir.mkdir(parents=True, exist_ok=True)
+    base = f"/{STATIC_API_DIR}/"
+    keep, product_keep = set(), set()
+
+    pages = []
+    items = []
+
+    def flush():
+        page = {'page': len(pages) + 1, 'items': items}
+        pages.append(base + write_hashed(api_dir, f"page-{len(pages) + 1}", dump_json(page), ".json", keep))
+
+    for product in catalog.iter_full():
+        document = write_hashed(products_dir, catalog.slug(product),
+                                 dump_json(product_document(product, catalog, url)), ".json", product_keep)
+        items.append(listing_item(product, catalog, url, f"{base}products/{document}"))
+        if len(items) == LISTING_PAGE_SIZE:
+            flush()
+            items = []
+    if items:
+        flush()
+
+    total = len(catalog.products)
+    listing = {'version': API_VERSION, 'total': total, 'pageSize': LISTING_PAGE_SIZE, 'pages': pages}
+    index = {'version': API_VERSION, 'total': total, 'pageSize': LISTING_PAGE_SIZE,
+             'listing': base + write_hashed(api_dir, "listing", dump_json(listing), ".json", keep)}
+
+    remove_stale(products_dir, "*.json*", product_keep)
+    remove_stale(api_dir, "*.json*", keep)
+
+    index_path = Path(output_dir) / API_INDEX
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    data = dump_json(index)
+    if not index_path.exists() or index_path.read_bytes() != data:
+        index_path.write_bytes(data)
+    return index
+
+
+def read_api_index(output_dir):
+    """The index write_api last wrote, or None before the first build."""
+    try:
+        with open(Path(output_dir) / API_INDEX, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return index if index.get('version') == API_VERSION else None
+
+
+def listing_config(index, shown):
+    """The home grid's inline config: where the listing is and how many cards the HTML already has."""
+    return json.dumps({'listing': index['listing'], 'total': index['total'], 'shown': shown},
+                      ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
@@ -0,0 +1,180 @@
+import codecs
+import json
+import os
+import re
+from pathlib import Path
+
+from product import Product
+
+# Configuration
+READ_SIZE = 1 << 16  # Bytes read from disk at a time
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class _Reader:
+    """A file's text decoded a chunk at a time, read from by position."""
+
+    def __init__(self, f, path):
+        self.f = f
+        self.path = path
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.mark = 0  # A position in buf ...
+        self.mark_offset = 0  # ... and its byte offset in the file
+
+    def byte_offset(self, pos):
+        """Byte offset of buf[pos] in the file; positions must be asked for in increasing order."""
+        self.mark_offset += len(self.buf[self.mark:pos].encode('utf-8'))
+        self.mark = pos
+        return self.mark_offset
+
+    def fill(self):
+        """Appends the next chunk to the buffer, dropping the consumed text first."""
+        chunk = self.f.read(READ_SIZE)
+        self.eof = not chunk
+        self.byte_offset(self.pos)
+        self.buf = self.buf[self.pos:] + self.decoder.decode(chunk, final=self.eof)
+        self.pos = self.mark = 0
+
+    def peek(self):
+        """The next non-whitespace character ('' at the end of the file)."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or self.eof:
+                return self.buf[self.pos:self.pos + 1]
+            self.fill()
+
+    def expect(self, chars):
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"{self.path}: expected one of {chars!r}, found {char or 'end of file'!r}")
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Decodes the next JSON value, reading more of the file until it is complete."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+                # A number that ends the buffer may continue in the next chunk
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.fill()
+
+
+def _iter_array(f, path, key):
+    """Yields (offset, length, item) for a top-level array, or the array under key in a top-level object."""
+    reader = _Reader(f, path)
+    if reader.expect('{[') == '{':
+        missing = ValueError(f"{path}: no {key!r} array")
+        if reader.peek() == '}' or not key:
+            raise missing
+        while True:
+            name = reader.value()
+            reader.expect(':')
+            if name == key:
+                reader.expect('[')
+                break
+            reader.value()  # Metadata such as scrapedAt, held only while skipping it
+            if reader.expect(',}') == '}':
+                raise missing
+    if reader.peek() == ']':
+        return
+    while True:
+        start = reader.byte_offset(reader.pos)
+        item = reader.value()
+        yield start, reader.byte_offset(reader.pos) - start, item
+        if reader.expect(',]') == ']':
+            return
+
+
+def iter_records(path, key='products'):
+    """
+    Yields (byte offset, byte length, record) one record at a time from a
+    JSON file ({key: [...]} or a bare array) or a JSONL file (one record
+    per line, by the .jsonl suffix), so only one is decoded and held at a time.
+    """
+    path = Path(path)
+    with open(path, 'rb') as f:
+        if path.suffix == '.jsonl':
+            offset = 0
+            for line in f:
+                if line.strip():
+                    yield offset, len(line), json.loads(line)
+                offset += len(line)
+        else:
+            yield from _iter_array(f, path, key)
+
+
+def iter_products(path, key='products'):
+    """The file's records as dicts, one at a time (see iter_records)."""
+    for _, _, record in iter_records(path, key):
+        yield record
+
+
+def load_products(path, key='products', slugify=None):
+    """
+    Every record of the file as a Product, streamed (the file's text is never
+    held whole). slugify(record) derives slugs for records without one.
+    """
+    return [Product(record, slug=slugify(record) if slugify else None) for record in iter_products(path, key)]
+
+
+def write_jsonl(path, products):
+    """Writes products one per line, replacing path only once the file is complete."""
+    path = Path(path)
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        for product in products:
+            f.write(json.dumps(product, ensure_ascii=False))
+            f.write('\n')
+    os.replace(tmp, path)
+
+
+class ProductStream:
+    """
+    Two-pass access to a products file too large to hold in memory whole.
+    index() returns Products without their heavy fields - enough for slugs,
+    cards, collections, facets and related products - each loading them on
+    first access; iterating streams complete Products again, in the same
+    order and one at a time, for the builders that read every description.
+    """
+
+    def __init__(self, path, key='products'):
+        self.path = Path(path)
+        self.key = key
+        self.stamp = None
+
+    def _check(self):
+        stat = self.path.stat()
+        if (stat.st_mtime_ns, stat.st_size) != self.stamp:
+            raise RuntimeError(f"{self.path} changed since it was indexed; rebuild")
+
+    def index(self):
+        """First pass: every product with its heavy fields left on disk, in file order."""
+        stat = self.path.stat()
+        self.stamp = stat.st_mtime_ns, stat.st_size
+        return [Product(record, source=self, span=(offset, length))
+                for offset, length, record in iter_records(self.path, self.key)]
+
+    def read(self, span):
+        """The record at span (offset, length), as a dict."""
+        self._check()
+        offset, length = span
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            return json.loads(f.read(length))
+
+    def __iter__(self):
+        """Later passes: complete products in index() order."""
+        self._check()
+        return (Product(record) for record in iter_products(self.path, self.key))
@@ -0,0 +1,77 @@
+from html import escape
+
+# Lines starting with one of these become list items (🖨️ is matched on its base character)
+BULLET_CHARS = frozenset('✨✓✦📄🖨📏💝•-*→')
+HEADING_MAX_LEN = 60
+
+
+def _text_length(line):
+    """Length of an escaped line as the raw text it came from (each entity was one character)."""
+    if '&' not in line:
+        return len(line)
+    return len(line) - 4 * line.count('&amp;') - 3 * line.count('&lt;') - 3 * line.count('&gt;')
+
+
+def _close(block, in_list):
+    if in_list:
+        return '<ul class="desc-list"><li>' + '</li><li>'.join(block) + '</li></ul>'
+    return '<p>' + ' '.join(block) + '</p>'
+
+
+def render_description(description):
+    """
+    Formats a product description in a single pass over its lines:
+    - blank lines close the open paragraph or list
+    - lines ending with ':' or short capitalised lines without a full stop become headings
+    - lines starting with a bullet symbol become list items (the symbol is kept)
+    - everything else is joined into paragraphs
+    Text is HTML-escaped; styling comes from the .pd-desc classes in the stylesheet.
+    """
+    if not description:
+        return ""
+
+    # Escape once up front: escaping never touches whitespace, ':' or '.', and bullet
+    # and uppercase first characters are unchanged, so the rules can read escaped lines
+    if '&' in description or '<' in description or '>' in description:
+        description = escape(description, quote=False)
+    out = []
+    block = []  # The open paragraph's lines, or the open list's items
+    in_list = False
+
+    # Most lines are paragraph text or list items: those tests come first, and a
+    # block's lines are joined once when it closes instead of tagged one by one
+    for line in map(str.strip, description.split('\n')):
+        if not line:
+            if block:
+                out.append(_close(block, in_list))
+                block = []
+            continue
+
+        last = line[-1]
+        if last == ':':
+            pass  # Heading
+        elif line[0] in BULLET_CHARS:  # Never uppercase, so only ':' makes these headings
+            if not in_list:
+                if block:
+                    out.append(_close(block, False))
+                    block = []
+                in_list = True
+            block.append(line)
+            continue
+        elif last == '.' or not line[0].isupper() or _text_length(line) >= HEADING_MAX_LEN:
+            if in_list:
+                if block:
+                    out.append(_close(block, True))
+                    block = []
+                in_list = False
+            block.append(line)
+            continue
+
+        if block:
+            out.append(_close(block, in_list))
+            block = []
+        out.append(f'<h4 class="desc-heading">{line}</h4>')
+
+    if block:
+        out.append(_close(block, in_list))
+    return ''.join(out)
@@ -0,0 +1,355 @@
+"""
+Local development server: python build_site.py serve [--watch] [--port 8000]
+
+Serves the output folder over HTTP. With --watch it polls the catalog files,
+templates and builder modules, rebuilds only the pages a change affects and
+tells open browser tabs to reload over a Server-Sent Events connection.
+Without it the server previews the build with the production cache headers
+from the _headers manifest (see assets.write_cache_headers).
+"""
+import os
+import shutil
+import sys
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import build_site
+import stylesheets
+import templates
+from assets import headers_for, read_cache_headers
+from pagination import page_path, remove_stale_pages
+from related import RelatedIndex
+
+# Configuration
+POLL_INTERVAL = 0.2  # Seconds between watch scans
+LIVE_RELOAD_PATH = "/__livereload"
+LIVE_RELOAD_SCRIPT = (
+    b"<script>new EventSource('" + LIVE_RELOAD_PATH.encode('ascii') + b"')"
+    b".onmessage=function(){location.reload()}</script>"
+)
+ROOT_DIR = Path(build_site.__file__).resolve().parent
+
+# Page type -> the templates (and scripts) it is rendered from; includes are added automatically
+PAGE_TEMPLATES = {
+    "product": ["site/product.html"],
+    "collection": ["site/collection.html", "site/product_card.html"],
+    "home": ["site/home.html", "site/product_card.html", "js/card.js", "js/listing.js"],
+    "search": ["site/search.html", "site/product_card.html", "js/card.js", "js/search.js"],
+}
+
+
+# --- LIVE RELOAD ---
+
+class LiveReload:
+    """A version counter that SSE connections wait on."""
+
+    def __init__(self):
+        self.version = 0
+        self._changed = threading.Condition()
+
+    def notify(self):
+        with self._changed:
+            self.version += 1
+            self._changed.notify_all()
+
+    def wait(self, version, timeout):
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != version, timeout=timeout)
+            return self.version
+
+
+class DevRequestHandler(SimpleHTTPRequestHandler):
+    """
+    Static file handler that injects the live-reload client into HTML and
+    never caches, or - given cache_rules - sends the host's cache headers.
+    """
+
+    reloader = None
+    cache_rules = None  # [(pattern, headers)] from read_cache_headers
+
+    def do_GET(self):
+        if self.path == LIVE_RELOAD_PATH:
+            return self._stream_events()
+        path = self.translate_path(self.path)
+        if os.path.isdir(path) and self.path.split('?', 1)[0].endswith('/'):
+            path = os.path.join(path, 'index.html')
+        if path.endswith('.html') and os.path.isfile(path):
+            body = Path(path).read_bytes()
+            if self.reloader is not None:
+                body = body.replace(b"</body>", LIVE_RELOAD_SCRIPT + b"</body>", 1)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return None
+        return super().do_GET()
+
+    def end_headers(self):
+        if self.cache_rules is None:
+            self.send_header("Cache-Control", "no-store")
+        else:
+            for name, value in headers_for(self.cache_rules, self.path).items():
+                self.send_header(name, value)
+        super().end_headers()
+
+    def _stream_events(self):
+        if self.reloader is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        version = self.reloader.version
+        try:
+            while True:
+                latest = self.reloader.wait(version, timeout=15)
+                self.wfile.write(b"data: reload\n\n" if latest != version else b": ping\n\n")
+                self.wfile.flush()
+                version = latest
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        if self.path != LIVE_RELOAD_PATH:
+            sys.stderr.write(f"   {self.command} {self.path}\n")
+
+
+# --- WATCHING ---
+
+def watched_files():
+    """The catalog files, every template/CSS/JS source and the builder modules."""
+    files = [ROOT_DIR / name for name in (build_site.PRODUCTS_JSON, build_site.PRODUCTS_JSONL, build_site.COLLECTIONS_JSON)]
+    files.extend(path for path in templates.TEMPLATE_DIR.rglob('*') if path.is_file())
+    files.extend(ROOT_DIR.glob('*.py'))
+    return files
+
+
+def snapshot():
+    state = {}
+    for path in watched_files():
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        state[path] = (stat.st_mtime_ns, stat.st_size)
+    return state
+
+
+def changed_files(before, after):
+    return {path for path in before.keys() | after.keys() if before.get(path) != after.get(path)}
+
+
+# --- INCREMENTAL BUILD ---
+
+class IncrementalBuilder:
+    """
+    Keeps the last catalog and stylesheet digests in memory and maps each
+    change to the outputs that depend on it:
+    - a product record -> its page, the collections it is (or was) in,
+      the home page when it is among the first cards, and the pages whose
+      related-products row changed
+    - collections.json -> the collections whose members changed, the home page
+    - a template, CSS or script -> the page types rendered from it, and every
+      page linking a stylesheet bundle whose purged output changed
+    - any catalog change -> the search index and facets, refreshed after the
+      reload event since they scan the whole catalog
+    Builder modules (.py) cannot be reloaded safely, so the server restarts.
+    """
+
+    def __init__(self):
+        self.catalog = None
+        self.related = None
+        self.bundles = {}
+
+    def full_build(self):
+        self.catalog = build_site.build(minify=False, precompress=False, lazy=False)  # Diffed in full on reload
+        if self.catalog is None:
+            return False
+        self.related = RelatedIndex(self.catalog, build_site.RELATED_CACHE)  # Cached by the build
+        self.bundles = self._bundle_digests()
+        return True
+
+    @staticmethod
+    def _bundle_digests():
+        return {name: stylesheets.get_stylesheet(name).digest for name in stylesheets.BUNDLES}
+
+    def rebuild(self, paths):
+        """Rebuilds what paths affect. Returns (pages rebuilt, deferred callable or None)."""
+        if any(path.suffix == '.py' for path in paths):
+            restart()
+
+        page_types = set()
+        template_names = {
+            path.relative_to(templates.TEMPLATE_DIR).as_posix()
+            for path in paths if templates.TEMPLATE_DIR in path.parents
+        }
+        if template_names:
+            page_types |= self._refresh_templates(template_names)
+
+        data_files = {build_site.PRODUCTS_JSON, build_site.PRODUCTS_JSONL, build_site.COLLECTIONS_JSON}
+        products, collections, home, search = [], set(), False, False
+        if any(path.name in data_files for path in paths):
+            products, collections, home, search = self._refresh_catalog()
+
+        catalog = self.catalog
+        if "product" in page_types:
+            products = list(catalog)
+        if "collection" in page_types:
+            collections = set(catalog.collections)
+        home = home or "home" in page_types
+
+        for product in products:
+            build_site.build_product_page(product, catalog, self.related.get(product, build_site.RELATED_PRODUCTS))
+        for key in collections:
+            self._build_collection(key)
+        if home:
+            build_site.build_home_page(catalog)
+
+        count = len(products) + len(collections) + int(home)
+        if "search" in page_types or search:
+            return count, partial(build_site.build_search_page, catalog)
+        return count, None
+
+    def _refresh_templates(self, names):
+        templates.get_template.cache_clear()
+        stylesheets.get_stylesheet.cache_clear()
+        stylesheets.stylesheet_links.cache_clear()
+        bundles = sorted({name for names in build_site.PAGE_STYLESHEETS.values() for name in names})
+        build_site.write_stylesheets(build_site.OUTPUT_DIR, bundles)
+
+        digests = self._bundle_digests()
+        changed_bundles = {name for name, digest in digests.items() if self.bundles.get(name) != digest}
+        self.bundles = digests
+
+        affected = set()
+        for page_type, sources in PAGE_TEMPLATES.items():
+            files = set().union(*(templates.template_files(source) for source in sources))
+            if files & names or changed_bundles & set(build_site.PAGE_STYLESHEETS[page_type]):
+                affected.add(page_type)
+        return affected
+
+    def _refresh_catalog(self):
+        old, new = self.catalog, build_site.load_catalog()
+        old_related, self.related = self.related, RelatedIndex(new, build_site.RELATED_CACHE)
+        self.catalog = new
+
+        changed = [p for p in new if p.listing_id not in old.by_id or old.by_id[p.listing_id].to_dict() != p.to_dict()]
+        removed = [p for listing_id, p in old.by_id.items() if listing_id not in new.by_id]
+
+        # Pages whose slug disappeared (removed products, renamed slugs)
+        for product in removed + [old.by_id[p.listing_id] for p in changed if p.listing_id in old.by_id]:
+            if old.slug(product) not in new.by_slug:
+                stale = Path(build_site.OUTPUT_DIR) / "products" / f"{old.slug(product)}.html"
+                if stale.exists():
+                    stale.unlink()
+
+        collections = set()
+        for product in changed:
+            collections.update(new.collection_keys(product))
+            if product.listing_id in old.by_id:
+                collections.update(old.collection_keys(old.by_id[product.listing_id]))
+        for product in removed:
+            collections.update(old.collection_keys(product))
+        for key in old.collections.keys() | new.collections.keys():
+            if [p.listing_id for p in old.collection(key)] != [p.listing_id for p in new.collection(key)]:
+                collections.add(key)
+
+        first = lambda catalog: [p.listing_id for p in catalog.products[:build_site.HOME_PRODUCTS]]
+        changed_ids = {p.listing_id for p in changed}
+        home = (first(old) != first(new) or bool(changed_ids & set(first(new)))
+                or list(old.collections) != list(new.collections))
+        search = bool(changed or removed or collections)
+        # JSON documents and listing shards; the home page links the new listing manifest
+        if search or [p.listing_id for p in old] != [p.listing_id for p in new]:
+            build_site.build_api(new)
+            home = True
+
+        # Related rows: IDF weights shift with the catalog, so unchanged products can get
+        # new neighbours, and a row showing a changed product needs its new card
+        shown = slice(None, build_site.RELATED_PRODUCTS)
+        for product in new:
+            listing_id = product.listing_id
+            if listing_id in changed_ids:
+                continue
+            neighbours = self.related.related.get(listing_id, [])[shown]
+            if neighbours != old_related.related.get(listing_id, [])[shown] or changed_ids & set(neighbours):
+                changed.append(product)
+        return changed, collections, home, search
+
+    def _build_collection(self, key):
+        catalog = self.catalog
+        if catalog.collection(key):
+            build_site.build_collection_page(key, catalog)
+            return
+        # Emptied or deleted collection: remove its pages
+        slug = key.lower().replace(" ", "-")
+        collections_dir = Path(build_site.OUTPUT_DIR) / "collections"
+        page = collections_dir / page_path(slug, 1)
+        if page.exists():
+            page.unlink()
+        remove_stale_pages(collections_dir, slug, 0)
+        if (collections_dir / slug).is_dir() and not any((collections_dir / slug).iterdir()):
+            shutil.rmtree(collections_dir / slug)
+
+
+def restart():
+    """Re-executes the server so edited builder modules are imported fresh."""
+    print("\n🔁 Builder code changed - restarting...\n", flush=True)
+    os.execv(sys.executable, [sys.executable] + sys.argv)
+
+
+def watch(builder, reloader):
+    state = snapshot()
+    while True:
+        time.sleep(POLL_INTERVAL)
+        current = snapshot()
+        paths = changed_files(state, current)
+        if not paths:
+            continue
+        state = current
+        names = ', '.join(sorted(path.name for path in paths))
+        start = time.perf_counter()
+        try:
+            count, deferred = builder.rebuild(paths)
+        except Exception as e:  # Keep serving; the next save usually fixes it
+            print(f"❌ Rebuild failed ({names}): {e!r}", flush=True)
+            continue
+        reloader.notify()
+        print(f"⚡ {names}: rebuilt {count} page(s) in {(time.perf_counter() - start) * 1000:.0f} ms", flush=True)
+        if deferred:
+            start = time.perf_counter()
+            deferred()
+            print(f"   search index refreshed in {(time.perf_counter() - start) * 1000:.0f} ms", flush=True)
+
+
+# --- ENTRY POINT ---
+
+def serve(port=8000, watch_files=False):
+    """Builds once (unminified), then serves the output folder; with watch_files, rebuilds on change."""
+    builder = IncrementalBuilder()
+    if not builder.full_build():
+        return
+
+    reloader = LiveReload() if watch_files else None
+    cache_rules = None if watch_files else read_cache_headers(build_site.OUTPUT_DIR)
+    handler = type("Handler", (DevRequestHandler,), {"reloader": reloader, "cache_rules": cache_rules})
+    server = ThreadingHTTPServer(("127.0.0.1", port), partial(handler, directory=str(Path(build_site.OUTPUT_DIR).resolve())))
+    server.daemon_threads = True
+    print(f"\n🌐 Serving http://127.0.0.1:{port}/" + (" (watching for changes)" if watch_files else ""), flush=True)
+
+    if not watch_files:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        watch(builder, reloader)
+    except KeyboardInterrupt:
+        server.shutdown()
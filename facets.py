@@ -0,0 +1,106 @@
+import json
+import os
+import re
+from pathlib import Path
+
+from static_files import remove_stale, write_hashed
+
+# Configuration
+STATIC_DATA_DIR = "static/data"  # Relative to the output folder
+FACETS_VERSION = 1
+MASK_BITS = 30  # Collections per bitmask column, so masks stay small ints for JS bitwise ops
+
+CURRENCY_SYMBOLS = {'£': 'GBP', '$': 'USD', '€': 'EUR', '¥': 'JPY'}
+PRICE_RE = re.compile(r"(\d{1,3}(?:,\d{3})+|\d+)(?:\.(\d+))?")
+CURRENCY_CODE_RE = re.compile(r"\b([A-Z]{3})\b")
+
+
+def parse_price(text, default_currency='GBP'):
+    """
+    Parses a scraped price like "£1.56", "USD 12.00" or "1,234.5" into
+    (amount in minor units, currency code). Returns (None, currency) when
+    no number is found.
+    """
+    text = (text or '').strip()
+    currency = next((code for symbol, code in CURRENCY_SYMBOLS.items() if symbol in text), None)
+    if currency is None:
+        match = CURRENCY_CODE_RE.search(text)
+        currency = match.group(1) if match else default_currency
+
+    match = PRICE_RE.search(text)
+    if not match:
+        return None, currency
+    whole, fraction = match.groups()
+    minor = int(whole.replace(',', '')) * 100
+    if fraction:
+        minor += int(round(float('0.' + fraction) * 100))
+    return minor, currency
+
+
+def image_base(urls):
+    """Longest common prefix of the image URLs, cut back to a '/' boundary."""
+    urls = [url for url in urls if url]
+    if len(urls) < 2:
+        return ''
+    prefix = os.path.commonprefix(urls)
+    return prefix[:prefix.rfind('/') + 1]
+
+
+def build_facets(catalog):
+    """
+    Builds the columnar facet table. Row i is the i-th catalog product, the
+    same numbering as the search document shards, so a filtered row list
+    can be rendered straight from them.
+    - price: minor units (pence/cents), null when unparseable
+    - currency: index into 'currencies'
+    - collections: one bitmask column per MASK_BITS collections; bit b of
+      column c means collection number c * MASK_BITS + b in 'collections'
+    - image: first image URL with the shared 'imageBase' prefix removed
+    """
+    collection_keys = list(catalog.collections)
+    bit_of = {key: i for i, key in enumerate(collection_keys)}
+    mask_columns = [[] for _ in range(max(1, -(-len(collection_keys) // MASK_BITS)))]
+    currencies = []
+    currency_index = {}
+    columns = {'id': [], 'price': [], 'currency': [], 'image': []}
+
+    images = [catalog.image(p) for p in catalog]
+    base = image_base(images)
+
+    for product, image in zip(catalog, images):
+        price, currency = parse_price(product.price)
+        if currency not in currency_index:
+            currency_index[currency] = len(currencies)
+            currencies.append(currency)
+        columns['id'].append(product.listing_id)
+        columns['price'].append(price)
+        columns['currency'].append(currency_index[currency])
+        columns['image'].append(image[len(base):] if image.startswith(base) else image)
+
+        masks = [0] * len(mask_columns)
+        for key in catalog.collection_keys(product):
+            bit = bit_of[key]
+            masks[bit // MASK_BITS] |= 1 << (bit % MASK_BITS)
+        for column, mask in zip(mask_columns, masks):
+            column.append(mask)
+
+    return {
+        'version': FACETS_VERSION,
+        'count': len(catalog),
+        'collections': collection_keys,
+        'maskBits': MASK_BITS,
+        'currencies': currencies,
+        'imageBase': base,
+        'columns': {**columns, 'collections': mask_columns},
+    }
+
+
+def write_facets(output_dir, catalog):
+    """Writes static/data/facets.<hash>.json (removing stale versions) and returns its filename."""
+    data_dir = Path(output_dir) / STATIC_DATA_DIR
+    data_dir.mkdir(parents=True, exist_ok=True)
+    data = json.dumps(build_facets(catalog), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    keep = set()
+    filename = write_hashed(data_dir, "facets", data, ".json", keep)
+    remove_stale(data_dir, "facets.*.json*", keep)
+    return filename
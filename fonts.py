@@ -0,0 +1,183 @@
+import hashlib
+import importlib.util
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from templates import TEMPLATE_DIR
+
+try:
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+except ImportError:  # Optional: pip install fonttools brotli
+    subset = None
+
+# Configuration
+FONT_SOURCE_DIR = TEMPLATE_DIR.parent / "fonts"  # Local .ttf/.otf files (Google Fonts downloads)
+STATIC_FONT_DIR = "static/fonts"  # Relative to the output folder
+# Loaded without blocking rendering when no face could be self-hosted
+# (no fonts/ folder, or fontTools missing), so pages keep the brand fonts
+GOOGLE_FONTS_CSS = "https://fonts.googleapis.com/css2?family=Fredoka:wght@500&family=Poppins:wght@300;400;500;600&display=swap"
+GOOGLE_FONTS_HOSTS = ('<link rel="preconnect" href="https://fonts.googleapis.com">',
+                      '<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>')  # Font files are CORS
+
+# (family, weight, candidate source files, preload?) - the first existing file wins.
+# Variable fonts are pinned to the requested weight before subsetting.
+FONT_FACES = [
+    ("Fredoka", 500, ["Fredoka-Medium.ttf", "Fredoka-VariableFont_wdth,wght.ttf", "Fredoka[wdth,wght].ttf"], True),
+    ("Poppins", 300, ["Poppins-Light.ttf"], False),
+    ("Poppins", 400, ["Poppins-Regular.ttf"], True),
+    ("Poppins", 500, ["Poppins-Medium.ttf"], False),
+    ("Poppins", 600, ["Poppins-SemiBold.ttf"], False),
+]
+
+# Always keep printable ASCII so text injected by scripts still renders in the brand font
+BASE_CHARS = ''.join(chr(c) for c in range(0x20, 0x7f))
+TAG_RE = re.compile(r"<[^>]*>")
+
+
+class FontFile:
+    """One subsetted face written to static/fonts."""
+
+    __slots__ = ("family", "weight", "filename", "format", "preload")
+
+    def __init__(self, family, weight, filename, format, preload):
+        self.family = family
+        self.weight = weight
+        self.filename = filename
+        self.format = format
+        self.preload = preload
+
+    def href(self, prefix="/"):
+        return f"{prefix}{STATIC_FONT_DIR}/{self.filename}"
+
+
+_built_fonts = []
+
+
+# --- GLYPH COLLECTION ---
+
+def collect_text(strings=(), paths=()):
+    """
+    Returns every character that can appear on the generated site: the catalog
+    strings plus the visible text of the templates and builder code.
+    Works before rendering, so font file names are known up front.
+    """
+    chars = set(BASE_CHARS)
+    for text in strings:
+        if text:
+            chars.update(text)
+    for path in paths:
+        for file in sorted(Path(path).rglob('*')) if Path(path).is_dir() else [Path(path)]:
+            if file.suffix in ('.html', '.py', '.js'):
+                chars.update(TAG_RE.sub(' ', file.read_text(encoding='utf-8')))
+    return ''.join(sorted(c for c in chars if c.isprintable()))
+
+
+def catalog_strings(products, collections=()):
+    """Yields the human-visible strings of a catalog."""
+    for p in products:
+        yield p.title
+        yield p.description
+        yield p.meta_description
+        yield p.price
+        yield from p.tags
+    for name in collections:
+        yield name.title()
+
+
+# --- SUBSETTING ---
+
+def find_source(candidates):
+    for name in candidates:
+        path = FONT_SOURCE_DIR / name
+        if path.exists():
+            return path
+    return None
+
+
+def subset_font(source, weight, chars, output_path, flavor):
+    """Subsets one face to chars and saves it as WOFF2 (or WOFF without brotli)."""
+    font = TTFont(source)
+    if 'fvar' in font:
+        from fontTools.varLib import instancer
+        axes = {axis.axisTag: (weight if axis.axisTag == 'wght' else None) for axis in font['fvar'].axes}
+        font = instancer.instantiateVariableFont(font, axes)
+
+    options = subset.Options()
+    options.flavor = flavor
+    options.desubroutinize = True
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes={ord(c) for c in chars})
+    subsetter.subset(font)
+    font.flavor = flavor
+    font.save(output_path)
+
+
+def woff_flavor():
+    """WOFF2 needs brotli; fall back to zlib-compressed WOFF without it."""
+    return 'woff2' if importlib.util.find_spec('brotli') else 'woff'
+
+
+def build_fonts(output_dir, chars, prune=True):
+    """
+    Writes a content-hashed subset for every face whose source file exists,
+    removing older subsets of the face when prune is set (builds that leave
+    pages unwritten keep them: those pages still link the older files).
+    Returns the FontFile list and remembers it for font_head.
+    """
+    _built_fonts.clear()
+    font_head.cache_clear()
+    if subset is None:
+        return []
+
+    font_dir = Path(output_dir) / STATIC_FONT_DIR
+    flavor = woff_flavor()
+    chars_hash = hashlib.sha256(chars.encode('utf-8')).hexdigest()
+
+    for family, weight, candidates, preload in FONT_FACES:
+        source = find_source(candidates)
+        if source is None:
+            continue
+        font_dir.mkdir(parents=True, exist_ok=True)
+
+        # Cached by source bytes + glyph set: unchanged subsets are never rebuilt
+        digest = hashlib.sha256(source.read_bytes() + chars_hash.encode('ascii') + flavor.encode('ascii')).hexdigest()[:10]
+        stem = f"{family.lower()}-{weight}"
+        filename = f"{stem}.{digest}.{flavor}"
+        path = font_dir / filename
+        if not path.exists():
+            subset_font(source, weight, chars, path, flavor)
+        if prune:
+            for stale in font_dir.glob(f"{stem}.*"):
+                if stale != path:
+                    stale.unlink()
+        _built_fonts.append(FontFile(family, weight, filename, flavor, preload))
+
+    return list(_built_fonts)
+
+
+# --- HEAD MARKUP ---
+
+@lru_cache(maxsize=None)
+def font_head(prefix="/"):
+    """
+    Returns (preload_links, font_face_css) for pages whose static/ folder is at prefix.
+    When no local fonts were built, the links load the Google Fonts stylesheet
+    instead (preconnected, and applied once loaded so it never blocks rendering).
+    """
+    if not _built_fonts:
+        links = list(GOOGLE_FONTS_HOSTS)
+        links.append(f'<link rel="stylesheet" href="{GOOGLE_FONTS_CSS}" media="print" onload="this.media=\'all\'">')
+        links.append(f'<noscript><link rel="stylesheet" href="{GOOGLE_FONTS_CSS}"></noscript>')
+        return '\n    '.join(links), ""
+    preloads = '\n    '.join(
+        f'<link rel="preload" href="{font.href(prefix)}" as="font" type="font/{font.format}" crossorigin>'
+        for font in _built_fonts if font.preload
+    )
+    css = ''.join(
+        f"@font-face{{font-family:'{font.family}';font-style:normal;font-weight:{font.weight};"
+        f"font-display:swap;src:url({font.href(prefix)}) format('{font.format}')}}"
+        for font in _built_fonts
+    )
+    return preloads, css
@@ -0,0 +1,52 @@
+import re
+
+# Configuration
+# Etsy serves each listing image in fixed sizes named in its URL: il_1588xN (full
+# width), il_570xN, il_170x135 (cropped) ... Other URLs are used as they are.
+ETSY_SIZE_RE = re.compile(r'/il_(?:\d+|full)x(?:\d+|N|full)\.')
+HERO_WIDTHS = (570, 794, 1140, 1588)  # srcset candidates for the main image
+# Rendered width of the main image: one column on phones, half the container above (see product.css)
+HERO_SIZES = "(max-width: 768px) calc(100vw - 48px), 494px"
+THUMB_SIZES = ("170x135", "340x270")  # 1x and 2x sources for the 80px thumbnails
+THUMB_PX = 80
+
+
+def image_variant(url, size):
+    """url at another Etsy size ("570xN", "170x135", ...); None when url is not a sized Etsy image."""
+    if not ETSY_SIZE_RE.search(url):
+        return None
+    return ETSY_SIZE_RE.sub(f'/il_{size}.', url, count=1)
+
+
+def hero_srcset(url):
+    """The srcset for a full-size image ('' when no smaller variants exist)."""
+    if not ETSY_SIZE_RE.search(url):
+        return ""
+    return ', '.join(f"{image_variant(url, f'{width}xN')} {width}w" for width in HERO_WIDTHS)
+
+
+def _thumb(src, srcset, full, full_srcset, active, alt):
+    return (
+        f'<img src="{src}"{srcset} data-src="{full}" data-srcset="{full_srcset}" '
+        f'class="gallery-thumb{" active" if active else ""}" width="{THUMB_PX}" height="{THUMB_PX}" '
+        f'loading="lazy" decoding="async" tabindex="0" role="button" alt="{alt}">'
+    )
+
+
+def render_thumbs(images, previews=()):
+    """
+    Gallery thumbnails as small image variants. Each thumb carries its full
+    image in data-src/data-srcset; the product page script prefetches it on
+    hover or focus and swaps it into the main image on click.
+    previews (see previews.product_previews) follow the listing photos,
+    with their prebuilt thumbnails.
+    """
+    count = len(images)
+    thumbs = []
+    for i, url in enumerate(images):
+        small = [image_variant(url, size) for size in THUMB_SIZES]
+        sources = f' srcset="{small[0]} 1x, {small[1]} 2x"' if small[0] else ""
+        thumbs.append(_thumb(small[0] or url, sources, url, hero_srcset(url), i == 0, f"Image {i + 1} of {count}"))
+    for preview in previews:
+        thumbs.append(_thumb(preview['thumb'], "", preview['src'], "", False, preview['alt']))
+    return ''.join(thumbs)
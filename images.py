@@ -0,0 +1,207 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from fnmatch import fnmatchcase
+from functools import lru_cache
+from pathlib import Path
+
+from postprocess import CACHE_DIR
+from templates import TEMPLATE_DIR
+
+try:
+    from PIL import Image
+except ImportError:  # Optional: pip install pillow (AVIF needs Pillow 11.2+ or pillow-avif-plugin)
+    Image = None
+else:
+    try:
+        import pillow_avif  # noqa: F401  Registers AVIF with older Pillow versions
+    except ImportError:
+        pass
+
+# Configuration
+SOURCE_DIR = TEMPLATE_DIR.parent  # Where the source PNGs live
+STATIC_IMAGE_DIR = "static/img"  # Relative to the output folder
+IMAGE_CACHE = "images.json"  # In the build cache: what was encoded from which source
+# Source pattern -> widths to encode (never upscaled: larger widths become the source width).
+# Brand images only: artwork is published watermarked, by previews.py
+IMAGE_SOURCES = {
+    "Logo-*.png": (36, 72),  # The nav mark (36px and 2x)
+    "banner.png": (640, 1200, 1920),  # 1200 is also the og:image
+}
+# Encoded for every width; pages list them smallest first, with the PNG as the <img> fallback
+FORMATS = ("avif", "webp", "png")
+ENCODER_OPTIONS = {
+    "avif": {"quality": 50, "speed": 6},
+    "webp": {"quality": 80, "method": 6},
+    "png": {"optimize": True},
+}
+MIME_TYPES = {"avif": "image/avif", "webp": "image/webp", "png": "image/png"}
+WORKERS = None  # Encoding processes; None uses every CPU
+
+_optimized = {}  # Source file name -> cache entry, set by optimize_images
+
+
+# --- ENCODING ---
+
+def available_formats():
+    """The FORMATS this Pillow can write (AVIF support depends on how it was built)."""
+    if Image is None:
+        return ()
+    Image.init()
+    return tuple(fmt for fmt in FORMATS if fmt.upper() in Image.SAVE)
+
+
+def source_digest(path, widths, formats):
+    """Hash of the source bytes and the encoder settings: any change gives new output names."""
+    settings = json.dumps([widths, formats, {fmt: ENCODER_OPTIONS[fmt] for fmt in formats}], sort_keys=True)
+    return hashlib.sha256(path.read_bytes() + settings.encode('utf-8')).hexdigest()[:10]
+
+
+def encode_width(source, output_dir, digest, width, formats):
+    """
+    Encodes one width of a source in every format (runs in a worker process).
+    Files that already exist are kept, so an interrupted run resumes where it
+    stopped. Returns the variants as dicts.
+    """
+    source = Path(source)
+    with Image.open(source) as im:
+        im.load()
+        if im.mode not in ('RGB', 'RGBA'):
+            im = im.convert('RGBA' if 'A' in im.mode or 'transparency' in im.info else 'RGB')
+        if width < im.width:
+            im = im.resize((width, max(1, round(im.height * width / im.width))), Image.Resampling.LANCZOS)
+
+        variants = []
+        for fmt in formats:
+            filename = f"{source.stem}-{im.width}.{digest}.{fmt}"
+            path = Path(output_dir) / filename
+            if not path.exists():
+                tmp = path.with_name(f".{filename}.{os.getpid()}.tmp")
+                im.save(tmp, format=fmt.upper(), **ENCODER_OPTIONS[fmt])
+                os.replace(tmp, path)
+            variants.append({'format': fmt, 'width': im.width, 'height': im.height,
+                             'file': filename, 'bytes': path.stat().st_size})
+    return variants
+
+
+def discover_sources():
+    """(path, widths) for every source file matching IMAGE_SOURCES."""
+    for pattern, widths in IMAGE_SOURCES.items():
+        for path in sorted(SOURCE_DIR.glob(pattern)):
+            if path.is_file():
+                yield path, widths
+
+
+def _load_cache(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def optimize_images(output_dir, workers=WORKERS, prune=True):
+    """
+    Encodes every source image at its widths in each available format into
+    static/img/<stem>-<width>.<digest>.<format>, in a process pool, and
+    removes stale outputs when prune is set (builds that leave pages
+    unwritten keep them: those pages still link the older files). Sources whose digest is in the build cache with
+    all their files present are skipped without being decoded.
+    Returns (sources, widths encoded this run) and remembers the variants for picture().
+    """
+    _optimized.clear()
+    picture.cache_clear()
+    formats = available_formats()
+    if not formats:
+        return 0, 0
+
+    image_dir = Path(output_dir) / STATIC_IMAGE_DIR
+    image_dir.mkdir(parents=True, exist_ok=True)
+    cache_path = Path(output_dir) / CACHE_DIR / IMAGE_CACHE
+    cache = _load_cache(cache_path)
+
+    entries = {}
+    jobs = []
+    for path, widths in discover_sources():
+        digest = source_digest(path, widths, formats)
+        entry = cache.get(path.name)
+        if (entry and entry.get('digest') == digest
+                and all((image_dir / variant['file']).exists() for variant in entry['variants'])):
+            entries[path.name] = entry
+            continue
+        entries[path.name] = {'digest': digest, 'variants': []}
+        with Image.open(path) as im:
+            source_width = im.width
+        for width in sorted({min(width, source_width) for width in widths}):
+            jobs.append((path.name, (str(path), str(image_dir), digest, width, formats)))
+
+    if jobs:
+        with ProcessPoolExecutor(max_workers=min(len(jobs), workers or os.cpu_count() or 1)) as pool:
+            futures = [(name, pool.submit(encode_width, *args)) for name, args in jobs]
+            for name, future in futures:
+                entries[name]['variants'].extend(future.result())
+
+    keep = {variant['file'] for entry in entries.values() for variant in entry['variants']}
+    for stale in image_dir.iterdir() if prune else ():
+        if stale.name not in keep:
+            stale.unlink()
+
+    if entries != cache:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, indent=2, sort_keys=True)
+    _optimized.update(entries)
+    return len(entries), len(jobs)
+
+
+# --- MARKUP ---
+
+def _entry(pattern):
+    return next((entry for name, entry in sorted(_optimized.items()) if fnmatchcase(name, pattern)), None)
+
+
+def image_url(pattern, width, fmt="png", prefix="/"):
+    """URL of the optimized variant closest to width in fmt, or None when the image was not optimized."""
+    entry = _entry(pattern)
+    variants = [variant for variant in entry['variants'] if variant['format'] == fmt] if entry else []
+    if not variants:
+        return None
+    best = min(variants, key=lambda variant: abs(variant['width'] - width))
+    return f"{prefix}{STATIC_IMAGE_DIR}/{best['file']}"
+
+
+@lru_cache(maxsize=None)
+def picture(pattern, alt, sizes, width, prefix="/", css_class=""):
+    """
+    A <picture> for the first optimized source matching pattern, displayed
+    width CSS pixels wide: one <source> per format, ordered by size so the
+    browser takes the smallest it supports, and the PNG as the <img>.
+    '' when the image was not optimized (no Pillow or no source file).
+    """
+    entry = _entry(pattern)
+    if entry is None:
+        return ""
+    by_format = {}
+    for variant in entry['variants']:
+        by_format.setdefault(variant['format'], []).append(variant)
+    fallback = by_format.pop('png', None)
+    if not fallback:
+        return ""
+
+    def srcset(variants):
+        return ', '.join(f"{prefix}{STATIC_IMAGE_DIR}/{v['file']} {v['width']}w" for v in variants)
+
+    png_bytes = sum(v['bytes'] for v in fallback)
+    ranked = sorted(by_format.items(), key=lambda item: sum(v['bytes'] for v in item[1]))
+    sources = ''.join(
+        f'<source type="{MIME_TYPES[fmt]}" srcset="{srcset(variants)}" sizes="{sizes}">'
+        for fmt, variants in ranked if sum(v['bytes'] for v in variants) < png_bytes
+    )
+    smallest = fallback[0]
+    height = round(width * smallest['height'] / smallest['width'])
+    class_attr = f' class="{css_class}"' if css_class else ""
+    return (
+        f'<picture>{sources}<img src="{prefix}{STATIC_IMAGE_DIR}/{smallest["file"]}" srcset="{srcset(fallback)}" '
+        f'sizes="{sizes}" width="{width}" height="{height}" alt="{alt}"{class_attr} decoding="async"></picture>'
+    )
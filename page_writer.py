@@ -0,0 +1,29 @@
+import os
+from pathlib import Path
+
+# Configuration
+BUFFER_SIZE = 64 * 1024  # Bytes buffered before each write to disk
+
+
+def write_page(path, chunks, buffer_size=BUFFER_SIZE):
+    """
+    Writes an iterable of text chunks to path without ever joining them:
+    chunks go through a buffered temp file next to path, which replaces
+    path once the last chunk is written. If rendering fails midway the
+    temp file is removed and the previous page is left untouched.
+    Returns the number of characters written.
+    """
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    written = 0
+    try:
+        with open(tmp, 'w', encoding='utf-8', buffering=buffer_size) as f:
+            for chunk in chunks:
+                f.write(chunk)
+                written += len(chunk)
+        os.replace(tmp, path)
+    except BaseException:
+        if tmp.exists():
+            tmp.unlink()
+        raise
+    return written
@@ -0,0 +1,54 @@
+from pathlib import Path
+
+
+def paginate(items, page_size):
+    """Splits items into pages of page_size (always at least one, possibly empty, page)."""
+    if not page_size or page_size <= 0:
+        return [items]
+    return [items[i:i + page_size] for i in range(0, len(items), page_size)] or [items[:0]]
+
+
+def page_path(slug, number):
+    """
+    Path of a listing page relative to collections/: page 1 keeps the
+    existing <slug>.html URL, later pages live in collections/<slug>/page-N.html.
+    """
+    return f"{slug}.html" if number == 1 else f"{slug}/page-{number}.html"
+
+
+def rel_links(number, total, href):
+    """<link rel=prev/next> tags for the <head>; href(n) returns the URL of page n."""
+    links = []
+    if number > 1:
+        links.append(f'<link rel="prev" href="{href(number - 1)}">')
+    if number < total:
+        links.append(f'<link rel="next" href="{href(number + 1)}">')
+    return '\n    '.join(links)
+
+
+def pagination_nav(number, total, href):
+    """Previous / numbered / next links below a grid; empty for single-page listings."""
+    if total <= 1:
+        return ""
+    parts = []
+    if number > 1:
+        parts.append(f'<a href="{href(number - 1)}" rel="prev">&larr; Previous</a>')
+    for n in range(1, total + 1):
+        if n == number:
+            parts.append(f'<span aria-current="page">{n}</span>')
+        else:
+            parts.append(f'<a href="{href(n)}">{n}</a>')
+    if number < total:
+        parts.append(f'<a href="{href(number + 1)}" rel="next">Next &rarr;</a>')
+    return f'<nav class="pagination" aria-label="Pages">{"".join(parts)}</nav>'
+
+
+def remove_stale_pages(collections_dir, slug, total):
+    """Deletes page-N.html files (and .gz/.br siblings) beyond the current page count."""
+    removed = []
+    for path in (Path(collections_dir) / slug).glob("page-*.html*"):
+        number = path.name[len("page-"):].split('.', 1)[0]
+        if number.isdigit() and int(number) > total:
+            path.unlink()
+            removed.append(path)
+    return removed
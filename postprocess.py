@@ -0,0 +1,314 @@
+import hashlib
+import json
+import os
+import re
+import zlib
+from functools import partial
+from pathlib import Path
+
+from page_writer import write_page
+from stylesheets import minify_css
+
+try:
+    import brotli
+except ImportError:  # Optional: pip install brotli
+    brotli = None
+
+# Configuration
+CACHE_DIR = ".build_cache"  # Relative to the output folder
+COMPRESS_CACHE = "compress.json"  # Output path -> sha256 of its final bytes
+SOURCE_CACHE = "sources.json"  # Output path -> [digest of what it was made from, mtime_ns, size, minified]
+READ_BLOCK = 64 * 1024  # Bytes read at a time when minifying, hashing or compressing a file
+COMPRESSIBLE = ('.html', '.css', '.js', '.json', '.xml', '.svg', '.txt')
+
+RAW_TEXT_RE = re.compile(r"(<(script|style|pre|textarea)\b[^>]*>)(.*?)(</\2\s*>)", re.S | re.I)
+COMMENT_RE = re.compile(r"<!--(?!\[if).*?-->", re.S)
+BLOCK_TAGS = (
+    "html|head|body|meta|link|title|style|script|nav|header|footer|section|main|article|aside|"
+    "div|p|ul|ol|li|h[1-6]|table|thead|tbody|tr|td|th|form|br|hr|!DOCTYPE"
+)
+BLOCK_SPACE_RE = re.compile(rf"\s*(</?(?:{BLOCK_TAGS})\b[^>]*>)\s*", re.I)
+# minify_chunks: raw-text openers, and the end of a block-level tag plus its whitespace
+RAW_OPEN_RE = re.compile(r"<(script|style|pre|textarea)\b[^>]*>", re.I)
+CUT_RE = re.compile(rf"</?(?:{BLOCK_TAGS})\b[^>]*>\s*(?=\S)", re.I)
+MINIFY_BLOCK = 64 * 1024  # Characters minify_chunks buffers before looking for a cut
+
+
+# --- MINIFICATION ---
+
+def minify_js(js):
+    """
+    Conservative JS minification: trims indentation and blank lines but keeps
+    line breaks, so automatic semicolon insertion behaves exactly as before.
+    """
+    lines = (line.strip() for line in js.split('\n'))
+    return '\n'.join(line for line in lines if line)
+
+
+def _minify_raw_text(match):
+    open_tag, tag, body, close_tag = match.groups()
+    tag = tag.lower()
+    if tag == 'style':
+        body = minify_css(body)
+    elif tag == 'script':
+        if 'application/ld+json' in open_tag or 'speculationrules' in open_tag:
+            try:
+                body = json.dumps(json.loads(body), ensure_ascii=False, separators=(',', ':'))
+            except ValueError:
+                body = body.strip()
+        else:
+            body = minify_js(body)
+    return open_tag, body, close_tag
+
+
+def minify_html(html):
+    """
+    Minifies a page without changing how it renders:
+    - <pre>/<textarea> content is kept verbatim, <style> and <script> are minified separately
+    - comments are dropped (conditional comments are kept)
+    - whitespace runs collapse to one space, and disappear around block-level tags
+    """
+    out = []
+    pos = 0
+    for match in RAW_TEXT_RE.finditer(html):
+        out.append(_minify_markup(html[pos:match.start()]))
+        out.extend(_minify_raw_text(match))
+        pos = match.end()
+    out.append(_minify_markup(html[pos:]))
+    return ''.join(out).strip()
+
+
+def _minify_markup(markup):
+    markup = COMMENT_RE.sub('', markup)
+    markup = re.sub(r"\s+", ' ', markup)
+    return BLOCK_SPACE_RE.sub(r"\1", markup)
+
+
+def minify_chunks(chunks, block=MINIFY_BLOCK):
+    """
+    minify_html over a stream of text chunks, with the same result: the
+    text is buffered to about block characters, then cut after the last
+    block-level tag (and the whitespace after it) that is outside raw-text
+    elements and comments, where minifying the two sides apart changes
+    nothing. Yields the minified pieces.
+    """
+    parts, size = [], 0
+    for chunk in chunks:
+        parts.append(chunk)
+        size += len(chunk)
+        if size < block:
+            continue
+        text = ''.join(parts)
+        cut = _cut_point(text)
+        if cut:
+            piece = minify_html(text[:cut])
+            if piece:
+                yield piece
+            text = text[cut:]
+        parts, size = [text], len(text)
+    piece = minify_html(''.join(parts))
+    if piece:
+        yield piece
+
+
+def _protected(text):
+    """
+    (start, end) of every raw-text element and comment in text, the way
+    minify_html finds them; end is None for one still open at the end.
+    """
+    pos = 0
+    while True:
+        match = RAW_OPEN_RE.search(text, pos)
+        stop = match.start() if match else len(text)
+        comment = text.find('<!--', pos, stop)
+        while comment != -1:
+            end = text.find('-->', comment + 4, stop)
+            if end == -1:
+                yield comment, None if match is None else stop
+                break
+            yield comment, end + 3
+            comment = text.find('<!--', end + 3, stop)
+        if match is None:
+            return
+        close = re.compile(rf"</{match.group(1)}\s*>", re.I).search(text, match.end())
+        if close is None:
+            yield match.start(), None
+            return
+        yield match.start(), close.end()
+        pos = close.end()
+
+
+def _cut_point(text):
+    """Where minify_chunks can split text (0 when nowhere yet)."""
+    regions = list(_protected(text))
+    limit = len(text)
+    if regions and regions[-1][1] is None:
+        limit = regions.pop()[0]
+    for match in reversed(list(CUT_RE.finditer(text, 0, limit))):
+        # Not inside a raw-text element or comment, nor after one's closing tag
+        if not any(start < match.end() and match.start() < end for start, end in regions):
+            return match.end()
+    return 0
+
+
+# --- PRECOMPRESSION ---
+
+def compress_siblings(path):
+    """Writes path.gz (and path.br when brotli is installed) at maximum compression, reading path in blocks."""
+    path = Path(path)
+    written = [path.with_name(path.name + '.gz')]
+    # Same bytes as gzip.compress(data, 9, mtime=0): a zlib gzip stream, mtime 0 keeps it identical across builds
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 31)
+    with open(path, 'rb') as src, open(written[0], 'wb') as out:
+        for block in iter(partial(src.read, READ_BLOCK), b''):
+            out.write(compressor.compress(block))
+        out.write(compressor.flush())
+    if brotli is not None:
+        br_path = path.with_name(path.name + '.br')
+        compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=11)
+        with open(path, 'rb') as src, open(br_path, 'wb') as out:
+            for block in iter(partial(src.read, READ_BLOCK), b''):
+                out.write(compressor.process(block))
+            out.write(compressor.finish())
+        written.append(br_path)
+    return written
+
+
+def _siblings_exist(path):
+    if not path.with_name(path.name + '.gz').exists():
+        return False
+    return brotli is None or path.with_name(path.name + '.br').exists()
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(partial(f.read, READ_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_cache(output_dir, name=COMPRESS_CACHE):
+    path = Path(output_dir) / CACHE_DIR / name
+    if path.exists():
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def save_cache(output_dir, cache, name=COMPRESS_CACHE):
+    path = Path(output_dir) / CACHE_DIR / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+
+
+class PageOutput:
+    """
+    Writes pages in their final form as they are built. The rendered chunks
+    are hashed on their way to a temp file; when the digest matches the
+    page's last build and the output is still the file written then (same
+    mtime and size, siblings present), the temp file is dropped without
+    minifying or compressing anything. Otherwise it is minified in blocks
+    (minify_chunks) into place and precompressed. Use save() at the end.
+    """
+
+    def __init__(self, output_dir, minify=True, precompress=True):
+        self.output_dir = Path(output_dir)
+        self.minify = minify
+        self.precompress = precompress
+        self.digests = load_cache(output_dir)
+        self.sources = load_cache(output_dir, SOURCE_CACHE)
+        self.written = set()  # Output paths handled this run
+        self.processed = self.skipped = 0
+
+    def write(self, path, chunks):
+        """Writes a page from its rendered text chunks under output_dir."""
+        path = Path(path)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.src")
+        digest = hashlib.sha256()
+        try:
+            with open(tmp, 'wb') as f:
+                for chunk in chunks:
+                    data = chunk.encode('utf-8')
+                    f.write(data)
+                    digest.update(data)
+            self._publish(path, tmp, digest.hexdigest())
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+
+    def process_file(self, path):
+        """Minifies and precompresses a file already in the output folder, unless it is as last processed."""
+        path = Path(path)
+        entry = self.sources.get(self._key(path))
+        if entry and self._current(path, entry[0]):
+            self.written.add(self._key(path))
+            self.skipped += 1
+            return
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.src")
+        os.replace(path, tmp)
+        try:
+            self._publish(path, tmp, _file_digest(tmp))
+        finally:
+            if tmp.exists() and not path.exists():
+                os.replace(tmp, path)  # Failed midway: put the file back as it was
+            elif tmp.exists():
+                tmp.unlink()
+
+    def save(self):
+        save_cache(self.output_dir, self.digests)
+        save_cache(self.output_dir, self.sources, SOURCE_CACHE)
+
+    def _key(self, path):
+        return path.relative_to(self.output_dir).as_posix()
+
+    def _current(self, path, source):
+        """True when path is still the output last made from source, with the current settings."""
+        key = self._key(path)
+        entry = self.sources.get(key)
+        if not entry or entry[0] != source or key not in self.digests:
+            return False
+        try:
+            stat = path.stat()
+        except OSError:
+            return False
+        current = entry[1:] == [stat.st_mtime_ns, stat.st_size, self.minify]
+        return current and (not self.precompress or _siblings_exist(path))
+
+    def _publish(self, path, source_path, source):
+        """Moves source_path (minified when it is HTML) to path and records both digests."""
+        key = self._key(path)
+        self.written.add(key)
+        if self._current(path, source):
+            self.skipped += 1
+            return
+        if self.minify and path.suffix == '.html':
+            with open(source_path, 'r', encoding='utf-8') as src:
+                write_page(path, minify_chunks(iter(partial(src.read, READ_BLOCK), '')))
+        else:
+            os.replace(source_path, path)
+        self.digests[key] = _file_digest(path)
+        if self.precompress:
+            compress_siblings(path)
+        stat = path.stat()
+        self.sources[key] = [source, stat.st_mtime_ns, stat.st_size, self.minify]
+        self.processed += 1
+
+
+def postprocess_site(output_dir, patterns, minify=True, precompress=True, pages=None):
+    """
+    Minifies HTML and writes precompressed siblings for every file matching
+    patterns that pages (the PageOutput the pages were written through, if
+    any) has not handled this run. A file still as it was last processed
+    (same mtime and size) is skipped without being read.
+    Returns (processed, skipped) counts, pages included.
+    """
+    output = pages or PageOutput(output_dir, minify=minify, precompress=precompress)
+    output_dir = Path(output_dir)
+    for pattern in patterns:
+        for path in sorted(output_dir.glob(pattern)):
+            if path.suffix in COMPRESSIBLE and path.relative_to(output_dir).as_posix() not in output.written:
+                output.process_file(path)
+    output.save()
+    return output.processed, output.skipped
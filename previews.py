@@ -0,0 +1,301 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from postprocess import CACHE_DIR
+from product import slugify
+from templates import TEMPLATE_DIR
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:  # Optional: pip install pillow
+    Image = None
+
+# Configuration
+# One folder per product, named by its slug or listing ID, holding the full-resolution page PNGs
+ARTWORK_DIR = TEMPLATE_DIR.parent / "artwork"
+STATIC_PREVIEW_DIR = "static/previews"  # Relative to the output folder; one folder per product
+PREVIEW_CACHE = "previews.json"  # In the build cache: source stamps and digests, outputs per product
+PREVIEW_WIDTH = 960  # Longest side of a preview: sharp in the gallery, useless for printing
+THUMB_WIDTH = 160  # Gallery thumbnails (80px at 2x) and contact sheet cells
+CONTACT_COLUMNS = 4
+CONTACT_PAGES = 16  # Pages on the contact sheet
+CONTACT_GAP = 12
+MAX_PREVIEWS = 12  # Sample pages in a product's gallery
+WEBP_OPTIONS = {"quality": 75, "method": 6}
+WATERMARK_TEXT = "Scribble Patch Designs · Preview"
+WATERMARK_COLOR = (45, 55, 72)
+WATERMARK_OPACITY = 56  # 0-255
+WATERMARK_ANGLE = 30
+PIPELINE_VERSION = 1  # Bump when the rendering changes: every preview is rebuilt
+WORKERS = None  # Rendering processes; None uses every CPU
+
+SETTINGS = json.dumps([PIPELINE_VERSION, PREVIEW_WIDTH, THUMB_WIDTH, CONTACT_COLUMNS, CONTACT_PAGES, CONTACT_GAP,
+                       WEBP_OPTIONS, WATERMARK_TEXT, WATERMARK_COLOR, WATERMARK_OPACITY, WATERMARK_ANGLE])
+NUMBER_RE = re.compile(r'(\d+)')
+
+_previews = {}  # Artwork folder name -> cache entry, set by build_previews
+
+
+# --- RENDERING (worker processes) ---
+
+def _flatten(im):
+    """RGB on white: transparent line art would otherwise turn black."""
+    if 'A' in im.mode or 'transparency' in im.info:
+        im = im.convert('RGBA')
+        background = Image.new('RGB', im.size, 'white')
+        background.paste(im, mask=im.getchannel('A'))
+        return background
+    return im.convert('RGB')
+
+
+def _font(size):
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:  # Pillow < 10.1, or no FreeType: a small bitmap font
+        return ImageFont.load_default()
+
+
+def watermark(im):
+    """im with WATERMARK_TEXT tiled diagonally across it."""
+    diagonal = int((im.width ** 2 + im.height ** 2) ** 0.5) + 1
+    layer = Image.new('L', (diagonal, diagonal), 0)
+    draw = ImageDraw.Draw(layer)
+    font = _font(max(12, im.width // 24))
+    left, top, right, bottom = draw.textbbox((0, 0), WATERMARK_TEXT, font=font)
+    step_x = (right - left) * 3 // 2
+    step_y = (bottom - top) * 5
+    for row, y in enumerate(range(0, diagonal, step_y)):
+        for x in range(-(row % 2) * step_x // 2, diagonal, step_x):
+            draw.text((x, y), WATERMARK_TEXT, fill=WATERMARK_OPACITY, font=font)
+    layer = layer.rotate(WATERMARK_ANGLE, resample=Image.Resampling.BICUBIC)
+    left, top = (diagonal - im.width) // 2, (diagonal - im.height) // 2
+    marked = im.copy()
+    marked.paste(WATERMARK_COLOR, (0, 0, im.width, im.height), layer.crop((left, top, left + im.width, top + im.height)))
+    return marked
+
+
+def _save(im, path):
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    im.save(tmp, format='WEBP', **WEBP_OPTIONS)
+    os.replace(tmp, path)
+
+
+def render_page(source, output_dir, name, digest):
+    """
+    Writes one page's watermarked preview and its thumbnail (skipped when
+    both exist, so an interrupted batch resumes). Returns the page entry.
+    """
+    output_dir = Path(output_dir)
+    preview, thumb = output_dir / f"{name}.{digest}.webp", output_dir / f"{name}-thumb.{digest}.webp"
+    if preview.exists() and thumb.exists():
+        with Image.open(preview) as im:
+            size = im.size
+    else:
+        with Image.open(source) as im:
+            page = _flatten(im)
+        page.thumbnail((PREVIEW_WIDTH, PREVIEW_WIDTH), Image.Resampling.LANCZOS)
+        size = page.size
+        _save(watermark(page), preview)
+        page.thumbnail((THUMB_WIDTH, THUMB_WIDTH), Image.Resampling.LANCZOS)
+        _save(page, thumb)
+    return {'name': name, 'digest': digest, 'preview': preview.name, 'thumb': thumb.name,
+            'width': size[0], 'height': size[1]}
+
+
+def render_contact_sheet(thumbs, output_dir, digest):
+    """Lays the page thumbnails out in a watermarked grid; returns the sheet entry."""
+    output_dir = Path(output_dir)
+    sheet_path, thumb_path = output_dir / f"contact.{digest}.webp", output_dir / f"contact-thumb.{digest}.webp"
+    if not (sheet_path.exists() and thumb_path.exists()):
+        cells = []
+        for thumb in thumbs:
+            with Image.open(output_dir / thumb) as im:
+                cells.append(im.convert('RGB'))
+        columns = min(CONTACT_COLUMNS, len(cells))
+        rows = -(-len(cells) // columns)
+        cell_height = max(cell.height for cell in cells)
+        sheet = Image.new('RGB', (columns * (THUMB_WIDTH + CONTACT_GAP) + CONTACT_GAP,
+                                  rows * (cell_height + CONTACT_GAP) + CONTACT_GAP), 'white')
+        for i, cell in enumerate(cells):
+            row, column = divmod(i, columns)
+            x = CONTACT_GAP + column * (THUMB_WIDTH + CONTACT_GAP) + (THUMB_WIDTH - cell.width) // 2
+            y = CONTACT_GAP + row * (cell_height + CONTACT_GAP) + (cell_height - cell.height) // 2
+            sheet.paste(cell, (x, y))
+        sheet = watermark(sheet)
+        _save(sheet, sheet_path)
+        sheet.thumbnail((THUMB_WIDTH, THUMB_WIDTH), Image.Resampling.LANCZOS)
+        _save(sheet, thumb_path)
+    with Image.open(sheet_path) as im:
+        size = im.size
+    return {'digest': digest, 'preview': sheet_path.name, 'thumb': thumb_path.name,
+            'width': size[0], 'height': size[1], 'pages': len(thumbs)}
+
+
+# --- BATCH ---
+
+def _natural_key(path):
+    """page_2 sorts before page_10."""
+    return [int(part) if part.isdigit() else part.lower() for part in NUMBER_RE.split(path.name)]
+
+
+def discover_artwork(wanted=None):
+    """{folder name: [page PNGs in page order]} under ARTWORK_DIR; wanted limits the folders."""
+    if not ARTWORK_DIR.is_dir():
+        return {}
+    artwork = {}
+    for folder in sorted(ARTWORK_DIR.iterdir()):
+        if folder.is_dir() and (wanted is None or folder.name in wanted):
+            pages = sorted((path for path in folder.glob('*.png') if path.is_file()), key=_natural_key)
+            if pages:
+                artwork[folder.name] = pages
+    return artwork
+
+
+def _load_cache(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {'sources': {}, 'products': {}}
+    return cache if cache.get('settings') == SETTINGS else {'sources': cache.get('sources', {}), 'products': {}}
+
+
+def _file_digest(path, sources):
+    """sha256 of a source file, reused from the cache while its size and mtime are unchanged."""
+    stat = path.stat()
+    stamp = [stat.st_mtime_ns, stat.st_size]
+    key = path.relative_to(ARTWORK_DIR).as_posix()
+    cached = sources.get(key)
+    if cached and cached['stamp'] == stamp:
+        return cached['sha256']
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()
+    sources[key] = {'stamp': stamp, 'sha256': digest}
+    return digest
+
+
+def _save_cache(path, cache):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def build_previews(output_dir, wanted=None, workers=WORKERS):
+    """
+    Turns each artwork folder (ARTWORK_DIR/<slug or listing ID>/*.png) into
+    watermarked, downscaled previews, thumbnails and a contact sheet under
+    static/previews/<folder>/, rendering pages in parallel across processes.
+    Outputs are named by a digest of the source bytes and settings: sources
+    whose size and mtime are unchanged are not even re-hashed, finished
+    pages are recorded as they complete, so an interrupted run resumes.
+    wanted (slugs and IDs of catalog products) skips folders of other products.
+    Returns (products with previews, pages rendered this run) and remembers
+    the entries for product_previews().
+    """
+    _previews.clear()
+    if Image is None:
+        return 0, 0
+    artwork = discover_artwork(wanted)
+    preview_root = Path(output_dir) / STATIC_PREVIEW_DIR
+    if not artwork and not preview_root.exists():
+        return 0, 0
+
+    cache_path = Path(output_dir) / CACHE_DIR / PREVIEW_CACHE
+    cache = _load_cache(cache_path)
+    sources = {key: value for key, value in cache['sources'].items() if (ARTWORK_DIR / key).exists()}
+    previous = cache['products']
+    products = {}
+    page_jobs = []
+    for key, pages in artwork.items():
+        (preview_root / key).mkdir(parents=True, exist_ok=True)
+        done = {(page['name'], page['digest']): page for page in previous.get(key, {}).get('pages', [])}
+        entries = []
+        for path in pages:
+            name = slugify(path.stem)
+            digest = hashlib.sha256((_file_digest(path, sources) + SETTINGS).encode('ascii')).hexdigest()[:10]
+            page = done.get((name, digest))
+            if page and (preview_root / key / page['preview']).exists() and (preview_root / key / page['thumb']).exists():
+                entries.append(page)
+            else:
+                entries.append(None)
+                page_jobs.append((key, len(entries) - 1, (str(path), str(preview_root / key), name, digest)))
+        products[key] = {'pages': entries, 'contact': previous.get(key, {}).get('contact')}
+
+    def save():
+        cache_products = {key: {'pages': [page for page in entry['pages'] if page], 'contact': entry['contact']}
+                          for key, entry in products.items()}
+        _save_cache(cache_path, {'settings': SETTINGS, 'sources': sources, 'products': cache_products})
+
+    pool = None
+    try:
+        if page_jobs:
+            pool = ProcessPoolExecutor(max_workers=min(len(page_jobs), workers or os.cpu_count() or 1))
+            futures = {pool.submit(render_page, *args): (key, index) for key, index, args in page_jobs}
+            for future in as_completed(futures):
+                key, index = futures[future]
+                products[key]['pages'][index] = future.result()
+
+        # Contact sheets, once every page of their product is done
+        sheet_jobs = {}
+        for key, entry in products.items():
+            shown = entry['pages'][:CONTACT_PAGES]
+            digest = hashlib.sha256(''.join(page['digest'] for page in shown).encode('ascii')).hexdigest()[:10]
+            contact = entry['contact']
+            if not (contact and contact['digest'] == digest and (preview_root / key / contact['preview']).exists()
+                    and (preview_root / key / contact['thumb']).exists()):
+                sheet_jobs[key] = ([page['thumb'] for page in shown], str(preview_root / key), digest)
+        if sheet_jobs:
+            pool = pool or ProcessPoolExecutor(max_workers=min(len(sheet_jobs), workers or os.cpu_count() or 1))
+            futures = {pool.submit(render_contact_sheet, *args): key for key, args in sheet_jobs.items()}
+            for future in as_completed(futures):
+                products[futures[future]]['contact'] = future.result()
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        save()  # Pages finished before a failure or Ctrl+C are not rendered again
+
+    # Stale outputs: old digests, removed pages and folders of products without artwork
+    if preview_root.exists():
+        for folder in preview_root.iterdir():
+            entry = products.get(folder.name)
+            if entry is None:
+                if folder.is_dir():
+                    shutil.rmtree(folder)
+                else:
+                    folder.unlink()
+                continue
+            keep = {name for item in entry['pages'] + [entry['contact']] for name in (item['preview'], item['thumb'])}
+            for stale in folder.iterdir():
+                if stale.name not in keep:
+                    stale.unlink()
+
+    _previews.update(products)
+    return len(products), len(page_jobs)
+
+
+# --- MARKUP ---
+
+def product_previews(product, prefix="/"):
+    """
+    The gallery entries for a product's artwork: the contact sheet, then up
+    to MAX_PREVIEWS sample pages, as dicts of thumb, src, width, height and
+    alt ([] when the product has no artwork folder).
+    """
+    key = product.slug if product.slug in _previews else product.listing_id
+    entry = _previews.get(key)
+    if entry is None:
+        return []
+    base = f"{prefix}{STATIC_PREVIEW_DIR}/{key}/"
+    contact = entry['contact']
+    items = [{'thumb': base + contact['thumb'], 'src': base + contact['preview'], 'width': contact['width'],
+              'height': contact['height'], 'alt': f"All {len(entry['pages'])} pages"}]
+    for number, page in enumerate(entry['pages'][:MAX_PREVIEWS], 1):
+        items.append({'thumb': base + page['thumb'], 'src': base + page['preview'], 'width': page['width'],
+                      'height': page['height'], 'alt': f"Sample page {number}"})
+    return items
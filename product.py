@@ -0,0 +1,126 @@
+import re
+import sys
+
+PLACEHOLDER_IMAGE = 'https://placehold.co/600x600/e2e8f0/4a5568?text=No+Image+Available'
+
+# Catalog JSON key -> Product attribute, for the text fields ('' when missing)
+TEXT_FIELDS = {
+    'listingId': 'listing_id',
+    'title': 'title',
+    'price': 'price',
+    'image': 'image',
+    'link': 'link',
+    'fullUrl': 'full_url',
+    'shareLink': 'share_link',
+    'slug': 'slug',
+    'metaDescription': 'meta_description',
+}
+# Lists of names many products share: stored as tuples of interned strings
+SHARED_FIELDS = ('tags', 'collections')
+# Fields only product pages, search and font subsetting read; a lazily loaded
+# product leaves them on disk until first access (see catalog_stream.ProductStream)
+HEAVY_FIELDS = ('description', 'images', 'details')
+
+SLUG_RE = re.compile(r'[^a-z0-9]+')
+
+_key_orders = {}  # A record's key tuple -> one shared copy of it
+
+
+def slugify(text):
+    """URL-friendly slug of a title."""
+    return SLUG_RE.sub('-', text.lower()).strip('-')
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Product:
+    """
+    One catalog listing, read from a products_detailed.json or products.json
+    record. Fields are attributes named after the JSON keys (listingId ->
+    listing_id); tags, collection names and prices are interned, and
+    primary_image is derived once. to_dict() gives back the record.
+    With source (a catalog_stream.ProductStream) and span, description,
+    images and details stay on disk until one of them is first read.
+    """
+
+    __slots__ = (
+        'listing_id', 'title', 'price', 'image', 'link', 'full_url', 'share_link', 'slug', 'meta_description',
+        'tags', 'collections', 'primary_image',
+        '_description', '_images', '_details', '_extra', '_keys', '_source', '_span',
+    )
+
+    def __init__(self, data, slug=None, source=None, span=None):
+        """slug overrides the record's own (the generator derives slugs from titles)."""
+        for key, attribute in TEXT_FIELDS.items():
+            setattr(self, attribute, data.get(key, ''))
+        self.listing_id = data['listingId']
+        self.price = _intern(self.price)
+        if slug is not None:
+            self.slug = slug
+        self.tags = tuple(map(_intern, data.get('tags', ())))
+        self.collections = tuple(map(_intern, data.get('collections', ())))
+
+        images = data.get('images') or ()
+        self.primary_image = images[0] if images else (self.image or PLACEHOLDER_IMAGE)
+        self._source = source
+        self._span = span
+        if source is None:
+            self._set_heavy(data)
+
+        keys = tuple(data)
+        self._keys = _key_orders.setdefault(keys, keys)
+        extra = {key: data[key] for key in keys
+                 if key not in TEXT_FIELDS and key not in SHARED_FIELDS and key not in HEAVY_FIELDS}
+        self._extra = extra or None
+
+    def _set_heavy(self, data):
+        self._description = data.get('description', '')
+        self._images = tuple(data.get('images') or ())
+        self._details = data.get('details')
+
+    def _load(self):
+        source, self._source = self._source, None
+        self._set_heavy(source.read(self._span))
+
+    @property
+    def description(self):
+        if self._source is not None:
+            self._load()
+        return self._description
+
+    @property
+    def images(self):
+        if self._source is not None:
+            self._load()
+        return self._images
+
+    @property
+    def details(self):
+        if self._source is not None:
+            self._load()
+        return self._details
+
+    def gallery(self):
+        """All gallery images: the images list, else the single image, else []."""
+        if self.images:
+            return list(self.images)
+        return [self.image] if self.image else []
+
+    def to_dict(self):
+        """The catalog record, with its keys in their original order."""
+        data = {}
+        for key in self._keys:
+            if key in TEXT_FIELDS:
+                data[key] = getattr(self, TEXT_FIELDS[key])
+            elif key in SHARED_FIELDS or key == 'images':
+                data[key] = list(getattr(self, key))
+            elif key in HEAVY_FIELDS:
+                data[key] = getattr(self, key)
+            else:
+                data[key] = self._extra[key]
+        return data
+
+    def __repr__(self):
+        return f"Product({self.listing_id!r}, {self.title!r})"
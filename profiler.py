@@ -0,0 +1,156 @@
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+# Configuration
+SLOWEST_PAGES = 10  # Pages listed in the report
+TOP_FUNCTIONS = 15  # Functions listed from the cProfile data (by own time)
+SAMPLE_INTERVAL = 0.001  # Seconds between stack samples
+
+
+class StackSampler:
+    """
+    Samples one thread's Python stack on a timer and counts identical stacks.
+    The output is the "folded" format read by flamegraph.pl, speedscope and
+    inferno: one line per stack, frames joined by ';', then the sample count.
+    Unlike cProfile it adds no per-call overhead, so the proportions hold.
+    """
+
+    def __init__(self, thread_id=None, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if frames:
+                self.stacks[';'.join(reversed(frames))] += 1
+
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+
+
+class BuildProfiler:
+    """
+    Wall-clock timings for one build: the total per phase (load, index,
+    products, ...) and per output page. Use it as a context manager around
+    the build; phase() and page() are no-ops while it is disabled.
+    pstats_path additionally runs cProfile for the whole build and dumps the
+    stats there (python -m pstats <file>); stacks_path runs a StackSampler
+    and writes folded stacks for a flame graph. Either one enables timing.
+    """
+
+    def __init__(self, enabled=False, pstats_path=None, stacks_path=None):
+        self.enabled = enabled or bool(pstats_path or stacks_path)
+        self.pstats_path = pstats_path
+        self.stacks_path = stacks_path
+        self.phases = {}  # name -> seconds, in the order phases first ran
+        self.pages = []  # (seconds, output path, phase)
+        self.total = 0.0
+        self._phase = None
+        self._start = None
+        self._profile = None
+        self._sampler = None
+
+    def __enter__(self):
+        if self.enabled:
+            self._start = time.perf_counter()
+            if self.stacks_path:
+                self._sampler = StackSampler()
+                self._sampler.start()
+            if self.pstats_path:
+                self._profile = cProfile.Profile()
+                self._profile.enable()
+        return self
+
+    def __exit__(self, *exc):
+        if not self.enabled:
+            return False
+        self.total = time.perf_counter() - self._start
+        if self._profile:
+            self._profile.disable()
+        if self._sampler:
+            self._sampler.stop()
+            self._sampler.write(self.stacks_path)
+        if self._profile:
+            self._profile.dump_stats(self.pstats_path)
+        return False
+
+    @contextmanager
+    def _time_phase(self, name):
+        outer, self._phase = self._phase, name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+            self._phase = outer
+
+    @contextmanager
+    def _time_page(self, path):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.pages.append((time.perf_counter() - start, str(path), self._phase))
+
+    def phase(self, name):
+        """Times a build phase; repeated phases accumulate."""
+        return self._time_phase(name) if self.enabled else nullcontext()
+
+    def page(self, path):
+        """Times rendering and writing one output page (or one paginated listing)."""
+        return self._time_page(path) if self.enabled else nullcontext()
+
+    def report(self, limit=SLOWEST_PAGES):
+        """The timing summary as printable text."""
+        total = self.total or sum(self.phases.values())
+        counts = Counter(phase for _, _, phase in self.pages)
+        lines = [f"⏱️  Build profile: {total * 1000:.0f} ms", "", f"   {'phase':<18}{'ms':>10}{'share':>8}{'pages':>8}"]
+        untimed = total - sum(self.phases.values())
+        rows = list(self.phases.items()) + ([("(other)", untimed)] if untimed > 0.0005 else [])
+        for name, seconds in rows:
+            share = seconds / total * 100 if total else 0
+            pages = counts.get(name, '')
+            lines.append(f"   {name:<18}{seconds * 1000:>10.1f}{share:>7.1f}%{pages:>8}")
+
+        if self.pages:
+            mean = sum(seconds for seconds, _, _ in self.pages) / len(self.pages)
+            lines += ["", f"   Slowest pages (mean {mean * 1000:.2f} ms over {len(self.pages)}):"]
+            for seconds, path, _ in sorted(self.pages, reverse=True)[:limit]:
+                lines.append(f"   {seconds * 1000:>9.2f} ms  {path}")
+
+        if self.pstats_path and Path(self.pstats_path).exists():
+            out = io.StringIO()
+            stats = pstats.Stats(str(self.pstats_path), stream=out)
+            stats.sort_stats(pstats.SortKey.TIME).print_stats(TOP_FUNCTIONS)
+            table = out.getvalue()
+            lines += ["", f"   Top functions by own time (cProfile; full data in {self.pstats_path}):",
+                      table[table.find('   ncalls'):].rstrip()]
+        if self.stacks_path:
+            lines += ["", f"   Folded stacks for a flame graph: {self.stacks_path}"]
+        return '\n'.join(lines)
@@ -1,16 +1,133 @@
+import argparse
+import hashlib
 import json
 import os
-import re
 from pathlib import Path
 from datetime import datetime
 
+import postprocess
+from assets import asset_url, write_assets, write_cache_headers
+from catalog import CatalogIndex
+from catalog_stream import load_products
+from fonts import build_fonts, catalog_strings, collect_text, font_head
+from images import optimize_images, picture
+from page_writer import write_page
+from pagination import page_path, paginate, pagination_nav, rel_links, remove_stale_pages
+from product import slugify
+from profiler import BuildProfiler
+from related import RelatedIndex
+from sitemap import write_sitemaps
+from stylesheets import get_stylesheet, stylesheet_links, write_stylesheets
+from templates import TEMPLATE_DIR, render as render_template, stream as stream_template, template_version
+
+# Post-render stage: minify HTML and write .gz/.br siblings for the static host
+MINIFY_HTML = True
+PRECOMPRESS = True
+OUTPUT_PATTERNS = ['products/*.html', 'collections/*.html', 'collections/*/page-*.html', 'static/css/*.css']
+
+# Products per listing page; later pages go to collections/<key>/page-N.html
+PAGE_SIZE = 24
+
+# "You Might Also Like" cards per product page, from the related-products index
+RELATED_PRODUCTS = 3
+RELATED_CACHE = Path(postprocess.CACHE_DIR) / "related-generator.json"
+
+# listingId -> {slug, hash, inputs, path, generated_at} for every product page written, plus
+# the listing pages' inputs, kept next to generation_log.json so change detection never has to read the HTML
+GENERATION_MANIFEST = 'generation_manifest.json'
+# Bump when the page markup built in this file changes: every page is regenerated
+PAGE_VERSION = 1
+
+# Fingerprinted CSS bundles linked from each page type (see stylesheets.BUNDLES)
+PAGE_STYLESHEETS = {
+    'product': ('generator', 'generator-product'),
+    'listing': ('generator', 'generator-listing'),
+}
+
+def head_context(page_type, prefix='../'):
+    """Slots shared by every <head>: stylesheet links, self-hosted fonts, the favicon and the nav logo."""
+    font_preloads, font_faces = font_head(prefix)
+    return {
+        'stylesheets': stylesheet_links(PAGE_STYLESHEETS[page_type], prefix=prefix),
+        'favicon': asset_url('favicon.png', prefix),
+        'logo': picture('Logo-*.png', '', '36px', 36, prefix, 'nav-logo-mark'),
+        'font_preloads': font_preloads,
+        'font_faces': font_faces,
+    }
+
+
+def listing_context(key, number, total):
+    """Slots that depend on a listing page's position: site root, rel links and page nav."""
+    root = '../' if number == 1 else '../../'
+
+    def href(n):
+        return root + 'collections/' + page_path(key, n)
+
+    return {
+        **head_context('listing', prefix=root),
+        'root': root,
+        'page_path': page_path(key, number),
+        'head_links': rel_links(number, total, href),
+        'pagination': pagination_nav(number, total, href),
+    }
+
+
+def product_hash(product):
+    """Hash of a product record, so edited listings are regenerated."""
+    data = json.dumps(product.to_dict(), ensure_ascii=False, sort_keys=True).encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+def shared_inputs():
+    """Digest of what every product page is built from besides its record: templates, CSS bundles, favicon."""
+    parts = [str(PAGE_VERSION), asset_url('favicon.png', '../')]
+    parts += [template_version(name) for name in ("generator/product.html", "generator/related_card.html")]
+    parts += [get_stylesheet(name).digest for name in PAGE_STYLESHEETS['product']]
+    return hashlib.sha256('\0'.join(parts).encode('utf-8')).hexdigest()
+
+
+def listing_inputs(products, collections, hashes):
+    """
+    Digest of what the collection and all-products pages are built from:
+    their templates and CSS bundles, collections.json and every product's
+    record in catalog order, so any of them changing rewrites the listings.
+    """
+    parts = [str(PAGE_VERSION), asset_url('favicon.png', '../')]
+    parts += [template_version(name) for name in (
+        "generator/collection.html", "generator/all_products.html", "generator/product_card.html")]
+    parts += [get_stylesheet(name).digest for name in PAGE_STYLESHEETS['listing']]
+    parts.append(json.dumps(collections, ensure_ascii=False, sort_keys=True))
+    parts += [f"{p.listing_id}:{hashes[p.listing_id]}" for p in products]
+    return hashlib.sha256('\0'.join(parts).encode('utf-8')).hexdigest()
+
+
+def page_inputs(shared, related, hashes):
+    """
+    The generator input version of one product page: the shared inputs plus
+    the products its related cards show, so a page is regenerated when its
+    row changes or a product in it is edited. hashes maps listingId -> product_hash.
+    """
+    parts = [shared] + [f"{p.listing_id}:{hashes[p.listing_id]}" for p in related]
+    return hashlib.sha256('\0'.join(parts).encode('utf-8')).hexdigest()
+
+
 class SiteGenerator:
     def __init__(self):
         self.products = []
         self.collections = {}
-        self.existing_products = set()
+        self.catalog = None
+        self.related = None
+        self.manifest = {}
+        self.inputs = {}  # listingId -> page_inputs of its page this run
+        self.listing_inputs = None  # listing_inputs of this run
+        self.outdated_listings = False  # Listing templates, styles or collections changed
         self.new_products = []
+        self.changed_products = []
+        self.outdated_products = []  # Same record, but templates, styles or related cards changed
+        self.removed_products = []
         self.updated_collections = []
+        self.profiler = BuildProfiler()  # Disabled unless run() is given one
+        self.output = None  # postprocess.PageOutput while save_pages runs
         
     def load_data(self):
         """Load products and collections from JSON files"""
@@ -18,8 +135,9 @@ class SiteGenerator:
         
         # Load products
         if os.path.exists('products.json'):
-            with open('products.json', 'r', encoding='utf-8') as f:
-                self.products = json.load(f)
+            with self.profiler.phase("load"):
+                # Streamed record by record; slugs come from titles
+                self.products = load_products('products.json', slugify=lambda record: slugify(record['title']))
             print(f"   ✓ Loaded {len(self.products)} products")
         else:
             print("   ✗ products.json not found!")
@@ -27,44 +145,68 @@ class SiteGenerator:
             
         # Load collections
         if os.path.exists('collections.json'):
-            with open('collections.json', 'r', encoding='utf-8') as f:
+            with self.profiler.phase("load"), open('collections.json', 'r', encoding='utf-8') as f:
                 data = json.load(f)
                 self.collections = data.get('collections', {})
             print(f"   ✓ Loaded {len(self.collections)} collections")
         else:
             print("   ✗ collections.json not found!")
             return False
-            
+        
+        # Index once: slugs, images and collection members are looked up, not rescanned
+        with self.profiler.phase("index"):
+            self.catalog = CatalogIndex(self.products, self.collections)
         return True
     
+    def load_manifest(self):
+        """Load the generation manifest: (product entries, listing inputs), ({}, None) on the first run"""
+        if os.path.exists(GENERATION_MANIFEST):
+            with open(GENERATION_MANIFEST, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data.get('products', {}), data.get('listings')
+        return {}, None
+    
+    def save_manifest(self):
+        with open(GENERATION_MANIFEST, 'w', encoding='utf-8') as f:
+            json.dump({'products': self.manifest, 'listings': self.listing_inputs}, f, indent=2, sort_keys=True)
+    
     def detect_changes(self):
-        """Detect which products are new"""
+        """Classify products as new, changed or unchanged against the generation manifest"""
         print("\n🔍 Detecting changes...")
         
-        # Check which products already have pages
-        products_dir = Path('products')
-        if products_dir.exists():
-            for html_file in products_dir.glob('*.html'):
-                # Extract listing ID from HTML file
-                with open(html_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    match = re.search(r'listing/(\d+)', content)
-                    if match:
-                        self.existing_products.add(match.group(1))
-        
-        # Find new products
+        self.manifest, listings = self.load_manifest()
+        hashes = {p.listing_id: product_hash(p) for p in self.products}
+        self.listing_inputs = listing_inputs(self.products, self.collections, hashes)
+        self.outdated_listings = listings != self.listing_inputs
+        shared = shared_inputs()
         for product in self.products:
-            if product['listingId'] not in self.existing_products:
+            self.inputs[product.listing_id] = page_inputs(
+                shared, self.related.get(product, RELATED_PRODUCTS), hashes)
+            entry = self.manifest.get(product.listing_id)
+            if entry is None or not os.path.exists(entry['path']):
                 self.new_products.append(product)
-        
-        print(f"   • Existing products: {len(self.existing_products)}")
+            elif entry['hash'] != hashes[product.listing_id] or entry['slug'] != self.catalog.slug(product):
+                self.changed_products.append(product)
+            elif entry.get('inputs') != self.inputs[product.listing_id]:
+                self.outdated_products.append(product)
+        
+        # Listings no longer in products.json (their pages are left in place)
+        self.removed_products = [listing_id for listing_id in self.manifest if listing_id not in self.catalog.by_id]
+        for listing_id in self.removed_products:
+            del self.manifest[listing_id]
+        
+        regenerate = self.new_products + self.changed_products + self.outdated_products
+        print(f"   • Unchanged products: {len(self.products) - len(regenerate)}")
         print(f"   • New products: {len(self.new_products)}")
-        
-        return len(self.new_products) > 0 or len(self.existing_products) == 0
-    
-    def slugify(self, text):
-        """Convert title to URL-friendly slug"""
-        return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+        print(f"   • Changed products: {len(self.changed_products)}")
+        if self.outdated_products:
+            print(f"   • Pages with changed templates, styles or related products: {len(self.outdated_products)}")
+        if self.removed_products:
+            print(f"   • Removed products: {len(self.removed_products)}")
+        if self.outdated_listings and not regenerate:
+            print("   • Listing pages with changed templates, styles or collections")
+        
+        return bool(regenerate or self.removed_products or self.outdated_listings)
     
     def detect_product_collections(self, title):
         """Auto-detect which collections a product belongs to"""
@@ -88,7 +230,7 @@ class SiteGenerator:
     
     def generate_product_description(self, product):
         """Generate SEO-friendly description based on product title"""
-        title = product['title'].lower()
+        title = product.title.lower()
         
         if 'elf' in title:
             return """Bring the magic of Elf on the Shelf to life with our delightful Christmas coloring pages! This printable activity book features adorable elf characters in festive scenarios perfect for the holiday season. Each page is designed with clean lines and engaging details that kids ages 4-10 will love coloring. Download instantly and print as many times as you need for classroom activities, holiday parties, or quiet time at home. Our high-resolution PDF ensures crisp, clear printing on any home printer. Perfect for parents, teachers, and anyone looking to add creative fun to their Christmas celebrations."""
@@ -116,14 +258,12 @@ class SiteGenerator:
     
     def generate_product_page(self, product):
         """Generate individual product HTML page"""
-        slug = self.slugify(product['title'])
-        collections = self.detect_product_collections(product['title'])
+        slug = self.catalog.slug(product)
+        collections = self.detect_product_collections(product.title)
         description = self.generate_product_description(product)
         
-        # Get related products (same collections, exclude current)
-        related = [p for p in self.products 
-                   if p['listingId'] != product['listingId'] 
-                   and any(c in self.detect_product_collections(p['title']) for c in collections)][:3]
+        # Most similar products by title, tags and collections (precomputed in one batch)
+        related = self.related.get(product, RELATED_PRODUCTS)
         
         # Build collection tags HTML
         collection_tags = ''.join([
@@ -134,543 +274,103 @@ class SiteGenerator:
         # Build related products HTML
         related_html = ''
         if related:
-            related_html = '<div class="related-products"><h2>You Might Also Like</h2><div class="related-grid">'
-            for r in related:
-                r_slug = self.slugify(r['title'])
-                related_html += f'''
-                    <a href="{r_slug}.html" class="related-card">
-                        <img src="{r['image']}" alt="{r['title']}" loading="lazy">
-                        <div class="related-card-info">
-                            <div class="related-card-title">{r['title']}</div>
-                            <div class="related-card-price">{r['price']}</div>
-                        </div>
-                    </a>'''
-            related_html += '</div></div>'
+            related_html = (
+                '<div class="related-products"><h2>You Might Also Like</h2><div class="related-grid">'
+                + ''.join(render_template("generator/related_card.html", slug=self.catalog.slug(r),
+                                          image=self.catalog.image(r), title=r.title, price=r.price)
+                          for r in related)
+                + '</div></div>'
+            )
         
         # Primary collection for breadcrumb
         primary_collection = collections[0] if collections else 'all'
         
-        html = f'''<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <meta name="description" content="{product['title'][:150]} - Instant PDF download from {product['price']}. High-quality printable coloring pages. Print unlimited times at home.">
-    
-    <title>{product['title'][:60]} | Scribble Patch Designs</title>
-    <link rel="icon" type="image/png" href="../favicon.png">
-    <link rel="canonical" href="https://www.scribblepatchdesigns.com/products/{slug}.html">
+        chunks = stream_template(
+            "generator/product.html",
+            **head_context('product'),
+            slug=slug,
+            title=product.title,
+            meta_title=product.title[:150],
+            short_title=product.title[:60],
+            crumb_title=product.title[:50],
+            image=self.catalog.image(product),
+            link=product.link,
+            price=product.price,
+            price_value=product.price.replace('£', ''),
+            description=description,
+            ld_description=description[:200].replace('"', '&quot;'),
+            collection_tags=collection_tags,
+            primary_collection=primary_collection,
+            primary_collection_title=primary_collection.title(),
+            related_html=related_html
+        )
+        
+        return slug, chunks
     
-    <meta property="og:title" content="{product['title']}">
-    <meta property="og:description" content="Instant PDF coloring pages from {product['price']}. Download and print at home.">
-    <meta property="og:image" content="{product['image']}">
-    <meta property="og:type" content="product">
+    def generate_product_grid(self, products, root='../'):
+        """Yield product grid HTML one card at a time"""
+        for p in products:
+            yield render_template("generator/product_card.html", root=root, slug=self.catalog.slug(p),
+                                  image=self.catalog.image(p), title=p.title, price=p.price)
     
-    <script type="application/ld+json">
-    {{
-      "@context": "https://schema.org",
-      "@type": "Product",
-      "name": "{product['title']}",
-      "image": "{product['image']}",
-      "description": "{description[:200].replace('"', '&quot;')}...",
-      "brand": {{
-        "@type": "Brand",
-        "name": "Scribble Patch Designs"
-      }},
-      "offers": {{
-        "@type": "Offer",
-        "price": "{product['price'].replace('£', '')}",
-        "priceCurrency": "GBP",
-        "availability": "https://schema.org/InStock",
-        "url": "{product['link']}"
-      }}
-    }}
-    </script>
-
-    <style>
-        @import url('https://fonts.googleapis.com/css2?family=Fredoka:wght@500&family=Poppins:wght@300;400;500;600&display=swap');
-        
-        :root {{
-            --primary: #2d3748;
-            --accent: #667eea;
-            --accent-hover: #5a67d8;
-            --bg: #ffffff;
-            --border: #e2e8f0;
-        }}
-
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
+    def generate_collection_page(self, collection_key, collection_info, page_products=None, number=1, total_pages=1):
+        """Generate collection page HTML chunks (page_products is one page of the collection)"""
+        if page_products is None:
+            page_products = self.catalog.collection(collection_key)
+        context = listing_context(collection_key, number, total_pages)
         
-        body {{
-            font-family: 'Poppins', sans-serif;
-            line-height: 1.7;
-            color: var(--primary);
-            background: var(--bg);
-        }}
-        
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            padding: 0 24px;
-        }}
-
-        nav {{
-            background: rgba(255, 255, 255, 0.95);
-            backdrop-filter: blur(8px);
-            padding: 1rem 0;
-            position: sticky;
-            top: 0;
-            z-index: 1000;
-            border-bottom: 1px solid var(--border);
-        }}
-
-        .nav-wrapper {{
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }}
-
-        .nav-logo {{
-            font-family: 'Fredoka', sans-serif;
-            font-size: 1.25rem;
-            color: var(--primary);
-            text-decoration: none;
-        }}
-
-        .nav-links {{
-            display: flex;
-            gap: 2rem;
-        }}
-
-        .nav-links a {{
-            color: var(--primary);
-            text-decoration: none;
-            font-weight: 500;
-            font-size: 0.9rem;
-            transition: color 0.2s;
-        }}
-
-        .nav-links a:hover {{ color: var(--accent); }}
-
-        .breadcrumbs {{
-            padding: 1.5rem 0;
-            font-size: 0.9rem;
-            color: #718096;
-        }}
-
-        .breadcrumbs a {{
-            color: var(--accent);
-            text-decoration: none;
-        }}
-
-        .breadcrumbs a:hover {{ text-decoration: underline; }}
-
-        .product-page {{
-            padding: 2rem 0 4rem;
-        }}
-
-        .product-grid {{
-            display: grid;
-            grid-template-columns: 1fr 1fr;
-            gap: 4rem;
-            margin-bottom: 4rem;
-        }}
-
-        .product-image {{
-            width: 100%;
-            border-radius: 12px;
-            border: 1px solid var(--border);
-            background: #f7fafc;
-        }}
-
-        .product-info h1 {{
-            font-size: 2rem;
-            margin-bottom: 1rem;
-            font-weight: 600;
-            line-height: 1.3;
-        }}
-
-        .price {{
-            font-size: 1.75rem;
-            color: var(--accent);
-            font-weight: 600;
-            margin-bottom: 1.5rem;
-        }}
-
-        .collections {{
-            display: flex;
-            gap: 0.5rem;
-            margin-bottom: 1.5rem;
-            flex-wrap: wrap;
-        }}
-
-        .collection-tag {{
-            background: #edf2f7;
-            padding: 0.4rem 0.9rem;
-            border-radius: 6px;
-            font-size: 0.85rem;
-            color: var(--primary);
-            text-decoration: none;
-            transition: background 0.2s;
-        }}
-
-        .collection-tag:hover {{
-            background: #e2e8f0;
-        }}
-
-        .description {{
-            margin: 2rem 0;
-            line-height: 1.8;
-            color: #4a5568;
-        }}
-
-        .features {{
-            background: #f7fafc;
-            padding: 1.5rem;
-            border-radius: 8px;
-            margin: 2rem 0;
-        }}
-
-        .features h3 {{
-            font-size: 1.1rem;
-            margin-bottom: 1rem;
-            font-weight: 600;
-        }}
-
-        .features ul {{
-            margin-left: 1.5rem;
-            color: #4a5568;
-        }}
-
-        .features li {{
-            margin-bottom: 0.5rem;
-        }}
-
-        .cta-button {{
-            display: inline-block;
-            background: var(--accent);
-            color: white;
-            padding: 1rem 2.5rem;
-            border-radius: 8px;
-            text-decoration: none;
-            font-weight: 600;
-            font-size: 1.1rem;
-            transition: background 0.2s;
-            margin-top: 1rem;
-        }}
-
-        .cta-button:hover {{
-            background: var(--accent-hover);
-        }}
-
-        .faq {{
-            margin-top: 3rem;
-            padding-top: 3rem;
-            border-top: 1px solid var(--border);
-        }}
-
-        .faq h2 {{
-            font-size: 1.75rem;
-            margin-bottom: 2rem;
-            font-weight: 600;
-        }}
-
-        .faq-item {{
-            margin-bottom: 2rem;
-        }}
-
-        .faq-item h3 {{
-            font-size: 1.1rem;
-            margin-bottom: 0.5rem;
-            font-weight: 600;
-        }}
-
-        .faq-item p {{
-            color: #4a5568;
-            line-height: 1.7;
-        }}
-
-        .related-products {{
-            margin-top: 4rem;
-            padding-top: 4rem;
-            border-top: 1px solid var(--border);
-        }}
-
-        .related-products h2 {{
-            font-size: 1.75rem;
-            margin-bottom: 2rem;
-            font-weight: 600;
-        }}
-
-        .related-grid {{
-            display: grid;
-            grid-template-columns: repeat(3, 1fr);
-            gap: 2rem;
-        }}
-
-        .related-card {{
-            background: white;
-            border: 1px solid var(--border);
-            border-radius: 12px;
-            overflow: hidden;
-            text-decoration: none;
-            color: inherit;
-            transition: transform 0.3s, box-shadow 0.3s;
-        }}
-
-        .related-card:hover {{
-            transform: translateY(-5px);
-            box-shadow: 0 12px 20px rgba(0,0,0,0.08);
-        }}
-
-        .related-card img {{
-            width: 100%;
-            aspect-ratio: 1;
-            object-fit: cover;
-        }}
-
-        .related-card-info {{
-            padding: 1rem;
-        }}
-
-        .related-card-title {{
-            font-weight: 600;
-            font-size: 0.95rem;
-            line-height: 1.4;
-            display: -webkit-box;
-            -webkit-line-clamp: 2;
-            -webkit-box-orient: vertical;
-            overflow: hidden;
-            margin-bottom: 0.5rem;
-        }}
-
-        .related-card-price {{
-            color: var(--accent);
-            font-weight: 600;
-        }}
-
-        footer {{
-            background: white;
-            border-top: 1px solid var(--border);
-            padding: 2rem 0;
-            text-align: center;
-            font-size: 0.9rem;
-            color: #718096;
-        }}
-
-        @media (max-width: 768px) {{
-            .product-grid {{
-                grid-template-columns: 1fr;
-                gap: 2rem;
-            }}
-            .product-info h1 {{ font-size: 1.5rem; }}
-            .related-grid {{ grid-template-columns: 1fr; }}
-            .nav-links {{ display: none; }}
-        }}
-    </style>
-</head>
-<body>
-
-    <nav>
-        <div class="container nav-wrapper">
-            <a href="../index.html" class="nav-logo">Scribble Patch Designs</a>
-            <div class="nav-links">
-                <a href="../index.html#products">Products</a>
-                <a href="all.html">Collections</a>
-                <a href="https://www.etsy.com/shop/ScribblePatchDesigns" target="_blank" rel="noopener">Etsy Store</a>
-            </div>
-        </div>
-    </nav>
-
-    <div class="container">
-        <div class="breadcrumbs">
-            <a href="../index.html">Home</a> / <a href="all.html">Collections</a> / {collection_info['name']}
-        </div>
-
-        <div class="collection-header">
-            <h1>{collection_info['name']} Coloring Pages</h1>
-            <p>{descriptions.get(collection_key, 'Beautiful coloring pages perfect for creative fun.')}</p>
-            <div class="product-count">{collection_info['productCount']} products</div>
-        </div>
-
-        <div class="product-grid">{products_html}</div>
-    </div>
-
-    <footer>
-        <div class="container">
-            <p>&copy; 2026 Scribble Patch Designs. Created with ♥ for the creative community.</p>
-        </div>
-    </footer>
-
-</body>
-</html>'''
+        descriptions = {
+            'kawaii': 'Adorable kawaii-style coloring pages featuring cute characters with big eyes and sweet expressions. Perfect for fans of Japanese cute culture and charming artwork.',
+            'christmas': 'Festive Christmas and holiday coloring pages to celebrate the season. From Santa to elves, bring holiday cheer to your coloring sessions.',
+            'sports': 'Action-packed sports coloring pages for young athletes and sports enthusiasts. Soccer, golf, and more athletic themes to inspire active kids.',
+            'fantasy': 'Magical fantasy coloring pages featuring unicorns, mythical creatures, and enchanted scenes. Let imagination soar with these whimsical designs.',
+            'animals': 'Delightful animal coloring pages featuring cats, dogs, and adorable creatures in fun scenarios. Perfect for animal lovers of all ages.',
+            'kids': 'Kid-friendly coloring pages designed specifically for children. Age-appropriate themes and designs that engage young artists.'
+        }
         
-        return html
+        return stream_template(
+            "generator/collection.html",
+            **context,
+            collection_key=collection_key,
+            collection_name=collection_info['name'],
+            collection_description=descriptions.get(collection_key, 'Beautiful coloring pages perfect for creative fun.'),
+            product_count=collection_info['productCount'],
+            products_html=self.generate_product_grid(page_products, context['root'])
+        )
     
-    def generate_all_products_page(self):
-        """Generate 'All Products' collection page"""
-        # Build product grid
-        products_html = ''
-        for p in self.products:
-            slug = self.slugify(p['title'])
-            products_html += f'''
-                <a href="../products/{slug}.html" class="product-card">
-                    <img src="{p['image']}" alt="{p['title']}" class="product-image" loading="lazy">
-                    <div class="product-info">
-                        <div class="product-title">{p['title']}</div>
-                        <div class="product-price">{p['price']}</div>
-                    </div>
-                </a>'''
-        
-        html = f'''<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <meta name="description" content="Browse all {len(self.products)} Scribble Patch Designs coloring pages. Kawaii animals, Christmas themes, sports, fantasy and more. Instant PDF downloads from £1.44.">
-    <title>All Coloring Pages | Scribble Patch Designs</title>
-    <link rel="icon" type="image/png" href="../favicon.png">
+    def generate_all_products_page(self, page_products=None, number=1, total_pages=1):
+        """Generate 'All Products' page HTML chunks (page_products is one page of the catalog)"""
+        if page_products is None:
+            page_products = self.products
+        context = listing_context('all', number, total_pages)
+        root = context['root']
+        return stream_template(
+            "generator/all_products.html",
+            **context,
+            product_count=len(self.products),
+            collections_nav=''.join([f'<a href="{root}collections/{k}.html">{v["name"]}</a>' for k, v in self.collections.items()]),
+            products_html=self.generate_product_grid(page_products, root)
+        )
     
-    <style>
-        @import url('https://fonts.googleapis.com/css2?family=Fredoka:wght@500&family=Poppins:wght@300;400;500;600&display=swap');
-        
-        :root {{
-            --primary: #2d3748;
-            --accent: #667eea;
-            --bg: #ffffff;
-            --border: #e2e8f0;
-        }}
-
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Poppins', sans-serif; color: var(--primary); background: var(--bg); }}
-        .container {{ max-width: 1200px; margin: 0 auto; padding: 0 24px; }}
-
-        nav {{
-            background: rgba(255, 255, 255, 0.95);
-            backdrop-filter: blur(8px);
-            padding: 1rem 0;
-            position: sticky;
-            top: 0;
-            z-index: 1000;
-            border-bottom: 1px solid var(--border);
-        }}
-
-        .nav-wrapper {{ display: flex; justify-content: space-between; align-items: center; }}
-        .nav-logo {{ font-family: 'Fredoka', sans-serif; font-size: 1.25rem; color: var(--primary); text-decoration: none; }}
-        .nav-links {{ display: flex; gap: 2rem; }}
-        .nav-links a {{ color: var(--primary); text-decoration: none; font-weight: 500; font-size: 0.9rem; }}
-        .nav-links a:hover {{ color: var(--accent); }}
-
-        .page-header {{ text-align: center; padding: 3rem 0; }}
-        .page-header h1 {{ font-family: 'Fredoka', sans-serif; font-size: 2.5rem; margin-bottom: 1rem; }}
-        .page-header p {{ font-size: 1.1rem; color: #4a5568; }}
-
-        .collections-nav {{
-            display: flex;
-            gap: 1rem;
-            justify-content: center;
-            flex-wrap: wrap;
-            margin: 2rem 0;
-        }}
-
-        .collections-nav a {{
-            background: #edf2f7;
-            padding: 0.6rem 1.2rem;
-            border-radius: 8px;
-            text-decoration: none;
-            color: var(--primary);
-            font-weight: 500;
-            transition: all 0.2s;
-        }}
-
-        .collections-nav a:hover {{
-            background: var(--accent);
-            color: white;
-        }}
-
-        .product-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(280px, 1fr));
-            gap: 2rem;
-            padding: 2rem 0 4rem;
-        }}
-
-        .product-card {{
-            background: white;
-            border-radius: 12px;
-            overflow: hidden;
-            border: 1px solid var(--border);
-            text-decoration: none;
-            color: inherit;
-            transition: transform 0.3s, box-shadow 0.3s;
-        }}
-
-        .product-card:hover {{ transform: translateY(-5px); box-shadow: 0 12px 20px rgba(0,0,0,0.08); }}
-        .product-image {{ width: 100%; aspect-ratio: 1; object-fit: cover; }}
-        .product-info {{ padding: 1.25rem; }}
-        .product-title {{
-            font-weight: 600;
-            font-size: 1rem;
-            margin-bottom: 0.75rem;
-            line-height: 1.4;
-            display: -webkit-box;
-            -webkit-line-clamp: 2;
-            -webkit-box-orient: vertical;
-            overflow: hidden;
-        }}
-        .product-price {{ color: var(--accent); font-weight: 600; font-size: 1.1rem; }}
-
-        footer {{
-            background: white;
-            border-top: 1px solid var(--border);
-            padding: 2rem 0;
-            text-align: center;
-            font-size: 0.9rem;
-            color: #718096;
-        }}
-
-        @media (max-width: 768px) {{
-            .page-header h1 {{ font-size: 2rem; }}
-            .product-grid {{ grid-template-columns: repeat(2, 1fr); gap: 1rem; }}
-            .nav-links {{ display: none; }}
-        }}
-    </style>
-</head>
-<body>
-
-    <nav>
-        <div class="container nav-wrapper">
-            <a href="../index.html" class="nav-logo">Scribble Patch Designs</a>
-            <div class="nav-links">
-                <a href="../index.html#products">Products</a>
-                <a href="all.html">Collections</a>
-                <a href="https://www.etsy.com/shop/ScribblePatchDesigns" target="_blank" rel="noopener">Etsy Store</a>
-            </div>
-        </div>
-    </nav>
-
-    <div class="container">
-        <div class="page-header">
-            <h1>All Coloring Pages</h1>
-            <p>Browse our complete collection of {len(self.products)} printable coloring pages</p>
-        </div>
-
-        <div class="collections-nav">
-            {''.join([f'<a href="{k}.html">{v["name"]}</a>' for k, v in self.collections.items()])}
-        </div>
-
-        <div class="product-grid">{products_html}</div>
-    </div>
-
-    <footer>
-        <div class="container">
-            <p>&copy; 2026 Scribble Patch Designs. Created with ♥ for the creative community.</p>
-        </div>
-    </footer>
-
-</body>
-</html>'''
-        
-        return html
+    def save_page(self, path, chunks):
+        """Streams a page to disk, minified and precompressed by self.output when set"""
+        if self.output is None:
+            write_page(path, chunks)
+        else:
+            self.output.write(path, chunks)
+    
+    def write_listing_pages(self, key, products, render_page):
+        """Writes collections/<key>.html plus collections/<key>/page-N.html; returns their paths."""
+        pages = paginate(products, PAGE_SIZE)
+        if len(pages) > 1:
+            (Path('collections') / key).mkdir(exist_ok=True)
+        paths = []
+        for number, page_products in enumerate(pages, 1):
+            path = Path('collections') / page_path(key, number)
+            self.save_page(path, render_page(page_products, number, len(pages)))
+            paths.append(path.as_posix())
+        remove_stale_pages('collections', key, len(pages))
+        return paths
     
     def save_pages(self):
         """Generate and save all necessary pages"""
@@ -680,50 +380,121 @@ class SiteGenerator:
         Path('products').mkdir(exist_ok=True)
         Path('collections').mkdir(exist_ok=True)
         
-        # Generate product pages (only new ones if detecting changes)
-        products_to_generate = self.new_products if self.new_products else self.products
-        
-        for i, product in enumerate(products_to_generate, 1):
-            slug, html = self.generate_product_page(product)
-            filepath = Path('products') / f'{slug}.html'
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(html)
-            
-            status = "🆕" if product in self.new_products else "✓"
-            print(f"   {status} products/{slug}.html")
+        # Unchanged product pages are not rewritten and keep linking the CSS, font and
+        # image versions they were built with: older versions are only removed once
+        # every page has been regenerated
+        regenerate = self.new_products + self.changed_products + self.outdated_products
+        full_rebuild = len(regenerate) == len(self.products)
+        
+        # Pages are minified and precompressed as they are written
+        if MINIFY_HTML or PRECOMPRESS:
+            self.output = postprocess.PageOutput('.', minify=MINIFY_HTML, precompress=PRECOMPRESS)
+        
+        # Write shared stylesheets
+        with self.profiler.phase("stylesheets"):
+            bundles = sorted({name for names in PAGE_STYLESHEETS.values() for name in names})
+            for path in write_stylesheets('.', bundles, prune=full_rebuild) + write_assets('.', prune=full_rebuild):
+                print(f"   ✓ {path}")
+            write_cache_headers('.')
+        
+        # Brand PNGs, resized and re-encoded (cached by source hash)
+        with self.profiler.phase("images"):
+            sources, encoded = optimize_images('.', prune=full_rebuild)
+        if encoded:
+            print(f"   🖼️  {encoded} image sizes encoded from {sources} sources")
+        
+        # Subset self-hosted fonts to the characters the site can show
+        with self.profiler.phase("fonts"):
+            chars = collect_text(catalog_strings(self.products, self.collections), [TEMPLATE_DIR, __file__])
+            fonts = build_fonts('.', chars, prune=full_rebuild)
+        if fonts:
+            print(f"   🔤 {len(fonts)} font faces subset to {len(chars)} characters")
+        else:
+            print("   🔤 No font files in fonts/ (or fontTools missing: pip install fonttools brotli)"
+                  " - loading them from Google Fonts")
+        
+        # Generate product pages (only new, changed and outdated ones)
+        new_ids = {p.listing_id for p in self.new_products}
+        changed_ids = {p.listing_id for p in self.changed_products}
+        
+        with self.profiler.phase("products"):
+            for product in regenerate:
+                with self.profiler.page(f"products/{self.catalog.slug(product)}.html"):
+                    slug, chunks = self.generate_product_page(product)
+                    path = Path('products') / f'{slug}.html'
+                    self.save_page(path, chunks)
+                self.manifest[product.listing_id] = {
+                    'slug': slug,
+                    'hash': product_hash(product),
+                    'inputs': self.inputs[product.listing_id],
+                    'path': path.as_posix(),
+                    'generated_at': datetime.now().isoformat(),
+                }
+                
+                status = "🆕" if product.listing_id in new_ids else "✏️" if product.listing_id in changed_ids else "🔄"
+                print(f"   {status} products/{slug}.html")
         
         # Generate collection pages
         print()
-        for collection_key, collection_info in self.collections.items():
-            html = self.generate_collection_page(collection_key, collection_info)
-            filepath = Path('collections') / f'{collection_key}.html'
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(html)
-            
-            print(f"   ✓ collections/{collection_key}.html")
-        
-        # Generate "All Products" page
-        html = self.generate_all_products_page()
-        with open('collections/all.html', 'w', encoding='utf-8') as f:
-            f.write(html)
-        print(f"   ✓ collections/all.html")
+        listing_pages = []
+        with self.profiler.phase("collections"):
+            for collection_key, collection_info in self.collections.items():
+                with self.profiler.page(f"collections/{collection_key}"):
+                    pages = self.write_listing_pages(
+                        collection_key, self.catalog.collection(collection_key),
+                        lambda products, number, total: self.generate_collection_page(
+                            collection_key, collection_info, products, number, total)
+                    )
+                listing_pages += pages
+                print(f"   ✓ collections/{collection_key}.html" + (f" ({len(pages)} pages)" if len(pages) > 1 else ""))
+        
+        # Generate "All Products" pages
+        with self.profiler.phase("all products"), self.profiler.page("collections/all"):
+            pages = self.write_listing_pages('all', self.products, self.generate_all_products_page)
+        listing_pages += pages
+        print("   ✓ collections/all.html" + (f" ({len(pages)} pages)" if len(pages) > 1 else ""))
+        
+        # Minify and precompress the rest (stylesheets; pages left as they were are skipped by size and mtime)
+        if self.output is not None:
+            with self.profiler.phase("minify + compress"):
+                processed, skipped = postprocess.postprocess_site(
+                    '.', OUTPUT_PATTERNS, minify=MINIFY_HTML, precompress=PRECOMPRESS, pages=self.output
+                )
+            self.output = None
+            print(f"\n   🗜️  Minified/precompressed {processed} files ({skipped} unchanged)")
+            if PRECOMPRESS and postprocess.brotli is None:
+                print("   ⚠️  brotli not installed - wrote .gz only (pip install brotli)")
+        
+        # Sitemaps of the current products' pages (from the manifest) and the listings
+        # (lastmod follows the content hashes recorded above)
+        with self.profiler.phase("sitemaps"):
+            digests = postprocess.load_cache('.') if (MINIFY_HTML or PRECOMPRESS) else None
+            pages = [entry['path'] for _, entry in sorted(self.manifest.items())] + listing_pages
+            written = write_sitemaps('.', pages, digests=digests, builder="generate_site")
+        print(f"   🗺️  Sitemap: {len(written)} file(s) updated")
         
         # Save generation log
         log = {
             'generated_at': datetime.now().isoformat(),
             'total_products': len(self.products),
             'new_products': len(self.new_products),
+            'changed_products': len(self.changed_products),
+            'outdated_products': len(self.outdated_products),
+            'outdated_listings': self.outdated_listings,
             'collections': len(self.collections),
-            'new_product_ids': [p['listingId'] for p in self.new_products]
+            'new_product_ids': [p.listing_id for p in self.new_products],
+            'changed_product_ids': [p.listing_id for p in self.changed_products],
+            'removed_product_ids': self.removed_products
         }
         
         with open('generation_log.json', 'w', encoding='utf-8') as f:
             json.dump(log, f, indent=2)
+        self.save_manifest()
     
-    def run(self):
-        """Main execution flow"""
+    def run(self, profiler=None):
+        """Main execution flow; profiler (a profiler.BuildProfiler) records phase and page timings"""
+        if profiler is not None:
+            self.profiler = profiler
         print("="*60)
         print("🎨 Scribble Patch Designs - Smart Site Generator")
         print("="*60)
@@ -732,10 +503,15 @@ class SiteGenerator:
             print("\n❌ Failed to load data. Make sure products.json and collections.json exist.")
             return
         
-        has_changes = self.detect_changes()
+        # Related products for every page (part of each page's inputs), reused from the cache
+        with self.profiler.phase("related"):
+            self.related = RelatedIndex(self.catalog, RELATED_CACHE)
+        
+        with self.profiler.phase("detect changes"):
+            has_changes = self.detect_changes()
         
-        if not has_changes and len(self.existing_products) > 0:
-            print("\n✨ No new products detected. Site is up to date!")
+        if not has_changes and self.manifest:
+            print("\n✨ No new or changed products detected. Site is up to date!")
             print("   Run the Etsy scraper if you've added new products.")
             return
         
@@ -744,325 +520,36 @@ class SiteGenerator:
         print("\n" + "="*60)
         print("✅ SUCCESS! Site generated successfully")
         print("="*60)
-        print(f"\n📊 Summary:")
+        print("\n📊 Summary:")
         print(f"   • Total products: {len(self.products)}")
         print(f"   • New products: {len(self.new_products)}")
+        print(f"   • Changed products: {len(self.changed_products)}")
         print(f"   • Collections: {len(self.collections)}")
-        print(f"\n📁 Files created:")
-        print(f"   • products/*.html ({len(self.new_products) if self.new_products else len(self.products)} files)")
+        print("\n📁 Files created:")
+        print(f"   • products/*.html ({len(self.new_products) + len(self.changed_products) + len(self.outdated_products)} files)")
         print(f"   • collections/*.html ({len(self.collections) + 1} files)")
-        print(f"\n🚀 Next steps:")
-        print(f"   1. Upload the products/ and collections/ folders to your website")
-        print(f"   2. Update your index.html to link to these pages")
-        print(f"   3. Test the site locally before deploying")
+        print("\n🚀 Next steps:")
+        print("   1. Upload the products/ and collections/ folders to your website")
+        print("   2. Update your index.html to link to these pages")
+        print("   3. Test the site locally before deploying")
         
         if self.new_products:
-            print(f"\n🆕 New products added:")
+            print("\n🆕 New products added:")
             for p in self.new_products:
-                print(f"   • {p['title'][:60]}...")
+                print(f"   • {p.title[:60]}...")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generates product and collection pages from products.json.")
+    parser.add_argument('--profile', action='store_true', help="report time per phase and the slowest pages")
+    parser.add_argument('--pstats', metavar='FILE', help="also dump cProfile stats to FILE (implies --profile)")
+    parser.add_argument('--stacks', metavar='FILE',
+                        help="also write sampled folded stacks for a flame graph to FILE (implies --profile)")
+    args = parser.parse_args()
+
+    profiler = BuildProfiler(args.profile, pstats_path=args.pstats, stacks_path=args.stacks)
     generator = SiteGenerator()
-    generator.run()
-        <div class="container nav-wrapper">
-            <a href="../index.html" class="nav-logo">Scribble Patch Designs</a>
-            <div class="nav-links">
-                <a href="../index.html#products">Products</a>
-                <a href="../collections/{primary_collection}.html">Collections</a>
-                <a href="https://www.etsy.com/shop/ScribblePatchDesigns" target="_blank" rel="noopener">Etsy Store</a>
-            </div>
-        </div>
-    </nav>
-
-    <div class="container">
-        <div class="breadcrumbs">
-            <a href="../index.html">Home</a> / <a href="../collections/{primary_collection}.html">{primary_collection.title()}</a> / {product['title'][:50]}...
-        </div>
-
-        <div class="product-page">
-            <div class="product-grid">
-                <div>
-                    <img src="{product['image']}" alt="{product['title']}" class="product-image" loading="eager">
-                </div>
-
-                <div class="product-info">
-                    <h1>{product['title']}</h1>
-                    
-                    <div class="price">{product['price']}</div>
-
-                    <div class="collections">{collection_tags}</div>
-
-                    <div class="description">
-                        <p>{description}</p>
-                    </div>
-
-                    <div class="features">
-                        <h3>✨ What's Included</h3>
-                        <ul>
-                            <li>High-resolution PDF file optimized for home printing</li>
-                            <li>Instant digital download - no shipping, no waiting</li>
-                            <li>Print unlimited copies for personal use</li>
-                            <li>Compatible with any home printer</li>
-                            <li>Works great with colored pencils, markers, or crayons</li>
-                        </ul>
-                    </div>
-
-                    <a href="{product['link']}" class="cta-button" target="_blank" rel="noopener">
-                        Buy on Etsy - {product['price']} →
-                    </a>
-
-                    <p style="font-size: 0.85rem; color: #718096; margin-top: 1rem;">
-                        ✓ Secure checkout via Etsy<br>
-                        ✓ Instant download after purchase<br>
-                        ✓ Print unlimited times for personal use
-                    </p>
-                </div>
-            </div>
-
-            <div class="faq">
-                <h2>Frequently Asked Questions</h2>
-                
-                <div class="faq-item">
-                    <h3>What format is the download?</h3>
-                    <p>You'll receive a high-resolution PDF file that's optimized for printing on standard home printers. The PDF works on all devices and can be opened with any PDF reader.</p>
-                </div>
-
-                <div class="faq-item">
-                    <h3>How many times can I print these coloring pages?</h3>
-                    <p>You can print unlimited copies for personal use! Print them for your kids, classroom, parties, or any personal activity.</p>
-                </div>
-
-                <div class="faq-item">
-                    <h3>What supplies do I need?</h3>
-                    <p>These coloring pages work beautifully with colored pencils, crayons, markers, or gel pens. We recommend printing on standard printer paper (80-100 GSM) or cardstock for a sturdier finish.</p>
-                </div>
-
-                <div class="faq-item">
-                    <h3>How do I receive my download?</h3>
-                    <p>After completing your purchase on Etsy, you'll receive an instant download link. Simply click the link to download your PDF file, then print at home whenever you're ready!</p>
-                </div>
-            </div>
-
-            {related_html}
-        </div>
-    </div>
-
-    <footer>
-        <div class="container">
-            <p>&copy; 2026 Scribble Patch Designs. Created with ♥ for the creative community.</p>
-        </div>
-    </footer>
-
-</body>
-</html>'''
-        
-        return slug, html
-    
-    def generate_collection_page(self, collection_key, collection_info):
-        """Generate collection page HTML"""
-        collection_products = [p for p in self.products 
-                              if p['listingId'] in collection_info['listingIds']]
-        
-        descriptions = {
-            'kawaii': 'Adorable kawaii-style coloring pages featuring cute characters with big eyes and sweet expressions. Perfect for fans of Japanese cute culture and charming artwork.',
-            'christmas': 'Festive Christmas and holiday coloring pages to celebrate the season. From Santa to elves, bring holiday cheer to your coloring sessions.',
-            'sports': 'Action-packed sports coloring pages for young athletes and sports enthusiasts. Soccer, golf, and more athletic themes to inspire active kids.',
-            'fantasy': 'Magical fantasy coloring pages featuring unicorns, mythical creatures, and enchanted scenes. Let imagination soar with these whimsical designs.',
-            'animals': 'Delightful animal coloring pages featuring cats, dogs, and adorable creatures in fun scenarios. Perfect for animal lovers of all ages.',
-            'kids': 'Kid-friendly coloring pages designed specifically for children. Age-appropriate themes and designs that engage young artists.'
-        }
-        
-        # Build product grid HTML
-        products_html = ''
-        for p in collection_products:
-            slug = self.slugify(p['title'])
-            products_html += f'''
-                <a href="../products/{slug}.html" class="product-card">
-                    <img src="{p['image']}" alt="{p['title']}" class="product-image" loading="lazy">
-                    <div class="product-info">
-                        <div class="product-title">{p['title']}</div>
-                        <div class="product-price">{p['price']}</div>
-                    </div>
-                </a>'''
-        
-        html = f'''<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <meta name="description" content="{collection_info['name']} coloring pages - {collection_info['productCount']} printable PDF designs. Instant download from £1.44. High-quality coloring books for kids and adults.">
-    
-    <title>{collection_info['name']} Coloring Pages | Scribble Patch Designs</title>
-    <link rel="icon" type="image/png" href="../favicon.png">
-    <link rel="canonical" href="https://www.scribblepatchdesigns.com/collections/{collection_key}.html">
-    
-    <style>
-        @import url('https://fonts.googleapis.com/css2?family=Fredoka:wght@500&family=Poppins:wght@300;400;500;600&display=swap');
-        
-        :root {{
-            --primary: #2d3748;
-            --accent: #667eea;
-            --bg: #ffffff;
-            --border: #e2e8f0;
-        }}
-
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        
-        body {{
-            font-family: 'Poppins', sans-serif;
-            line-height: 1.7;
-            color: var(--primary);
-            background: var(--bg);
-        }}
-        
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            padding: 0 24px;
-        }}
-
-        nav {{
-            background: rgba(255, 255, 255, 0.95);
-            backdrop-filter: blur(8px);
-            padding: 1rem 0;
-            position: sticky;
-            top: 0;
-            z-index: 1000;
-            border-bottom: 1px solid var(--border);
-        }}
-
-        .nav-wrapper {{
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }}
-
-        .nav-logo {{
-            font-family: 'Fredoka', sans-serif;
-            font-size: 1.25rem;
-            color: var(--primary);
-            text-decoration: none;
-        }}
-
-        .nav-links {{
-            display: flex;
-            gap: 2rem;
-        }}
-
-        .nav-links a {{
-            color: var(--primary);
-            text-decoration: none;
-            font-weight: 500;
-            font-size: 0.9rem;
-            transition: color 0.2s;
-        }}
-
-        .nav-links a:hover {{ color: var(--accent); }}
-
-        .breadcrumbs {{
-            padding: 1.5rem 0;
-            font-size: 0.9rem;
-            color: #718096;
-        }}
-
-        .breadcrumbs a {{
-            color: var(--accent);
-            text-decoration: none;
-        }}
-
-        .collection-header {{
-            text-align: center;
-            padding: 3rem 0;
-        }}
-
-        .collection-header h1 {{
-            font-family: 'Fredoka', sans-serif;
-            font-size: 2.5rem;
-            margin-bottom: 1rem;
-        }}
-
-        .collection-header p {{
-            font-size: 1.1rem;
-            color: #4a5568;
-            max-width: 700px;
-            margin: 0 auto;
-        }}
-
-        .product-count {{
-            font-size: 0.9rem;
-            color: #718096;
-            margin-top: 0.5rem;
-        }}
-
-        .product-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(280px, 1fr));
-            gap: 2rem;
-            padding: 2rem 0 4rem;
-        }}
-
-        .product-card {{
-            background: white;
-            border-radius: 12px;
-            overflow: hidden;
-            border: 1px solid var(--border);
-            text-decoration: none;
-            color: inherit;
-            transition: transform 0.3s, box-shadow 0.3s;
-        }}
-
-        .product-card:hover {{
-            transform: translateY(-5px);
-            box-shadow: 0 12px 20px rgba(0,0,0,0.08);
-        }}
-
-        .product-image {{
-            width: 100%;
-            aspect-ratio: 1;
-            object-fit: cover;
-        }}
-
-        .product-info {{
-            padding: 1.25rem;
-        }}
-
-        .product-title {{
-            font-weight: 600;
-            font-size: 1rem;
-            margin-bottom: 0.75rem;
-            line-height: 1.4;
-            display: -webkit-box;
-            -webkit-line-clamp: 2;
-            -webkit-box-orient: vertical;
-            overflow: hidden;
-        }}
-
-        .product-price {{
-            color: var(--accent);
-            font-weight: 600;
-            font-size: 1.1rem;
-        }}
-
-        footer {{
-            background: white;
-            border-top: 1px solid var(--border);
-            padding: 2rem 0;
-            text-align: center;
-            font-size: 0.9rem;
-            color: #718096;
-        }}
-
-        @media (max-width: 768px) {{
-            .collection-header h1 {{ font-size: 2rem; }}
-            .product-grid {{
-                grid-template-columns: repeat(2, 1fr);
-                gap: 1rem;
-            }}
-            .nav-links {{ display: none; }}
-        }}
-    </style>
-</head>
-<body>
-
-    <nav>
\ No newline at end of file
+    with profiler:
+        generator.run(profiler)
+    if profiler.enabled:
+        print("\n" + profiler.report())
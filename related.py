@@ -0,0 +1,153 @@
+import hashlib
+import heapq
+import json
+import math
+from bisect import bisect_left
+from pathlib import Path
+
+from search_index import tokenize
+
+# Configuration
+RELATED_COUNT = 4  # Neighbours stored per product; pages show a prefix of them
+RELATED_VERSION = 1  # Bump when the features or scoring change, to invalidate caches
+# Field -> weight of each of its features before IDF; shared collections count most
+FEATURE_WEIGHTS = (("title", 1.0), ("tags", 1.0), ("collections", 2.0))
+# Candidate generation (linear in catalog size): products are sorted so that ones with
+# the same strongest features sit together, and each product only scans the
+# MAX_POSTINGS entries around itself in the postings of its STRONGEST_FEATURES
+# highest-weighted features. The best RESCORE * count candidates are then scored exactly.
+# On synthetic 10k catalogs this finds ~93% of the exact top-4 similarity.
+MAX_POSTINGS = 32
+STRONGEST_FEATURES = 8
+RESCORE = 4
+
+
+def product_features(product, catalog):
+    """Yields (feature, weight) pairs: title and tag terms share one namespace, collections another."""
+    weights = dict(FEATURE_WEIGHTS)
+    for term in tokenize(product.title):
+        yield f"t:{term}", weights["title"]
+    for term in tokenize(' '.join(product.tags)):
+        yield f"t:{term}", weights["tags"]
+    for key in catalog.collection_keys(product):
+        yield f"c:{key}", weights["collections"]
+
+
+def catalog_key(catalog):
+    """Hash of everything the index depends on, so a cached index is reused only for the same inputs."""
+    digest = hashlib.sha256(
+        f"{RELATED_VERSION}:{FEATURE_WEIGHTS}:{MAX_POSTINGS}:{STRONGEST_FEATURES}:{RESCORE}".encode('utf-8')
+    )
+    for product in catalog:
+        digest.update(json.dumps(
+            [product.listing_id, product.title, product.tags, catalog.collection_keys(product)],
+            ensure_ascii=False
+        ).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def vectorize(catalog):
+    """Returns one L2-normalised TF-IDF vector (feature -> weight) per product, in catalog order."""
+    counts = []
+    df = {}
+    for product in catalog:
+        vector = {}
+        for feature, weight in product_features(product, catalog):
+            vector[feature] = vector.get(feature, 0.0) + weight
+        counts.append(vector)
+        for feature in vector:
+            df[feature] = df.get(feature, 0) + 1
+
+    total = len(counts)
+    idf = {feature: math.log((1 + total) / (1 + docs)) + 1 for feature, docs in df.items()}
+    vectors = []
+    for vector in counts:
+        weighted = {feature: tf * idf[feature] for feature, tf in vector.items()}
+        norm = math.sqrt(sum(w * w for w in weighted.values())) or 1.0
+        vectors.append({feature: w / norm for feature, w in weighted.items()})
+    return vectors
+
+
+class NeighbourSearch:
+    """Approximate top-k cosine neighbours over TF-IDF vectors (see MAX_POSTINGS above)."""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+        self.strongest = [sorted(vector, key=lambda feature: (-vector[feature], feature)) for vector in vectors]
+        # Sorted-neighbourhood order: position -> product number, and back
+        self.order = sorted(range(len(vectors)), key=self.strongest.__getitem__)
+        self.position = [0] * len(vectors)
+        # feature -> (sorted positions, the feature's weight at each)
+        self.postings = {}
+        for position, n in enumerate(self.order):
+            self.position[n] = position
+            for feature, weight in vectors[n].items():
+                docs, weights = self.postings.setdefault(feature, ([], []))
+                docs.append(position)
+                weights.append(weight)
+
+    def top(self, n, count):
+        """Product numbers most similar to product n, best first; ties go to catalog order."""
+        vector = self.vectors[n]
+        here = self.position[n]
+        scores = {}
+        for feature in self.strongest[n][:STRONGEST_FEATURES]:
+            weight = vector[feature]
+            docs, weights = self.postings[feature]
+            if len(docs) > MAX_POSTINGS:
+                start = min(max(0, bisect_left(docs, here) - MAX_POSTINGS // 2), len(docs) - MAX_POSTINGS)
+                docs, weights = docs[start:start + MAX_POSTINGS], weights[start:start + MAX_POSTINGS]
+            for other, other_weight in zip(docs, weights):
+                scores[other] = scores.get(other, 0.0) + weight * other_weight
+        scores.pop(here, None)
+
+        # Candidates were scored on a few features only; score the leaders on all of them
+        exact = {}
+        for other in heapq.nsmallest(count * RESCORE, scores, key=lambda other: -scores[other]):
+            other = self.order[other]
+            other_vector = self.vectors[other]
+            exact[other] = sum(weight * other_vector.get(feature, 0.0) for feature, weight in vector.items())
+        return heapq.nsmallest(count, exact, key=lambda other: (-exact[other], other))
+
+
+def build_related(catalog, count=RELATED_COUNT):
+    """listingId -> listingIds of its `count` most similar products, for the whole catalog."""
+    products = list(catalog)
+    search = NeighbourSearch(vectorize(catalog))
+    return {
+        product.listing_id: [products[other].listing_id for other in search.top(n, count)]
+        for n, product in enumerate(products)
+    }
+
+
+class RelatedIndex:
+    """
+    "You Might Also Like" neighbours for every product, computed in one
+    batch from sparse TF-IDF vectors of titles, tags and collections.
+    With cache_path, the result is stored next to the other build caches
+    and reused while catalog_key() is unchanged.
+    """
+
+    def __init__(self, catalog, cache_path=None, count=RELATED_COUNT):
+        self.catalog = catalog
+        self.key = catalog_key(catalog)
+        self.cached = False
+        cache_path = Path(cache_path) if cache_path else None
+        if cache_path and cache_path.exists():
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('key') == self.key and data.get('count') == count:
+                self.related = data['related']
+                self.cached = True
+        if not self.cached:
+            self.related = build_related(catalog, count)
+            if cache_path:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(cache_path, 'w', encoding='utf-8') as f:
+                    json.dump({'key': self.key, 'count': count, 'related': self.related}, f,
+                              ensure_ascii=False, separators=(',', ':'))
+
+    def get(self, product, limit=None):
+        """The product's related products, best first (at most limit)."""
+        ids = self.related.get(product.listing_id, [])
+        return [self.catalog.by_id[listing_id] for listing_id in ids[:limit] if listing_id in self.catalog.by_id]
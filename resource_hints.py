@@ -0,0 +1,64 @@
+import json
+from itertools import islice
+from urllib.parse import urlsplit
+
+# Configuration
+PRECONNECT = True  # Open the image CDN connection while the HTML is still parsing
+PRELOAD_LCP = True  # <link rel=preload fetchpriority=high> for the page's largest (LCP) image
+# Speculation rules on listing pages: the first PREFETCH_PAGES product links are
+# fetched right away, every other product link when the pointer rests on it
+PREFETCH_PAGES = 4  # 0 disables speculation rules
+SPECULATION_ACTION = "prefetch"  # "prerender" also renders the pages: instant, but costlier
+HOVER_EAGERNESS = "moderate"  # None: only the first PREFETCH_PAGES links
+PRODUCT_LINKS = "/products/*"  # URL pattern of the links the hover rule covers
+
+
+def origin(url):
+    """scheme://host of an absolute http(s) URL, None for relative ones."""
+    parts = urlsplit(url or '')
+    if parts.scheme in ('http', 'https') and parts.netloc:
+        return f"{parts.scheme}://{parts.netloc}"
+    return None
+
+
+def preconnect(urls):
+    """One <link rel=preconnect> per distinct origin (images load without CORS, so no crossorigin)."""
+    origins = dict.fromkeys(filter(None, map(origin, urls)))
+    return [f'<link rel="preconnect" href="{host}">' for host in origins]
+
+
+def preload_image(url, srcset="", sizes=""):
+    """Preloads url - or, with srcset, the candidate the <img> will pick - at high priority."""
+    responsive = f' imagesrcset="{srcset}" imagesizes="{sizes}"' if srcset else ""
+    return f'<link rel="preload" as="image" href="{url}"{responsive} fetchpriority="high">'
+
+
+def speculation_rules(urls):
+    """<script type=speculationrules> prefetching urls now and other product links on hover."""
+    rules = []
+    if urls:
+        rules.append({'source': 'list', 'urls': list(urls)})
+    if HOVER_EAGERNESS:
+        rules.append({'source': 'document', 'where': {'href_matches': PRODUCT_LINKS}, 'eagerness': HOVER_EAGERNESS})
+    data = json.dumps({SPECULATION_ACTION: rules}, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+    return f'<script type="speculationrules">{data}</script>'
+
+
+def resource_hints(lcp_image=None, next_pages=(), lcp_srcset="", lcp_sizes=""):
+    """
+    The hint tags for a page's <head>: preconnect to the origin of its LCP
+    image and preload it at high priority (lcp_srcset/lcp_sizes must match the
+    <img>'s srcset and sizes), and - for listing pages, whose
+    next_pages iterates their product links in grid order - speculation rules
+    that fetch the first PREFETCH_PAGES of them ahead of the click.
+    Browsers without speculation rules support ignore the script.
+    """
+    tags = []
+    if PRECONNECT and lcp_image:
+        tags.extend(preconnect([lcp_image]))
+    if PRELOAD_LCP and lcp_image:
+        tags.append(preload_image(lcp_image, lcp_srcset, lcp_sizes))
+    urls = list(islice(next_pages, PREFETCH_PAGES))
+    if urls:
+        tags.append(speculation_rules(urls))
+    return '\n    '.join(tags)
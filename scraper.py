@@ -1,12 +1,17 @@
+import argparse
 import json
 import time
-import re
 from pathlib import Path
 from playwright.sync_api import sync_playwright
 
-def scrape_shop(shop_url):
+from catalog_stream import write_jsonl
+from product import slugify
+
+def scrape_shop(shop_url, jsonl=False):
     """
     Enhanced scraper that preserves description formatting
+    jsonl=True writes products_detailed.jsonl (one product per line, which
+    build_site.py streams) instead of products_detailed.json
     """
     print(f"🚀 Starting enhanced product sync for: {shop_url}\n")
     
@@ -243,7 +248,7 @@ def scrape_shop(shop_url):
                     enhanced_product = {**product, **details}
                     
                     # Generate URL-friendly slug
-                    slug = re.sub(r'[^a-z0-9]+', '-', product['title'].lower()).strip('-')
+                    slug = slugify(product['title'])
                     enhanced_product['slug'] = slug
                     
                     # Add share link
@@ -279,7 +284,7 @@ def scrape_shop(shop_url):
                 except Exception as e:
                     print(f"   ⚠️  Error on this product: {e}")
                     basic_copy = product.copy()
-                    basic_copy['slug'] = re.sub(r'[^a-z0-9]+', '-', product['title'].lower()).strip('-')
+                    basic_copy['slug'] = slugify(product['title'])
                     basic_copy['shareLink'] = f"https://scribblepatchdesigns.etsy.com/listing/{product['listingId']}"
                     basic_copy['collections'] = []
                     basic_copy['description'] = ''
@@ -296,11 +301,16 @@ def scrape_shop(shop_url):
                 'products': detailed_products
             }
             
-            with open('products_detailed.json', 'w', encoding='utf-8') as f:
-                json.dump(output_data, f, indent=2, ensure_ascii=False)
+            if jsonl:
+                products_file = 'products_detailed.jsonl'
+                write_jsonl(products_file, detailed_products)
+            else:
+                products_file = 'products_detailed.json'
+                with open(products_file, 'w', encoding='utf-8') as f:
+                    json.dump(output_data, f, indent=2, ensure_ascii=False)
             
             print(f"\n✅ SUCCESS: Scraped {len(detailed_products)} products with formatted descriptions!")
-            print(f"💾 Saved to: products_detailed.json")
+            print(f"💾 Saved to: {products_file}")
             
             # Generate collections
             all_collections = {}
@@ -355,6 +365,11 @@ def scrape_shop(shop_url):
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrapes the Etsy shop into the catalog JSON files.")
+    parser.add_argument('--jsonl', action='store_true',
+                        help="write products_detailed.jsonl (one product per line) for very large catalogs")
+    args = parser.parse_args()
+    
     print("=" * 70)
     print("ScribblePatch Designs - Enhanced Product Scraper v2")
     print("=" * 70)
@@ -368,4 +383,4 @@ if __name__ == "__main__":
     print("⏱️  Takes ~2-3 minutes for 10 products")
     print()
     
-    scrape_shop("https://www.etsy.com/shop/ScribblePatchDesigns")
\ No newline at end of file
+    scrape_shop("https://www.etsy.com/shop/ScribblePatchDesigns", jsonl=args.jsonl)
\ No newline at end of file
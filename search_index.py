@@ -0,0 +1,136 @@
+import json
+import re
+import unicodedata
+from pathlib import Path
+
+from static_files import CARD_SCRIPT, dump_json, remove_stale, write_hashed
+from templates import TEMPLATE_DIR
+
+# Configuration
+STATIC_SEARCH_DIR = "static/search"  # Relative to the output folder; every file is content-hashed
+SEARCH_SCRIPTS = [CARD_SCRIPT, TEMPLATE_DIR / "js" / "search.js"]  # Bundled into one file by write_script
+PREFIX_LENGTH = 2  # Terms are sharded by their first characters
+DOCS_PER_SHARD = 500
+RESULT_LIMIT = 48
+
+# Field -> weight added for every occurrence of a term in that field
+FIELD_WEIGHTS = (("title", 3), ("tags", 2), ("collections", 2), ("description", 1))
+MAX_WEIGHT = 255
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from in is it of on or our the this that to with you your".split()
+)
+# Light suffix stripping, first match wins; the browser script applies the same rules to queries
+STEM_RULES = (("sses", "ss"), ("ies", "y"), ("ss", "ss"), ("us", "us"), ("is", "is"),
+              ("ing", ""), ("ed", ""), ("s", ""))
+MIN_STEM = 3
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+# --- TOKENIZING ---
+
+def stem(word):
+    for suffix, replacement in STEM_RULES:
+        if word.endswith(suffix):
+            if len(word) - len(suffix) >= MIN_STEM:
+                return word[:-len(suffix)] + replacement
+            return word
+    return word
+
+
+def tokenize(text):
+    """Lowercased, accent-folded, stemmed terms without stopwords."""
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return [stem(word) for word in WORD_RE.findall(text) if word not in STOPWORDS]
+
+
+# --- INDEXING ---
+
+def product_fields(product, catalog):
+    yield "title", product.title
+    yield "tags", ' '.join(product.tags)
+    yield "collections", ' '.join(
+        catalog.collections[key].get('name', key) for key in catalog.collection_keys(product)
+    )
+    yield "description", product.description
+
+
+def build_postings(catalog):
+    """
+    Returns term -> [(doc id, weight)] with doc ids assigned in catalog order,
+    so every postings list is already sorted by id.
+    """
+    weights = dict(FIELD_WEIGHTS)
+    postings = {}
+    for doc_id, product in enumerate(catalog.iter_full()):
+        scores = {}
+        for field, text in product_fields(product, catalog):
+            for term in tokenize(text):
+                scores[term] = scores.get(term, 0) + weights[field]
+        for term, score in scores.items():
+            postings.setdefault(term, []).append((doc_id, min(score, MAX_WEIGHT)))
+    return postings
+
+
+def encode_postings(entries):
+    """[(id, weight), ...] -> flat [id gap, weight, id gap, weight, ...]."""
+    flat = []
+    previous = 0
+    for doc_id, weight in entries:
+        flat.append(doc_id - previous)
+        flat.append(weight)
+        previous = doc_id
+    return flat
+
+
+def shard_key(term):
+    return term[:PREFIX_LENGTH]
+
+
+# --- OUTPUT ---
+
+def build_search_index(output_dir, catalog, url):
+    """
+    Writes the term shards (t-<prefix>.<hash>.json) and document shards
+    (d-<n>.<hash>.json) to static/search/ and removes stale ones.
+    url(product) returns the product page link shown in results.
+    Returns the config the search page embeds: shard file names plus the
+    tokenizer settings the browser needs to process queries the same way.
+    """
+    search_dir = Path(output_dir) / STATIC_SEARCH_DIR
+    search_dir.mkdir(parents=True, exist_ok=True)
+    keep = set()
+
+    shards = {}
+    for term, entries in build_postings(catalog).items():
+        shards.setdefault(shard_key(term), {})[term] = encode_postings(entries)
+    shard_files = {
+        key: write_hashed(search_dir, f"t-{key}", dump_json(terms), ".json", keep)
+        for key, terms in sorted(shards.items())
+    }
+
+    docs = [[p.title, url(p), catalog.image(p), p.price] for p in catalog]
+    doc_files = [
+        write_hashed(search_dir, f"d-{n}", dump_json(docs[start:start + DOCS_PER_SHARD]), ".json", keep)
+        for n, start in enumerate(range(0, len(docs), DOCS_PER_SHARD))
+    ]
+
+    remove_stale(search_dir, "*.json*", keep)
+
+    return {
+        'shards': shard_files,
+        'docs': doc_files,
+        'docsPerShard': DOCS_PER_SHARD,
+        'prefixLength': PREFIX_LENGTH,
+        'stopwords': sorted(STOPWORDS),
+        'stem': [list(rule) for rule in STEM_RULES],
+        'minStem': MIN_STEM,
+        'limit': RESULT_LIMIT,
+    }
+
+
+def config_json(config, base):
+    """Serializes the search config for an inline <script type="application/json">."""
+    return json.dumps({**config, 'base': base}, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
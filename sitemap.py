@@ -0,0 +1,136 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from postprocess import CACHE_DIR
+
+# Configuration
+SITE_URL = "https://www.scribblepatchdesigns.com/"
+SITEMAP_CACHE = "sitemap.json"  # url -> [content hash, lastmod, shard number, builders listing it], under CACHE_DIR
+MAX_URLS = 50000  # Per sitemap file (sitemaps.org limit)
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+
+def page_url(key, site_url=SITE_URL):
+    """products/x.html -> https://.../products/x.html; index.html files map to their folder."""
+    if key == "index.html" or key.endswith("/index.html"):
+        key = key[:-len("index.html")]
+    return site_url + key
+
+
+def load_manifest(output_dir):
+    path = Path(output_dir) / CACHE_DIR / SITEMAP_CACHE
+    if path.exists():
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def save_manifest(output_dir, manifest):
+    path = Path(output_dir) / CACHE_DIR / SITEMAP_CACHE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def _write_if_changed(path, content):
+    data = content.encode('utf-8')
+    if path.exists() and path.read_bytes() == data:
+        return False
+    path.write_bytes(data)
+    return True
+
+
+def render_urlset(entries):
+    urls = ''.join(
+        f"<url><loc>{escape(url)}</loc><lastmod>{lastmod}</lastmod></url>\n" for url, lastmod in entries
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{SITEMAP_NS}">\n{urls}</urlset>\n'
+
+
+def render_index(shards):
+    items = ''.join(
+        f"<sitemap><loc>{escape(url)}</loc><lastmod>{lastmod}</lastmod></sitemap>\n" for url, lastmod in shards
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{SITEMAP_NS}">\n{items}</sitemapindex>\n'
+
+
+def write_sitemaps(output_dir, pages, digests=None, site_url=SITE_URL, builder="build_site"):
+    """
+    Updates sitemap.xml (a sitemap index) and sitemap-N.xml shards of up to
+    MAX_URLS pages. pages are the output-relative paths the builder produced
+    this run (from its catalog or manifest, never a folder listing, so pages
+    left over from removed products are not listed). A URL stays in the shard
+    it was first put in.
+    Both builders write to the same output folder, so each URL records the
+    builders that listed it: a run replaces builder's URLs with pages and
+    keeps the ones only another builder listed.
+    Each URL's lastmod is the date its content hash last changed, tracked in
+    .build_cache/sitemap.json. digests maps output-relative paths to content
+    hashes (the postprocess cache); pages missing from it are hashed here.
+    Only files whose XML changed are rewritten. Returns the paths written.
+    """
+    output_dir = Path(output_dir)
+    digests = digests or {}
+    previous = load_manifest(output_dir)
+    today = datetime.now(timezone.utc).date().isoformat()
+
+    manifest = {}
+    for url, entry in previous.items():
+        # Entries from before builders were recorded belong to whichever builder runs first
+        others = [name for name in (entry[3] if len(entry) > 3 else [builder]) if name != builder]
+        if others:
+            manifest[url] = entry[:3] + [others]
+    new_urls = []
+    listed = set()
+    for key in pages:
+        url = page_url(key, site_url)
+        if url in listed:
+            continue
+        listed.add(url)
+        digest = digests.get(key) or hashlib.sha256((output_dir / key).read_bytes()).hexdigest()
+        old = previous.get(url)
+        lastmod = old[1] if old and old[0] == digest else today
+        shard = old[2] if old and len(old) > 2 else None
+        others = manifest[url][3] if url in manifest else []
+        manifest[url] = [digest, lastmod, shard, sorted(others + [builder])]
+        if shard is None:
+            new_urls.append(url)
+
+    # URLs keep their shard, so adding a page rewrites one shard instead of reflowing them all;
+    # new URLs fill the first shard with room
+    sizes = {}
+    for _, _, shard, _ in manifest.values():
+        if shard is not None:
+            sizes[shard] = sizes.get(shard, 0) + 1
+    shard = 1
+    for url in sorted(new_urls):
+        while sizes.get(shard, 0) >= MAX_URLS:
+            shard += 1
+        manifest[url][2] = shard
+        sizes[shard] = sizes.get(shard, 0) + 1
+
+    by_shard = {}
+    for url, (_, lastmod, n, _) in manifest.items():
+        by_shard.setdefault(n, []).append((url, lastmod))
+    written = []
+    shards = []
+    for n in sorted(by_shard):
+        entries = sorted(by_shard[n])
+        path = output_dir / f"sitemap-{n}.xml"
+        if _write_if_changed(path, render_urlset(entries)):
+            written.append(path)
+        shards.append((f"{site_url}sitemap-{n}.xml", max(lastmod for _, lastmod in entries)))
+
+    for stale in output_dir.glob("sitemap-*.xml"):
+        number = stale.stem[len("sitemap-"):]
+        if number.isdigit() and int(number) not in by_shard:
+            stale.unlink()
+
+    index_path = output_dir / "sitemap.xml"
+    if _write_if_changed(index_path, render_index(shards)):
+        written.append(index_path)
+    save_manifest(output_dir, manifest)
+    return written
@@ -0,0 +1,53 @@
+import hashlib
+import json
+from pathlib import Path
+
+from postprocess import minify_js
+from templates import TEMPLATE_DIR
+
+# Configuration
+STATIC_JS_DIR = "static/js"  # Relative to the output folder
+CARD_SCRIPT = TEMPLATE_DIR / "js" / "card.js"  # productCard(), bundled into the scripts that add product cards
+
+
+def write_hashed(directory, stem_name, data, suffix, keep):
+    """
+    Writes data to <stem_name>.<hash><suffix> in directory unless that file
+    already exists, adds the file name to keep and returns it.
+    """
+    digest = hashlib.sha256(data).hexdigest()[:10]
+    filename = f"{stem_name}.{digest}{suffix}"
+    path = directory / filename
+    if not path.exists():
+        path.write_bytes(data)
+    keep.add(filename)
+    return filename
+
+
+def remove_stale(directory, pattern, keep):
+    """Deletes generated files (and their .gz/.br siblings) that are not in keep."""
+    for stale in directory.glob(pattern):
+        name = stale.name[:-len(stale.suffix)] if stale.suffix in ('.gz', '.br') else stale.name
+        if name not in keep:
+            stale.unlink()
+
+
+def dump_json(value):
+    """Compact, key-sorted UTF-8 JSON: equal values always hash to the same file name."""
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'), sort_keys=True).encode('utf-8')
+
+
+def write_script(output_dir, sources, stem):
+    """
+    Writes the source scripts, concatenated in order and minified, as
+    static/js/<stem>.<hash>.js, removes older versions and returns its path
+    under the output folder.
+    """
+    js_dir = Path(output_dir) / STATIC_JS_DIR
+    js_dir.mkdir(parents=True, exist_ok=True)
+    js = '\n'.join(Path(source).read_text(encoding='utf-8') for source in sources)
+    data = minify_js(js).encode('utf-8')
+    keep = set()
+    filename = write_hashed(js_dir, stem, data, ".js", keep)
+    remove_stale(js_dir, f"{stem}.*.js*", keep)
+    return f"{STATIC_JS_DIR}/{filename}"
@@ -0,0 +1,208 @@
+import hashlib
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from templates import TEMPLATE_DIR
+
+# Configuration
+ROOT_DIR = TEMPLATE_DIR.parent
+CSS_DIR = TEMPLATE_DIR / "css"
+STATIC_CSS_DIR = "static/css"  # Relative to the output folder
+
+# Bundle name -> (CSS sources under templates/css, files scanned for used selectors)
+BUNDLES = {
+    "site": (["site/base.css"], ["templates/site/*.html", "build_site.py"]),
+    "site-product": (["site/product.css"], ["templates/site/product.html", "build_site.py", "description_format.py"]),
+    "site-collection": (["site/collection.css"], ["templates/site/collection.html", "build_site.py", "pagination.py"]),
+    "site-search": (["site/search.css"], ["templates/site/search.html", "templates/js/search.js"]),
+    "site-home": (["site/home.css"], ["templates/site/home.html", "templates/site/product_card.html", "build_site.py"]),
+    "generator": (["generator/base.css"], ["templates/generator/*.html"]),
+    "generator-product": (["generator/product.css"], ["templates/generator/product.html", "templates/generator/related_card.html", "python generate_site.py"]),
+    "generator-listing": (["generator/listing.css"], ["templates/generator/collection.html", "templates/generator/all_products.html", "templates/generator/product_card.html", "python generate_site.py", "pagination.py"]),
+}
+
+COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+SELECTOR_TOKEN_RE = re.compile(r"[.#](-?[_a-zA-Z][\w-]*)")
+WORD_RE = re.compile(r"[\w-]+")
+STRING_RE = re.compile(r"""("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')""")
+NESTED_AT_RULES = ('@media', '@supports')
+
+
+# --- PARSING ---
+
+def _scan(css, pos, stops):
+    """Returns the index of the next stop character outside strings and parentheses."""
+    quote = None
+    parens = 0
+    for i in range(pos, len(css)):
+        ch = css[i]
+        if quote:
+            if ch == quote and css[i - 1] != '\\':
+                quote = None
+        elif ch in '"\'':
+            quote = ch
+        elif ch == '(':
+            parens += 1
+        elif ch == ')':
+            parens -= 1
+        elif not parens and ch in stops:
+            return i
+    return -1
+
+
+def parse_rules(css):
+    """
+    Splits a stylesheet into (prelude, body) pairs.
+    Statements like @import have a None body, @media/@supports bodies are
+    parsed recursively into lists of rules.
+    """
+    css = COMMENT_RE.sub('', css)
+    rules = []
+    pos = 0
+    while True:
+        stop = _scan(css, pos, '{;')
+        if stop == -1:
+            break
+        prelude = css[pos:stop].strip()
+        if css[stop] == ';':
+            if prelude:
+                rules.append((prelude, None))
+            pos = stop + 1
+            continue
+
+        depth = 1
+        end = stop + 1
+        while depth:
+            end = _scan(css, end, '{}')
+            if end == -1:
+                raise ValueError(f"Unbalanced braces after '{prelude}'")
+            depth += 1 if css[end] == '{' else -1
+            end += 1
+
+        body = css[stop + 1:end - 1]
+        if prelude.startswith(NESTED_AT_RULES):
+            rules.append((prelude, parse_rules(body)))
+        else:
+            rules.append((prelude, body.strip()))
+        pos = end
+    return rules
+
+
+def serialize_rules(rules):
+    """Writes rules back out as compact CSS."""
+    out = []
+    for prelude, body in rules:
+        prelude = ' '.join(prelude.split())
+        if body is None:
+            out.append(f"{prelude};")
+        elif isinstance(body, list):
+            out.append(f"{prelude}{{{serialize_rules(body)}}}")
+        else:
+            prelude = re.sub(r"\s*,\s*", ',', prelude)
+            out.append(f"{prelude}{{{minify_declarations(body)}}}")
+    return ''.join(out)
+
+
+def minify_declarations(body):
+    # Quoted strings (odd indexes after the split) are left untouched
+    parts = STRING_RE.split(body)
+    for i in range(0, len(parts), 2):
+        parts[i] = re.sub(r"\s*([;:,])\s*", r"\1", re.sub(r"\s+", ' ', parts[i]))
+    return ''.join(parts).strip().rstrip(';')
+
+
+def minify_css(css):
+    return serialize_rules(parse_rules(css))
+
+
+# --- PURGING ---
+
+def used_tokens(patterns):
+    """Collects every word that appears in the given content files (PurgeCSS-style scan)."""
+    tokens = set()
+    for pattern in patterns:
+        for path in sorted(ROOT_DIR.glob(pattern)):
+            tokens.update(WORD_RE.findall(path.read_text(encoding='utf-8')))
+    return tokens
+
+
+def selector_used(selector, tokens):
+    """A selector is kept when every class and id it references is used somewhere."""
+    return all(name in tokens for name in SELECTOR_TOKEN_RE.findall(selector))
+
+
+def purge_rules(rules, tokens):
+    """Drops rules whose selectors never match, and at-rule blocks left empty."""
+    kept = []
+    for prelude, body in rules:
+        if prelude.startswith('@'):
+            if isinstance(body, list):
+                body = purge_rules(body, tokens)
+                if not body:
+                    continue
+            kept.append((prelude, body))
+            continue
+        selectors = [s.strip() for s in prelude.split(',') if selector_used(s, tokens)]
+        if selectors:
+            kept.append((', '.join(selectors), body))
+    return kept
+
+
+# --- BUNDLES ---
+
+class Stylesheet:
+    """A purged, minified, content-hashed CSS bundle."""
+
+    __slots__ = ("name", "css", "digest")
+
+    def __init__(self, name, css):
+        self.name = name
+        self.css = css
+        self.digest = hashlib.sha256(css.encode('utf-8')).hexdigest()[:10]
+
+    @property
+    def filename(self):
+        return f"{self.name}.{self.digest}.css"
+
+    def href(self, prefix="/"):
+        return f"{prefix}{STATIC_CSS_DIR}/{self.filename}"
+
+
+@lru_cache(maxsize=None)
+def get_stylesheet(name):
+    """Builds a bundle once per process."""
+    sources, content = BUNDLES[name]
+    css = '\n'.join((CSS_DIR / source).read_text(encoding='utf-8') for source in sources)
+    rules = purge_rules(parse_rules(css), used_tokens(content))
+    return Stylesheet(name, serialize_rules(rules))
+
+
+@lru_cache(maxsize=None)
+def stylesheet_links(names, prefix="/"):
+    """Returns the <link> tags for a page, e.g. stylesheet_links(("site", "site-product"))."""
+    return '\n    '.join(f'<link rel="stylesheet" href="{get_stylesheet(name).href(prefix)}">' for name in names)
+
+
+def write_stylesheets(output_dir, names, prune=True):
+    """
+    Writes the fingerprinted bundles and, when prune is set, removes stale
+    versions with their .gz/.br siblings. Builds that leave some pages
+    unwritten pass prune=False: those pages still link the older versions.
+    Returns the paths written.
+    """
+    css_dir = Path(output_dir) / STATIC_CSS_DIR
+    css_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    for name in names:
+        sheet = get_stylesheet(name)
+        path = css_dir / sheet.filename
+        if prune:
+            for stale in css_dir.glob(f"{name}.*.css*"):
+                if (stale.name.split('.css', 1)[0] != path.stem
+                        and re.fullmatch(rf"{re.escape(name)}\.[0-9a-f]{{10}}\.css(\.gz|\.br)?", stale.name)):
+                    stale.unlink()
+        if not path.exists():
+            path.write_text(sheet.css, encoding='utf-8')
+            written.append(path)
+    return written
@@ -0,0 +1,168 @@
+import hashlib
+import re
+from functools import lru_cache
+from pathlib import Path
+
+# Configuration
+TEMPLATE_DIR = Path(__file__).resolve().parent / "templates"
+
+# {{ slot }} is filled at render time, {% include "file" %} is inlined at compile time
+TOKEN_RE = re.compile(r"\{\{\s*(\w+)\s*\}\}|\{%\s*include\s+[\"']([^\"']+)[\"']\s*%\}")
+
+
+class Template:
+    """
+    A page layout compiled once into a Python render function.
+    Includes are expanded and adjacent static text merged at compile time,
+    then the layout becomes a single f-string literal around the slots, so
+    rendering only formats the per-page values. Streaming compiles one
+    f-string per run of text between the slots that are streamed.
+    """
+
+    __slots__ = ("name", "parts", "slot_names", "_render", "_segments")
+
+    def __init__(self, name, source, loader=None):
+        self.name = name
+        parts = []
+        for static, slot in self._tokenize(source, loader, (name,)):
+            if slot is None and parts and parts[-1][1] is None:
+                parts[-1] = (parts[-1][0] + static, None)
+            else:
+                parts.append((static, slot))
+        self.parts = parts
+        self.slot_names = frozenset(slot for _, slot in parts if slot is not None)
+        self._render = self._compile(parts)
+        self._segments = {}  # frozenset of streamed slots -> [(render, streamed slot or None)]
+
+    @staticmethod
+    def _tokenize(source, loader, seen):
+        """Yields (static_text, None) and (None, slot_name) pairs, expanding includes."""
+        pos = 0
+        for match in TOKEN_RE.finditer(source):
+            if match.start() > pos:
+                yield source[pos:match.start()], None
+            slot, include = match.groups()
+            if slot:
+                if not slot.isidentifier():
+                    raise ValueError(f"Invalid slot name '{slot}' in template '{seen[0]}'")
+                yield None, slot
+            else:
+                if loader is None:
+                    raise ValueError(f"Cannot include '{include}' without a template loader")
+                if include in seen:
+                    raise ValueError(f"Circular include: {' -> '.join(seen + (include,))}")
+                yield from Template._tokenize(loader(include), loader, seen + (include,))
+            pos = match.end()
+        if pos < len(source):
+            yield source[pos:], None
+
+    def _compile(self, parts):
+        """Generates `def render(*, slot_a, slot_b, **_)` returning one f-string literal over parts."""
+        body = ''.join(
+            static.replace('{', '{{').replace('}', '}}') if slot is None else f"{{{slot}}}"
+            for static, slot in parts
+        )
+        slots = sorted({slot for _, slot in parts if slot is not None})
+        args = f"*, {''.join(f'{slot}, ' for slot in slots)}" if slots else ""
+        code = f"def render({args}**_):\n    return f{body!r}\n"
+        namespace = {}
+        exec(compile(code, f"<template {self.name}>", "exec"), namespace)
+        return namespace["render"]
+
+    def render(self, **context):
+        """Fills every slot from context and returns the page as one string."""
+        return self._render_from(context)
+
+    def stream(self, **context):
+        """
+        Returns the page as an iterable of chunks. A slot may hold an iterable
+        of strings (e.g. a generator of product cards), which is passed through
+        chunk by chunk instead of joined; the text between such slots is
+        rendered as one chunk, so a page without any is a single render.
+        """
+        return self._stream_from(context)
+
+    def _check(self, context):
+        missing = sorted(self.slot_names - context.keys())
+        if missing:
+            raise KeyError(f"Template '{self.name}' is missing slots: {', '.join(missing)}")
+
+    def _render_from(self, context):
+        try:
+            return self._render(**context)
+        except TypeError:
+            self._check(context)
+            raise
+
+    def _stream_from(self, context):
+        streamed = [slot for slot, value in context.items() if value.__class__ is not str]
+        if streamed:
+            streamed = frozenset(slot for slot in streamed
+                                 if hasattr(context[slot], '__iter__') and slot in self.slot_names)
+        if not streamed:
+            return (self._render_from(context),)
+        self._check(context)
+        return self._chunks(self._streamed(streamed), context)
+
+    def _streamed(self, streamed):
+        """The segments for one set of streamed slots: the text before each, then the rest."""
+        segments = self._segments.get(streamed)
+        if segments is None:
+            segments, current = [], []
+            for static, slot in self.parts:
+                if slot in streamed:
+                    segments.append((self._compile(current) if current else None, slot))
+                    current = []
+                else:
+                    current.append((static, slot))
+            segments.append((self._compile(current) if current else None, None))
+            self._segments[streamed] = segments
+        return segments
+
+    @staticmethod
+    def _chunks(segments, context):
+        for render, slot in segments:
+            if render is not None:
+                yield render(**context)
+            if slot is not None:
+                yield from context[slot]
+
+
+def read_template_source(name):
+    """Reads a template file, dropping one trailing newline (like Jinja)."""
+    source = (TEMPLATE_DIR / name).read_text(encoding='utf-8')
+    if source.endswith('\n'):
+        source = source[:-1]
+    return source
+
+
+def template_files(name, _seen=()):
+    """Returns name plus every file it includes, recursively (paths relative to TEMPLATE_DIR)."""
+    files = {name}
+    for match in TOKEN_RE.finditer(read_template_source(name)):
+        include = match.group(2)
+        if include and include not in files and include not in _seen:
+            files |= template_files(include, _seen + (name,))
+    return files
+
+
+def template_version(name):
+    """Digest of a template and everything it includes; editing any of them changes it."""
+    digest = hashlib.sha1()
+    for source in sorted(template_files(name)):
+        digest.update(source.encode('utf-8') + b'\0' + read_template_source(source).encode('utf-8') + b'\0')
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def get_template(name):
+    """Returns the compiled template, compiling it on first use in this process."""
+    return Template(name, read_template_source(name), loader=read_template_source)
+
+
+def render(name, **context):
+    return get_template(name)._render_from(context)
+
+
+def stream(name, **context):
+    return get_template(name)._stream_from(context)
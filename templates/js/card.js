@@ -0,0 +1,19 @@
+/* Product cards added by script: clones of the <template id="product-card"> rendered from templates/site/product_card.html */
+var productCard = (function () {
+    var template = document.getElementById('product-card');
+
+    return function (url, image, title, price) {
+        var link = template.content.firstElementChild.cloneNode(true);
+        link.href = url;
+        var img = link.querySelector('.product-image');
+        img.src = image;
+        img.alt = title;
+        img.decoding = 'async';
+        link.querySelector('.product-title').textContent = title;
+        if (price) {
+            var view = link.querySelector('.buy-link');
+            view.textContent = price + ' · ' + view.textContent;
+        }
+        return link;
+    };
+})();
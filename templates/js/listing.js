@@ -0,0 +1,68 @@
+/* Home grid: appends cards from the listing shards in static/api (see catalog_api.py) as the visitor scrolls */
+(function () {
+    var config = JSON.parse(document.getElementById('listing-config').textContent);
+    var grid = document.getElementById('product-grid');
+    var more = document.getElementById('load-more');
+    var shown = config.shown;
+    var listing = null;
+    var loading = false;
+    var observer = null;
+
+    function fetchJson(url) {
+        return fetch(url).then(function (response) {
+            if (!response.ok) throw new Error(response.status);
+            return response.json();
+        });
+    }
+
+    function card(item) {
+        return productCard(item.url, item.image, item.title);
+    }
+
+    function finish() {
+        more.hidden = true;
+        if (observer) observer.disconnect();
+    }
+
+    /* Still near the viewport after a shard was added: the next one is wanted too */
+    function nearView() {
+        return more.getBoundingClientRect().top < window.innerHeight * 2;
+    }
+
+    function loadMore() {
+        if (loading) return;
+        loading = true;
+        more.disabled = true;
+        listing = listing || fetchJson(config.listing);
+        listing.then(function (index) {
+            var page = Math.floor(shown / index.pageSize);
+            if (page >= index.pages.length) return true;
+            return fetchJson(index.pages[page]).then(function (shard) {
+                var items = shard.items.slice(shown % index.pageSize);
+                grid.append.apply(grid, items.map(card));
+                shown += items.length;
+                return shown >= index.total;
+            });
+        }).then(function (done) {
+            loading = false;
+            more.disabled = false;
+            if (done) finish();
+            else if (observer && nearView()) loadMore();
+        }, function () {
+            /* Offline or a stale page: the button stays for another try */
+            listing = null;
+            loading = false;
+            more.disabled = false;
+        });
+    }
+
+    if (shown >= config.total) return;
+    more.hidden = false;
+    more.addEventListener('click', loadMore);
+    if ('IntersectionObserver' in window) {
+        observer = new IntersectionObserver(function (entries) {
+            if (entries[0].isIntersecting) loadMore();
+        }, { rootMargin: '0px 0px 100% 0px' });
+        observer.observe(more);
+    }
+})();
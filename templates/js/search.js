@@ -0,0 +1,194 @@
+/* Client-side search over the prebuilt index in static/search (see search_index.py) */
+(function () {
+    var config = JSON.parse(document.getElementById('search-config').textContent);
+    var input = document.getElementById('search-input');
+    var collectionFilter = document.getElementById('search-collection');
+    var sortOrder = document.getElementById('search-sort');
+    var status = document.getElementById('search-status');
+    var results = document.getElementById('search-results');
+    var stopwords = new Set(config.stopwords);
+    var files = {};
+    var timer = null;
+    var latest = 0;
+
+    function fetchJson(url) {
+        if (!files[url]) {
+            files[url] = fetch(url).then(function (response) {
+                if (!response.ok) throw new Error(response.status);
+                return response.json();
+            });
+        }
+        return files[url];
+    }
+
+    function load(file) {
+        return fetchJson(config.base + file);
+    }
+
+    /* Same rules as search_index.stem/tokenize */
+    function stem(word) {
+        for (var i = 0; i < config.stem.length; i++) {
+            var suffix = config.stem[i][0];
+            if (word.endsWith(suffix)) {
+                if (word.length - suffix.length >= config.minStem) {
+                    return word.slice(0, word.length - suffix.length) + config.stem[i][1];
+                }
+                return word;
+            }
+        }
+        return word;
+    }
+
+    function words(text) {
+        var folded = text.toLowerCase().normalize('NFKD').replace(/[\u0300-\u036f]/g, '');
+        return (folded.match(/[a-z0-9]+/g) || []).filter(function (word) {
+            return !stopwords.has(word);
+        });
+    }
+
+    /* Flat [id gap, weight, ...] postings -> Map(id -> weight) */
+    function decode(postings, into) {
+        var id = 0;
+        for (var i = 0; i < postings.length; i += 2) {
+            id += postings[i];
+            into.set(id, Math.max(into.get(id) || 0, postings[i + 1]));
+        }
+        return into;
+    }
+
+    /* The word being typed also matches longer terms (and terms it is an unfinished form of) */
+    function lookup(word, isPrefix) {
+        var term = stem(word);
+        var file = config.shards[term.slice(0, config.prefixLength)];
+        if (!file) return Promise.resolve(new Map());
+        return load(file).then(function (shard) {
+            var matches = new Map();
+            if (!isPrefix) return shard[term] ? decode(shard[term], matches) : matches;
+            Object.keys(shard).forEach(function (candidate) {
+                if (candidate.startsWith(term) ||
+                        (word.startsWith(candidate) && word.length - candidate.length <= 3)) {
+                    decode(shard[candidate], matches);
+                }
+            });
+            return matches;
+        });
+    }
+
+    function search(query, browsing) {
+        var queryWords = words(query);
+        if (!queryWords.length) {
+            if (!browsing) return Promise.resolve(null);
+            /* No query but a filter or sort: start from the whole catalog */
+            return fetchJson(config.facets).then(function (facets) {
+                var all = [];
+                for (var id = 0; id < facets.count; id++) all.push([id, 0]);
+                return all;
+            });
+        }
+        return Promise.all(queryWords.map(function (word, i) {
+            return lookup(word, i === queryWords.length - 1);
+        })).then(function (maps) {
+            maps.sort(function (a, b) { return a.size - b.size; });
+            var scores = new Map(maps[0]);
+            maps.slice(1).forEach(function (map) {
+                scores.forEach(function (score, id) {
+                    if (map.has(id)) scores.set(id, score + map.get(id));
+                    else scores.delete(id);
+                });
+            });
+            return Array.from(scores.entries()).sort(function (a, b) {
+                return b[1] - a[1] || a[0] - b[0];
+            });
+        });
+    }
+
+    /* Facet rows share the search document ids (see facets.build_facets) */
+    function refine(ranked, collection, sort) {
+        if (!collection && !sort) return Promise.resolve(ranked);
+        return fetchJson(config.facets).then(function (facets) {
+            var columns = facets.columns;
+            var bit = facets.collections.indexOf(collection);
+            if (collection) {
+                var masks = columns.collections[Math.floor(bit / facets.maskBits)];
+                ranked = bit < 0 ? [] : ranked.filter(function (entry) {
+                    return masks[entry[0]] & (1 << (bit % facets.maskBits));
+                });
+            }
+            if (sort) {
+                var direction = sort === 'price-desc' ? -1 : 1;
+                ranked = ranked.map(function (entry, rank) { return [entry, rank]; }).sort(function (a, b) {
+                    var pa = columns.price[a[0][0]], pb = columns.price[b[0][0]];
+                    if (pa === null || pb === null) return (pa === null) - (pb === null) || a[1] - b[1];
+                    return direction * (pa - pb) || a[1] - b[1];
+                }).map(function (pair) { return pair[0]; });
+            }
+            return ranked;
+        });
+    }
+
+    function documents(ids) {
+        var shards = Array.from(new Set(ids.map(function (id) {
+            return Math.floor(id / config.docsPerShard);
+        })));
+        return Promise.all(shards.map(function (n) { return load(config.docs[n]); })).then(function (loaded) {
+            var byShard = new Map(shards.map(function (n, i) { return [n, loaded[i]]; }));
+            return ids.map(function (id) {
+                return byShard.get(Math.floor(id / config.docsPerShard))[id % config.docsPerShard];
+            });
+        });
+    }
+
+    /* Documents are [title, url, image, price] */
+    function card(doc) {
+        return productCard(doc[1], doc[2], doc[0], doc[3]);
+    }
+
+    function run() {
+        var query = input.value.trim();
+        var collection = collectionFilter.value;
+        var sort = sortOrder.value;
+        var ticket = ++latest;
+        var url = new URL(location.href);
+        [['q', query], ['collection', collection], ['sort', sort]].forEach(function (param) {
+            if (param[1]) url.searchParams.set(param[0], param[1]);
+            else url.searchParams.delete(param[0]);
+        });
+        history.replaceState(null, '', url);
+
+        search(query, Boolean(collection || sort)).then(function (ranked) {
+            return ranked && refine(ranked, collection, sort);
+        }).then(function (ranked) {
+            if (ticket !== latest) return;
+            if (!ranked) {
+                results.replaceChildren();
+                status.textContent = '';
+                return;
+            }
+            var top = ranked.slice(0, config.limit);
+            return documents(top.map(function (entry) { return entry[0]; })).then(function (docs) {
+                if (ticket !== latest) return;
+                results.replaceChildren.apply(results, docs.map(card));
+                status.textContent = ranked.length === 1 ? '1 result' : ranked.length + ' results';
+            });
+        }).catch(function () {
+            if (ticket === latest) status.textContent = 'Search is unavailable right now.';
+        });
+    }
+
+    input.addEventListener('input', function () {
+        clearTimeout(timer);
+        timer = setTimeout(run, 120);
+    });
+    input.form.addEventListener('submit', function (event) {
+        event.preventDefault();
+        run();
+    });
+    collectionFilter.addEventListener('change', run);
+    sortOrder.addEventListener('change', run);
+
+    var params = new URL(location.href).searchParams;
+    input.value = params.get('q') || '';
+    collectionFilter.value = params.get('collection') || '';
+    sortOrder.value = params.get('sort') || '';
+    if (input.value || collectionFilter.value || sortOrder.value) run();
+})();